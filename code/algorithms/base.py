@@ -1,18 +1,42 @@
 import abc
 import copy
+import math
 import random
 from typing import Any, Union
 
 from code.entities.event import Event
 from code.entities.timeslot import Timeslot
 from code.entities.timetable import Timetable
+from code.utils.checkpoint import load_checkpoint, save_checkpoint
 from code.utils.enums import EventType, Weekdays
-from code.utils.helpers import split_list_random
+from code.utils.helpers import remove_duplicates, split_list_random
+from code.utils.metrics import MetricsStream
+from code.utils.recorder import StatisticsRecorder
+from code.utils.structures import TranspositionTable
 
 
 class Algorithm(abc.ABC):
     timetable: Timetable
-    statistics: list[Any]
+    statistics: StatisticsRecorder
+    metrics: MetricsStream
+
+    # A previously exported timetable that the local search algorithms start
+    # from instead of constructing a new initial solution.
+    initial_timetable: Union[Timetable, None] = None
+
+    # Checkpoints are only supported by the local search algorithms.
+    checkpoint_filename: Union[str, None] = None
+    checkpoint_every: int = 1000
+    resume_state: Union[dict[str, Any], None] = None
+
+    # The scores of the visited states, which are only kept by the local search
+    # algorithms.
+    transpositions: Union[TranspositionTable, None] = None
+
+    # Give the events in the timeslots that have been changed by a move the
+    # best rooms, which can only be enabled for the local search algorithms
+    # that revert a move by restoring a snapshot.
+    reassign_rooms: bool = False
 
     @abc.abstractmethod
     def plot_statistics(self) -> None:
@@ -28,6 +52,72 @@ class Algorithm(abc.ABC):
         """
         pass
 
+    def enable_checkpoints(self, filename: str, every: int = 1000) -> None:
+        """
+        Save a checkpoint of the search to a file every n-iterations.
+        """
+        assert every > 0, 'checkpoint interval must be a positive number'
+
+        self.checkpoint_filename = filename
+        self.checkpoint_every = every
+
+    def resume(self, filename: str) -> None:
+        """
+        Load a checkpoint, which is used the next time the algorithm runs
+        instead of generating a new initial solution.
+        """
+        state = load_checkpoint(filename)
+        assert state['algorithm'] == self.__class__.__name__, f'checkpoint was created by {state["algorithm"]}'
+
+        self.resume_state = state
+
+    def save_checkpoint(self, iteration: int, **state) -> None:
+        """
+        Save the state of the search if a checkpoint is due after n-iterations.
+        The random state and statistics are always saved along with the state.
+        """
+        if self.checkpoint_filename is None or iteration % self.checkpoint_every != 0:
+            return
+
+        save_checkpoint(self.checkpoint_filename, {
+            'algorithm': self.__class__.__name__,
+            'iteration': iteration,
+            'random_state': random.getstate(),
+            'statistics': self.statistics,
+            **state,
+        })
+
+    def restore_checkpoint(self) -> dict[str, Any]:
+        """
+        Restore the random state and statistics of the loaded checkpoint and
+        return the rest of its state.
+        """
+        assert self.resume_state is not None, 'no checkpoint has been loaded'
+
+        state = self.resume_state
+        self.resume_state = None
+
+        random.setstate(state['random_state'])
+        self.statistics = state['statistics']
+
+        return state
+
+    def score_state(self, timetable: Timetable) -> tuple[int, int]:
+        """
+        Get the amount of violations and the malus score of a timetable, which
+        are taken from the transposition table if the state has been visited
+        before.
+        """
+        if self.transpositions is None:
+            return len(timetable.get_violations()), timetable.calculate_malus_score()
+
+        scores = self.transpositions.get(timetable.state_hash)
+        if scores is None:
+            scores = (len(timetable.get_violations()), timetable.calculate_malus_score())
+            self.transpositions.put(timetable.state_hash, *scores)
+
+        return scores
+
     def permute_students_for_random_course(self, timetable: Union[Timetable, None]=None) -> None:
         """
         Seminars and practicals may contain 2 or more groups the students will
@@ -39,28 +129,17 @@ class Algorithm(abc.ABC):
 
         course = random.choice(timetable.courses)
 
-        # The key will be a course name with the event type, i.e. 'Database wc'.
-        # The value is a list of scheduled events for that course type.
-        #
-        # Example:
-        # {
-        #   'Databases wc': [Event(), Event(), Event()]
-        #   'Databases pr': [Event(), Event()]
-        # }
-        course_events: dict[str, list[Event]] = {}
-
-        for day in timetable:
-            for timeslot in day.values():
-                for event in timeslot:
-                    if event.type not in course_events:
-                        course_events[event.type] = []
-
-                    if event.course == course and event.type != EventType.LECTURE:
-                        course_events[event.type].append(event)
-
         # There might be seminars and practicals, so just choose one.
-        selected_type = random.choice(list(course_events.keys()))
-        events = course_events[selected_type]
+        event_types = [
+            event_type
+            for event_type in [EventType.SEMINAR, EventType.PRACTICUM]
+            if len(timetable.get_course_events(course, event_type)) > 0
+        ]
+        if len(event_types) == 0:
+            return
+
+        selected_type = random.choice(event_types)
+        events = timetable.get_course_events(course, selected_type)
 
         # Only permute among the events if there are 2 or more.
         if len(events) >= 2:
@@ -68,15 +147,117 @@ class Algorithm(abc.ABC):
             students = [student for event in events for student in event.students]
 
             # Divide the students in groups.
-            student_groups = split_list_random(students, len(events))
+            group_capacity = math.ceil(len(students) / len(events))
+            student_groups = split_list_random(students, group_capacity)
 
             # Assign the students to the events.
-            for i, event in enumerate(events):
-                event.assign_students(student_groups[i])
+            for i, event in enumerate(list(events)):
+                students = student_groups[i] if i < len(student_groups) else []
+                timetable.assign_students(event, students)
+
+            # The groups have other sizes, so other rooms may fit better.
+            self.reassign_rooms_after_move(events, timetable)
+
+    def get_random_student_groups(self, timetable: Union[Timetable, None]=None) -> Union[list[Event], None]:
+        """
+        Get the seminar or practical events of a random course that has 2 or
+        more groups, or None if there is no such course.
+        """
+        if timetable is None:
+            timetable = self.timetable
+
+        groups = [
+            events
+            for (_, event_type), events in timetable.course_events.items()
+            if event_type != EventType.LECTURE and len(events) >= 2
+        ]
+
+        if len(groups) == 0:
+            return None
+
+        return random.choice(groups)
 
-    def swap_two_events(self, event: Event, other_event: Event, timetable: Union[Timetable, None]=None) -> None:
+    def swap_students_for_random_course(self, timetable: Union[Timetable, None]=None) -> bool:
+        """
+        Swap two random students between two groups of the same seminar or
+        practical of a random course, but only if the swap does not add any
+        violations nor malus points.
+
+        The change is scored using only the day schedules of both students,
+        which makes this move a lot cheaper than scoring the whole timetable.
+
+        :returns: True if the students have been swapped.
+        """
+        if timetable is None:
+            timetable = self.timetable
+
+        events = self.get_random_student_groups(timetable)
+        if events is None:
+            return False
+
+        event, other_event = random.sample(events, 2)
+        if len(event.students) == 0 or len(other_event.students) == 0:
+            return False
+
+        student = random.choice(event.students)
+        other_student = random.choice(other_event.students)
+        moves = [
+            (student, event, other_event),
+            (other_student, other_event, event),
+        ]
+
+        violations_delta, malus_delta = timetable.calculate_move_students_delta(moves)
+        if violations_delta > 0 or violations_delta == 0 and malus_delta > 0:
+            return False
+
+        timetable.move_students(moves)
+        return True
+
+    def balance_student_groups(self, iterations: int, timetable: Union[Timetable, None]=None) -> None:
+        """
+        Swap students between the groups of seminars and practicals for
+        n-iterations, keeping only the swaps that do not make it worse. The
+        swaps are scored without rescoring the whole timetable, so the local
+        search algorithms can afford a lot of these swaps up front.
+        """
+        if timetable is None:
+            timetable = self.timetable
+
+        for _ in range(iterations):
+            self.swap_students_for_random_course(timetable)
+
+    def reassign_rooms_after_move(self, events: list[Event], timetable: Union[Timetable, None]=None) -> None:
+        """
+        Give the events in the timeslots of the given events the best rooms, if
+        the rooms are reassigned after each move.
+        """
+        if timetable is None:
+            timetable = self.timetable
+
+        if not self.reassign_rooms:
+            return
+
+        for weekday, hour in remove_duplicates([(event.weekday, event.timeslot) for event in events]):
+            timetable.assign_rooms(weekday, hour)
+
+    def optimize_rooms(self, timetable: Union[Timetable, None]=None) -> bool:
+        """
+        Give all the events the best rooms for their timeslot, which is done
+        for the final timetable of a local search, or for the initial timetable
+        if the rooms are reassigned after each move.
+
+        :returns: True if any event has changed rooms.
+        """
+        if timetable is None:
+            timetable = self.timetable
+
+        return timetable.assign_all_rooms() > 0
+
+    def swap_two_events(self, event: Event, other_event: Event, timetable: Union[Timetable, None]=None) -> tuple[Event, Event]:
         """
         Swap two events with each other in the timetable.
+
+        :returns: The events that have replaced the given events.
         """
         if timetable is None:
             timetable = self.timetable
@@ -89,8 +270,8 @@ class Algorithm(abc.ABC):
         assert other_event.weekday is not None, 'other event must have a weekday'
         assert other_event.timeslot is not None, 'other event must have a timeslot'
 
-        timetable.remove_event(event)
-        timetable.remove_event(other_event)
+        event = timetable.remove_event(event)
+        other_event = timetable.remove_event(other_event)
 
         new_event = copy.deepcopy(event)
         new_event.set_room(other_event.room)
@@ -104,6 +285,9 @@ class Algorithm(abc.ABC):
 
         timetable.add_event(new_event)
         timetable.add_event(new_other_event)
+        self.reassign_rooms_after_move([new_event, new_other_event], timetable)
+
+        return new_event, new_other_event
 
     def create_similar_event(self, event: Event, timetable: Union[Timetable, None]=None) -> Event:
         """
@@ -136,11 +320,11 @@ class Algorithm(abc.ABC):
         if timetable is None:
             timetable = self.timetable
 
-        events = timetable.get_events()
-        event = random.choice(events)
+        event = timetable.get_random_event()
         similar_event = self.create_similar_event(event, timetable)
         timetable.remove_event(event)
         timetable.add_event(similar_event)
+        self.reassign_rooms_after_move([event, similar_event], timetable)
 
     def swap_two_random_events(self, timetable: Union[Timetable, None]=None) -> None:
         """
@@ -149,9 +333,7 @@ class Algorithm(abc.ABC):
         if timetable is None:
             timetable = self.timetable
 
-        events = timetable.get_events()
-        event = events.pop(random.randrange(len(events)))
-        other_event = events.pop(random.randrange(len(events)))
+        event, other_event = timetable.get_random_events(2)
 
         self.swap_two_events(event, other_event, timetable)
 
@@ -163,15 +345,8 @@ class Algorithm(abc.ABC):
         if timetable is None:
             timetable = self.timetable
 
-        # Find all timeslots with a non-zero malus score.
-        timeslots = []
-        for day in timetable:
-            for timeslot in day.values():
-                if timeslot.calculate_malus_score() > 0:
-                    timeslots.append(timeslot)
-
         # Take a random timeslot from those that still have malus points > 0.
-        current_timeslot = random.choice(timeslots)
+        current_timeslot = timetable.get_random_malus_timeslot()
 
         # Take one of the events inside the timeslot.
         event = random.choice(current_timeslot.events)
@@ -184,7 +359,7 @@ class Algorithm(abc.ABC):
                 if timeslot == current_timeslot:
                     continue
 
-                saturation_degree = timeslot.get_saturation_degree_for_course(event.course)
+                saturation_degree = timetable.get_saturation_degree(event.course, timeslot)
                 if lowest_degree is None or saturation_degree < lowest_degree:
                     lowest_degree = saturation_degree
                     other_timeslot = timeslot
@@ -202,9 +377,10 @@ class Algorithm(abc.ABC):
 
         The actions are as follows:
         - 30% chance to move one an event with malus score > 0
-        - 30% chance to move a single event
-        - 30% chance to swap two random events
+        - 25% chance to move a single event
+        - 25% chance to swap two random events
         - 10% chance to permute students within a course
+        - 10% chance to swap two students within a course
         """
         if timetable is None:
             timetable = self.timetable
@@ -212,9 +388,11 @@ class Algorithm(abc.ABC):
         n = random.random()
         if n < 0.3:
             self.move_high_malus_score_events(timetable)
-        elif 0.3 <= n < 0.6:
+        elif 0.3 <= n < 0.55:
             self.move_random_event(timetable)
-        elif 0.6 <= n < 0.9:
+        elif 0.55 <= n < 0.8:
             self.swap_two_random_events(timetable)
-        else:
+        elif 0.8 <= n < 0.9:
             self.permute_students_for_random_course(timetable)
+        else:
+            self.swap_students_for_random_course(timetable)
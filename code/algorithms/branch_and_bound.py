@@ -0,0 +1,451 @@
+import logging
+import math
+import timeit
+from typing import Union
+from code.utils.decorators import timer
+import matplotlib.pyplot as plt
+
+from code.algorithms.base import Algorithm
+from code.entities.event import Event
+from code.entities.problem_instance import ProblemInstance
+from code.entities.room import Room
+from code.entities.timeslot import Timeslot
+from code.entities.timetable import Timetable
+from code.utils.enums import EventType
+from code.utils.metrics import MetricsStream
+from code.utils.profiling import phase
+from code.utils.recorder import StatisticsRecorder
+
+
+class BranchAndBound(Algorithm):
+    """
+    Exact algorithm that finds the timetable with the lowest malus score for a
+    small selection of courses, which can be used to check how far the other
+    algorithms are from the optimal solution.
+
+    Each event is put in every possible timeslot and the rooms within each
+    timeslot are assigned optimally by pairing the largest events with the
+    largest rooms. A branch is pruned as soon as the malus score of the events
+    that have been scheduled so far plus a lower bound for the events that are
+    left is not better than the best solution found so far.
+
+    NOTE: The student groups are created the same way as the Greedy algorithm
+    does, so the solution is optimal for those student groups.
+    """
+
+    def __init__(self,
+                 course_names: Union[list[str], None]=None,
+                 time_limit: Union[float, None]=None,
+                 problem: Union[ProblemInstance, None]=None) -> None:
+        self.timetable = Timetable(problem=problem)
+        self.logger = logging.getLogger(__name__)
+        self.statistics = StatisticsRecorder({'nodes': 'q', 'malus_score': 'l'})
+        self.metrics = MetricsStream()
+        self.time_limit = time_limit
+        self.is_optimal = False
+        self.explored_nodes = 0
+
+        if course_names is not None:
+            known_course_names = [course.name for course in self.timetable.courses]
+            for course_name in course_names:
+                assert course_name in known_course_names, f'unknown course "{course_name}"'
+
+            self.timetable = Timetable(problem=self.timetable.problem.select_courses(course_names))
+
+    def plot_statistics(self) -> None:
+        """
+        Plot the malus score of each better solution that has been found.
+        """
+        plt.xlabel('explored nodes')
+        plt.ylabel('malus points')
+
+        x = self.statistics.get_column('nodes')
+        y = self.statistics.get_column('malus_score')
+        plt.step(x, y, where='post')
+
+        status = 'optimal' if self.is_optimal else 'not proven optimal'
+        plt.title(f'Branch and bound (nodes = {self.explored_nodes}; malus score = {min(y)}; {status})')
+        plt.show()
+
+    def get_unscheduled_events(self) -> list[Event]:
+        """
+        Create all the events that should be scheduled for each course, where
+        the events with the most students will be scheduled first.
+        """
+        events = []
+
+        for course in self.timetable.courses:
+            for _ in range(course.lectures_amount):
+                event = Event(f'{course.name} hoorcollege', EventType.LECTURE, course)
+                event.assign_students(course.enrolled_students)
+                events.append(event)
+
+            for _ in range(course.seminars_amount):
+                student_groups, total_groups = course.create_seminar_student_groups()
+                for i in range(total_groups):
+                    event = Event(f'{course.name} werkcollege', EventType.SEMINAR, course)
+                    event.assign_students(student_groups[i])
+                    events.append(event)
+
+            for _ in range(course.practicals_amount):
+                student_groups, total_groups = course.create_practical_student_groups()
+                for i in range(total_groups):
+                    event = Event(f'{course.name} practicum', EventType.PRACTICUM, course)
+                    event.assign_students(student_groups[i])
+                    events.append(event)
+
+        return sorted(events, key=lambda event: len(event.students), reverse=True)
+
+    def get_clique_events(self) -> list[int]:
+        """
+        Get the indices of the lectures of the courses in the lecture clique,
+        where any two of them in the same timeslot add a malus point.
+        """
+        clique = self.timetable.get_lecture_clique()
+
+        return [
+            index
+            for index, event in enumerate(self.events)
+            if event.type == EventType.LECTURE and event.course.name in clique and len(event.students) > 0
+        ]
+
+    def calculate_room_overfitting(self, sizes: list[int], timeslot_value: int) -> Union[int, None]:
+        """
+        Calculate the lowest room capacity malus score for events of a certain
+        size in a single timeslot, or None if the events can't all get a room.
+
+        Pairing the largest events with the largest rooms is optimal, since the
+        malus score only depends on how much each event exceeds its room.
+        """
+        if timeslot_value == 17:
+            if len(sizes) > 1:
+                return None
+            return max(0, sizes[0] - self.rooms[0].capacity)
+
+        if len(sizes) > len(self.rooms):
+            return None
+
+        score = 0
+        for size, room in zip(sorted(sizes, reverse=True), self.rooms):
+            score += max(0, size - room.capacity)
+
+        return score
+
+    def get_placement_score(self, event: Event, slot: int) -> Union[int, None]:
+        """
+        Get the amount of malus points that are added when putting an event in
+        a certain timeslot, without the empty timeslots of the students, or
+        None if the event doesn't fit in that timeslot.
+        """
+        timeslot_value = Timeslot.OPTIONS[slot % len(Timeslot.OPTIONS)]
+        sizes = self.slot_sizes[slot]
+
+        room_overfitting = self.calculate_room_overfitting(sizes + [len(event.students)], timeslot_value)
+        if room_overfitting is None:
+            return None
+
+        score = room_overfitting - self.slot_room_overfitting[slot]
+
+        # The 17:00 timeslot can only contain a single event.
+        if timeslot_value == 17:
+            score += 5
+
+        student_counts = self.slot_students[slot]
+        for student in event.students:
+            if student.student_id in student_counts:
+                score += 1
+
+        if event.course.name in self.slot_courses[slot]:
+            score += 1
+
+        return score
+
+    def get_student_day_timeslots(self, student_id: str, day: int) -> list[int]:
+        """
+        Get the timeslot values in which a student has events on a single day
+        of the search state.
+        """
+        timeslots = []
+
+        for hour_index, timeslot_value in enumerate(Timeslot.OPTIONS):
+            if student_id in self.slot_students[day * len(Timeslot.OPTIONS) + hour_index]:
+                timeslots.append(timeslot_value)
+
+        return timeslots
+
+    def calculate_student_empty_timeslots_score(self, student_id: str) -> Union[int, None]:
+        """
+        Calculate the empty timeslots malus score for a single student, or None
+        if the student has 3 or more empty timeslots in a day.
+        """
+        score = 0
+
+        for day in range(Timetable.DAYS_PER_WEEK):
+            timeslots = self.get_student_day_timeslots(student_id, day)
+            violations, day_score = self.timetable.calculate_empty_timeslots_score(timeslots)
+            if violations > 0:
+                return None
+            score += day_score
+
+        return score
+
+    def get_empty_timeslots_delta(self, event: Event, slot: int) -> int:
+        """
+        Estimate how much the empty timeslots of the students change when
+        putting an event in a certain timeslot, which is used to try the most
+        promising timeslots first. Violations count as 10 malus points.
+        """
+        day = slot // len(Timeslot.OPTIONS)
+        timeslot_value = Timeslot.OPTIONS[slot % len(Timeslot.OPTIONS)]
+        delta = 0
+
+        for student in event.students:
+            timeslots = self.get_student_day_timeslots(student.student_id, day)
+            if timeslot_value in timeslots:
+                continue
+
+            violations, score = self.timetable.calculate_empty_timeslots_score(timeslots)
+            new_violations, new_score = self.timetable.calculate_empty_timeslots_score(timeslots + [timeslot_value])
+            delta += (new_violations - violations) * 10 + new_score - score
+
+        return delta
+
+    def place_event(self, event: Event, slot: int) -> Union[int, None]:
+        """
+        Put an event in a certain timeslot of the search state.
+
+        :returns: The empty timeslots malus score of the students that have no
+                  events left to be scheduled, or None if any of them has 3 or
+                  more empty timeslots in a day.
+        """
+        timeslot_value = Timeslot.OPTIONS[slot % len(Timeslot.OPTIONS)]
+
+        self.slot_sizes[slot].append(len(event.students))
+        self.slot_room_overfitting[slot] = self.calculate_room_overfitting(self.slot_sizes[slot], timeslot_value)
+
+        for student in event.students:
+            self.slot_students[slot][student.student_id] = self.slot_students[slot].get(student.student_id, 0) + 1
+            self.student_remaining_events[student.student_id] -= 1
+
+        self.slot_courses[slot][event.course.name] = self.slot_courses[slot].get(event.course.name, 0) + 1
+        self.day_events[slot // len(Timeslot.OPTIONS)] += 1
+
+        # The empty timeslots of a student can't change anymore once all the
+        # events of that student have been scheduled.
+        score = 0
+        for student in event.students:
+            if self.student_remaining_events[student.student_id] == 0:
+                student_score = self.calculate_student_empty_timeslots_score(student.student_id)
+                if student_score is None:
+                    return None
+                score += student_score
+
+        return score
+
+    def unplace_event(self, event: Event, slot: int) -> None:
+        """
+        Remove an event from a certain timeslot of the search state.
+        """
+        timeslot_value = Timeslot.OPTIONS[slot % len(Timeslot.OPTIONS)]
+
+        self.slot_sizes[slot].remove(len(event.students))
+        if len(self.slot_sizes[slot]) > 0:
+            self.slot_room_overfitting[slot] = self.calculate_room_overfitting(self.slot_sizes[slot], timeslot_value)
+        else:
+            self.slot_room_overfitting[slot] = 0
+
+        for student in event.students:
+            self.slot_students[slot][student.student_id] -= 1
+            if self.slot_students[slot][student.student_id] == 0:
+                del self.slot_students[slot][student.student_id]
+            self.student_remaining_events[student.student_id] += 1
+
+        self.slot_courses[slot][event.course.name] -= 1
+        if self.slot_courses[slot][event.course.name] == 0:
+            del self.slot_courses[slot][event.course.name]
+
+        self.day_events[slot // len(Timeslot.OPTIONS)] -= 1
+
+    def calculate_clique_lower_bound(self) -> int:
+        """
+        Calculate how many malus points the clique lectures that are not
+        scheduled yet will add at least, since each timeslot that already
+        contains one of them adds at least one malus point.
+        """
+        remaining_events = 0
+        for index in self.clique_events:
+            if self.assignment[index] is None:
+                remaining_events += 1
+
+        return max(0, remaining_events - self.clique_free_slots)
+
+    def get_candidate_slots(self) -> list[int]:
+        """
+        Get the timeslots in which the next event can be put.
+
+        All weekdays are equal, so an event is only put on the first weekday
+        without any events rather than on each weekday without any events.
+        """
+        slots = []
+        has_empty_day = False
+
+        for day in range(Timetable.DAYS_PER_WEEK):
+            if self.day_events[day] == 0:
+                if has_empty_day:
+                    continue
+                has_empty_day = True
+
+            for hour_index in range(len(Timeslot.OPTIONS)):
+                slots.append(day * len(Timeslot.OPTIONS) + hour_index)
+
+        return slots
+
+    def search(self, index: int, score: int) -> None:
+        """
+        Find the best timeslot for the event at a certain index and everything
+        after it, given the malus score of the events that are scheduled.
+        """
+        self.explored_nodes += 1
+
+        if self.time_limit is not None and timeit.default_timer() - self.start_time > self.time_limit:
+            self.is_time_limit_exceeded = True
+            return
+
+        # All students have all their events scheduled, so the score includes
+        # the empty timeslots malus score of every student.
+        if index == len(self.events):
+            if score < self.best_score:
+                self.best_score = score
+                self.best_assignment = list(self.assignment)
+                self.logger.info(f'Found better solution with {self.best_score} malus score after {self.explored_nodes} nodes')
+                self.statistics.append({
+                    'nodes': self.explored_nodes,
+                    'malus_score': self.best_score,
+                })
+                self.metrics.record_solution(self.explored_nodes, self.best_score, 0)
+            return
+
+        event = self.events[index]
+
+        # Try the timeslots that seem to add the least malus points first.
+        candidates = []
+        for slot in self.get_candidate_slots():
+            placement_score = self.get_placement_score(event, slot)
+            if placement_score is not None:
+                estimate = placement_score + self.get_empty_timeslots_delta(event, slot)
+                candidates.append((estimate, slot, placement_score))
+        candidates.sort()
+
+        is_clique_event = index in self.clique_events
+        for _, slot, placement_score in candidates:
+            # Skip everything that can't be better before changing the state.
+            if score + placement_score + self.remaining_room_overfitting[index + 1] >= self.best_score:
+                continue
+
+            self.assignment[index] = slot
+            is_free_clique_slot = is_clique_event and self.clique_slot_events[slot] == 0
+            if is_clique_event:
+                self.clique_slot_events[slot] += 1
+            if is_free_clique_slot:
+                self.clique_free_slots -= 1
+
+            finished_students_score = self.place_event(event, slot)
+            if finished_students_score is not None:
+                new_score = score + placement_score + finished_students_score
+                lower_bound = new_score + \
+                    self.remaining_room_overfitting[index + 1] + \
+                    self.calculate_clique_lower_bound()
+
+                if lower_bound < self.best_score:
+                    self.search(index + 1, new_score)
+
+            self.unplace_event(event, slot)
+            if is_clique_event:
+                self.clique_slot_events[slot] -= 1
+            if is_free_clique_slot:
+                self.clique_free_slots += 1
+            self.assignment[index] = None
+
+            if self.is_time_limit_exceeded:
+                return
+
+    def build_timetable(self) -> None:
+        """
+        Add the events to the timetable using the best assignment found.
+        """
+        self.timetable.clear()
+
+        slot_events: dict[int, list[Event]] = {}
+        for index, slot in enumerate(self.best_assignment):
+            slot_events.setdefault(slot, []).append(self.events[index])
+
+        for slot, events in slot_events.items():
+            events = sorted(events, key=lambda event: len(event.students), reverse=True)
+            for event, room in zip(events, self.rooms):
+                event.set_weekday(slot // len(Timeslot.OPTIONS) + 1)
+                event.set_timeslot(Timeslot.OPTIONS[slot % len(Timeslot.OPTIONS)])
+                event.set_room(room)
+                self.timetable.add_event(event)
+
+    @timer
+    @phase('branch and bound')
+    def run(self, iterations=1) -> None:
+        """
+        Search the whole solution space until the best solution is proven to be
+        optimal or until the time limit is exceeded.
+        """
+        self.timetable.clear()
+        self.events = self.get_unscheduled_events()
+        self.logger.info(f'Starting branch and bound for {len(self.timetable.courses)} courses with {len(self.events)} events')
+
+        # Only the largest room can be used for the 17:00 timeslot, which is
+        # the first room after sorting.
+        self.rooms: list[Room] = sorted(self.timetable.rooms,
+                                        key=lambda room: (room.is_largest, room.capacity),
+                                        reverse=True)
+
+        total_slots = Timetable.DAYS_PER_WEEK * len(Timeslot.OPTIONS)
+        self.slot_sizes: list[list[int]] = [[] for _ in range(total_slots)]
+        self.slot_room_overfitting: list[int] = [0 for _ in range(total_slots)]
+        self.slot_students: list[dict[str, int]] = [{} for _ in range(total_slots)]
+        self.slot_courses: list[dict[str, int]] = [{} for _ in range(total_slots)]
+        self.day_events: list[int] = [0 for _ in range(Timetable.DAYS_PER_WEEK)]
+        self.assignment: list[Union[int, None]] = [None for _ in self.events]
+
+        self.student_remaining_events: dict[str, int] = {}
+        for event in self.events:
+            for student in event.students:
+                self.student_remaining_events[student.student_id] = self.student_remaining_events.get(student.student_id, 0) + 1
+
+        # Events that don't fit in the largest room will always exceed it.
+        self.remaining_room_overfitting = [0 for _ in range(len(self.events) + 1)]
+        for index in reversed(range(len(self.events))):
+            room_overfitting = max(0, len(self.events[index].students) - self.rooms[0].capacity)
+            self.remaining_room_overfitting[index] = self.remaining_room_overfitting[index + 1] + room_overfitting
+
+        self.clique_events = set(self.get_clique_events())
+        self.clique_slot_events: list[int] = [0 for _ in range(total_slots)]
+        self.clique_free_slots = total_slots
+
+        self.best_score = math.inf
+        self.best_assignment: list[int] = []
+        self.explored_nodes = 0
+        self.is_time_limit_exceeded = False
+        self.start_time = timeit.default_timer()
+        self.metrics.start(self.__class__.__name__, total_events=len(self.events))
+
+        self.search(0, 0)
+
+        self.is_optimal = len(self.best_assignment) > 0 and not self.is_time_limit_exceeded
+        self.metrics.finish(explored_nodes=self.explored_nodes, is_optimal=self.is_optimal)
+
+        if len(self.best_assignment) == 0:
+            self.logger.info(f'No solution found after {self.explored_nodes} nodes')
+            return
+
+        self.build_timetable()
+
+        if self.is_optimal:
+            self.logger.info(f'Proved optimal solution with {self.best_score} malus score after {self.explored_nodes} nodes')
+        else:
+            self.logger.info(f'Exceeded time limit, best solution has {self.best_score} malus score after {self.explored_nodes} nodes')
@@ -1,16 +1,20 @@
 import copy
 import logging
 import random
-from typing import Any
+from typing import Any, Union
 from code.entities.course import Course
 from code.utils.decorators import timer
 import matplotlib.pyplot as plt
 
 from code.algorithms.base import Algorithm
 from code.entities.event import Event
+from code.entities.problem_instance import ProblemInstance
 from code.entities.timeslot import Timeslot
 from code.entities.timetable import Timetable
 from code.utils.enums import EventType
+from code.utils.metrics import MetricsStream
+from code.utils.profiling import phase
+from code.utils.recorder import StatisticsRecorder
 
 
 class Greedy(Algorithm):
@@ -20,10 +24,11 @@ class Greedy(Algorithm):
     NOTE: This will always find the same state with the same malus score.
     """
 
-    def __init__(self):
-        self.timetable = Timetable()
+    def __init__(self, problem: Union[ProblemInstance, None] = None):
+        self.timetable = Timetable(problem=problem)
         self.logger = logging.getLogger(__name__)
-        self.statistics = []
+        self.statistics = StatisticsRecorder({'malus_score': 'l'})
+        self.metrics = MetricsStream()
 
     def plot_statistics(self) -> None:
         """
@@ -32,9 +37,8 @@ class Greedy(Algorithm):
         plt.xlabel('events')
         plt.ylabel('malus points per chosen timeslot')
 
-        scores = [stat['malus_score'] for stat in self.statistics]
-        total_events = len(scores)
-        plt.plot(range(1, total_events + 1), scores)
+        x, y = self.statistics.get_series('malus_score')
+        plt.plot(x, y)
 
         plt.title(self.__class__.__name__)
         plt.show()
@@ -90,7 +94,7 @@ class Greedy(Algorithm):
         score for that state and then sort all these states based on the one
         with the least violations and lowest malus score.
         """
-        timetable = copy.deepcopy(self.timetable)
+        timetable = self.timetable.snapshot()
         event = copy.deepcopy(event)
         possibilities: list[dict[str, Any]] = []
 
@@ -98,42 +102,31 @@ class Greedy(Algorithm):
         # for that whole timetable state.
         for day_index in range(Timetable.DAYS_PER_WEEK):
             for timeslot_value in Timeslot.OPTIONS:
-                day = timetable[day_index]
-                timeslot = day[timeslot_value] if timeslot_value in day else None
-
-                # If it is a timeslot, there exists already at least one event
-                # in this timeslot.
-                if isinstance(timeslot, Timeslot):
-                    # Find a suitable room based on the capacity.
-                    available_rooms = timetable.get_available_timeslot_rooms(timeslot)
-                elif timeslot_value == 17:
-                    # Only allow the largest room for the 17:00 timeslot.
-                    available_rooms = [room for room in timetable.rooms if room.is_largest]
-                else:
-                    # Any other timeslot can choose any room.
-                    available_rooms = timetable.rooms
-
-                # Remove the removes that are too small for this event.
-                suitable_rooms = sorted([room for room in available_rooms if room.capacity >= event.get_capacity()])
+                weekday = day_index + 1
+
+                # Find the smallest available room that fits the event, where
+                # the 17:00 timeslot only allows the largest room.
+                room = timetable.find_available_room(weekday, timeslot_value, event.get_capacity())
 
                 # Continue if there is no available room in this timeslot.
-                if len(suitable_rooms) == 0:
+                if room is None:
                     continue
 
-                room = suitable_rooms[0]
-                weekday = day_index + 1
-
                 event.set_weekday(weekday)
                 event.set_timeslot(timeslot_value)
                 event.set_room(room)
 
                 timetable.add_event(event)
+                with self.metrics.scoring():
+                    malus_score = timetable.calculate_malus_score()
+                    total_violations = len(timetable.get_violations())
+
                 possibilities.append({
                     'weekday': weekday,
                     'timeslot': timeslot_value,
                     'room': room,
-                    'malus_score': timetable.calculate_malus_score(),
-                    'total_violations': len(timetable.get_violations()),
+                    'malus_score': malus_score,
+                    'total_violations': total_violations,
                 })
                 timetable.remove_event(event)
 
@@ -162,6 +155,7 @@ class Greedy(Algorithm):
         return events.pop(0)
 
     @timer
+    @phase('construction')
     def run(self, iterations=1) -> None:
         """
         Run the algorithm until a solution is found.
@@ -171,6 +165,7 @@ class Greedy(Algorithm):
 
         # Generate events that are to be scheduled.
         events = self.get_unscheduled_events()
+        self.metrics.start(self.__class__.__name__, total_events=len(events))
 
         # While there are events to be scheduled:
         while len(events) > 0:
@@ -190,7 +185,14 @@ class Greedy(Algorithm):
             self.statistics.append({
                 'malus_score': possibility['malus_score']
             })
+            self.metrics.update(len(self.statistics), possibility['malus_score'], possibility['total_violations'], complete=False)
+
+        # Only the complete timetable counts as the best state.
+        violations = len(self.timetable.get_violations())
+        malus_score = self.timetable.calculate_malus_score()
+        self.metrics.update_best(malus_score, violations)
 
+        self.metrics.finish(malus_score=malus_score, violations=violations)
         self.logger.info(f'Successfully created timetable')
 
 class RandomGreedy(Greedy):
@@ -198,17 +200,17 @@ class RandomGreedy(Greedy):
     Random greedy implementation which takes random timeslot possibilities.
     """
 
-    def __init__(self):
-        super().__init__()
-        self.random_greedy_statistics = []
+    def __init__(self, problem: Union[ProblemInstance, None] = None):
+        super().__init__(problem)
+        self.random_greedy_statistics = StatisticsRecorder({'probability': 'l', 'malus_score': 'l'})
         self.probability = 1
 
     def plot_statistics(self) -> None:
         plt.xlabel('% random probability')
         plt.ylabel('malus points')
 
-        x = [stat['probability'] for stat in self.random_greedy_statistics]
-        y = [stat['malus_score'] for stat in self.random_greedy_statistics]
+        x = self.random_greedy_statistics.get_column('probability')
+        y = self.random_greedy_statistics.get_column('malus_score')
         plt.plot(x, y)
 
         plt.title(self.__class__.__name__)
@@ -1,4 +1,3 @@
-import copy
 import logging
 import random
 from typing import Union
@@ -6,8 +5,13 @@ from code.algorithms.base import Algorithm
 from code.algorithms.greedy import Greedy, GreedyLSD
 from code.algorithms.randomizer import Randomizer
 from code.utils.decorators import timer
+from code.utils.metrics import MetricsStream
+from code.utils.profiling import phase, take_iteration_snapshot
+from code.utils.recorder import StatisticsRecorder
+from code.utils.structures import TranspositionTable
 import matplotlib.pyplot as plt
 
+from code.entities.problem_instance import ProblemInstance
 from code.entities.timetable import Timetable
 
 
@@ -17,22 +21,42 @@ class HillClimber(Algorithm):
     it if it is equally good or better than the previous state.
     """
 
-    def __init__(self, algorithm: Union[Algorithm, None]=None) -> None:
-        self.timetable = Timetable()
-        self.algorithm = algorithm if algorithm is not None else GreedyLSD()
+    def __init__(self,
+                 algorithm: Union[Algorithm, None]=None,
+                 balance_iterations: int = 10000,
+                 reassign_rooms: bool = False,
+                 problem: Union[ProblemInstance, None]=None) -> None:
+        self.algorithm = algorithm if algorithm is not None else GreedyLSD(problem)
+        self.timetable = Timetable(problem=self.algorithm.timetable.problem)
         self.logger = logging.getLogger(__name__)
-        self.statistics = []
+        self.statistics = StatisticsRecorder({'malus_score': 'l'})
+        self.metrics = MetricsStream()
+        self.transpositions = TranspositionTable()
+        self.balance_iterations = balance_iterations
+        self.reassign_rooms = reassign_rooms
 
     def generate_state(self) -> None:
         """
-        Run the parent algorithm in order to generate a solution.
+        Run the parent algorithm in order to generate a solution, unless an
+        initial timetable has been given.
         """
-        self.algorithm.run(1)
-        self.timetable = self.algorithm.timetable
+        if self.initial_timetable is not None:
+            self.timetable = self.initial_timetable
+        else:
+            # Report the construction of the initial solution in the same stream.
+            self.algorithm.metrics = self.metrics
+
+            self.algorithm.run(1)
+            self.timetable = self.algorithm.timetable
+
+        self.balance_student_groups(self.balance_iterations)
+
+        if self.reassign_rooms:
+            self.optimize_rooms()
 
         # Since this class extends another class, the other class is also
         # keeping track of some statistics, so we have to reset it here.
-        self.statistics = []
+        self.statistics.clear()
 
     def plot_statistics(self) -> None:
         """
@@ -42,36 +66,54 @@ class HillClimber(Algorithm):
         plt.ylabel('malus points')
 
         iterations = len(self.statistics)
-        x = range(1, iterations + 1)
-        y = [stat['malus_score'] for stat in self.statistics]
+        x, y = self.statistics.get_series('malus_score')
         plt.plot(x, y)
 
-        lowest_malus_score = min([stat['malus_score'] for stat in self.statistics])
+        lowest_malus_score = self.statistics.min('malus_score')
         base_algorithm_name = self.algorithm.__class__.__name__
         plt.title(f'Hill climber using {base_algorithm_name} (iterations = {iterations}; malus score = {lowest_malus_score})')
         plt.show()
 
     @timer
+    @phase('local search')
     def run(self, iterations=1) -> None:
         """
         Run the hill climber for n-iterations until a local optimum is reached.
+        If a checkpoint has been loaded, the run continues from that checkpoint.
         """
-        self.timetable.clear()
-        self.generate_state()
-
         # Stop if there is no improvement anymore after this amount of times.
         no_improvement_limit = 10000
 
-        violations = len(self.timetable.get_violations())
-        malus_score = self.timetable.calculate_malus_score()
+        if self.resume_state is not None:
+            state = self.restore_checkpoint()
+            self.timetable = state['timetable']
+            no_improvement_counter = state['no_improvement_counter']
+            start_iteration = state['iteration']
+            self.logger.info(f'Resuming from iteration {start_iteration}')
+        else:
+            self.timetable.clear()
+            self.generate_state()
+            no_improvement_counter = 0
+            start_iteration = 0
+
+        self.transpositions.clear()
+
+        lower_bound = self.timetable.compute_lower_bound()
+        violations, malus_score = self.score_state(self.timetable)
         self.logger.info(f'Initial solution state has {violations} violations and {malus_score} malus score')
+        self.logger.info(f'Lower bound for the malus score is {lower_bound}')
+        self.metrics.start(self.__class__.__name__, start_iteration, lower_bound=lower_bound)
+
+        prev_state = self.timetable.snapshot()
+        for i in range(start_iteration, iterations):
+            # No solution can be better than the lower bound.
+            if violations == 0 and malus_score <= lower_bound:
+                self.logger.info('🎉  Found the best solution possible, hooray!')
+                break
 
-        prev_state = copy.deepcopy(self.timetable)
-        no_improvement_counter = 0
-        for i in range(iterations):
             if no_improvement_counter == no_improvement_limit:
                 self.logger.info(f'Quitting, because no improvement has been found for {no_improvement_limit} iterations')
-                return
+                break
 
             # Log the current iteration every 100 iterations.
             if (i + 1) % 100 == 0:
@@ -79,14 +121,11 @@ class HillClimber(Algorithm):
 
             self.mutate_state()
 
-            prev_violations = len(prev_state.get_violations())
-            prev_malus_score = prev_state.calculate_malus_score()
-            new_violations = len(self.timetable.get_violations())
-            new_malus_score = self.timetable.calculate_malus_score()
+            with self.metrics.scoring():
+                prev_violations, prev_malus_score = self.score_state(prev_state)
 
-            if new_violations == 0 and new_malus_score == 0:
-                self.logger.info('🎉  Found the best solution possible, hooray!')
-                break
+            with self.metrics.scoring():
+                new_violations, new_malus_score = self.score_state(self.timetable)
 
             # If it is a better solution or at least equally as good
             is_better_solution = (
@@ -107,25 +146,34 @@ class HillClimber(Algorithm):
                 else:
                     self.logger.debug(f'Found similar state with {new_violations} violations and {new_malus_score} malus score')
 
-                self.statistics.append({
-                    'iteration': i + 1,
-                    'malus_score': new_malus_score,
-                })
+                violations = new_violations
+                malus_score = new_malus_score
+                self.statistics.append({ 'malus_score': new_malus_score })
             else:
                 # Worse solution, reverse changes.
                 no_improvement_counter += 1
                 self.timetable = prev_state
 
-                if len(self.statistics) > 0:
-                    # If there is no change, just copy the previous stats.
-                    self.statistics.append(self.statistics[-1])
-                else:
-                    # If there is no statistics yet, add one.
-                    self.statistics.append({
-                        'iteration': i + 1,
-                        'malus_score': prev_malus_score,
-                    })
-
-            prev_state = copy.deepcopy(self.timetable)
-
-        self.logger.info(f'Exceed total iterations')
+                # There is no change, so the previous malus score is recorded,
+                # which is stored as a single run by the recorder.
+                self.statistics.append({ 'malus_score': prev_malus_score })
+
+            self.metrics.record_move(is_better_solution)
+            self.metrics.update(i + 1, malus_score, violations)
+            take_iteration_snapshot(i + 1)
+            prev_state = self.timetable.snapshot()
+
+            # The incumbent is always the best state for the hill climber.
+            self.save_checkpoint(i + 1,
+                                 timetable=self.timetable,
+                                 no_improvement_counter=no_improvement_counter)
+        else:
+            self.logger.info(f'Exceed total iterations')
+
+        if self.optimize_rooms():
+            violations, malus_score = self.score_state(self.timetable)
+            self.logger.info(f'Assigned the best rooms, which gives {violations} violations and {malus_score} malus score')
+
+        self.logger.info(f'Scored {self.transpositions.misses} states and recognised {self.transpositions.hits} revisited states')
+        self.logger.info(f'Optimality gap is {malus_score - lower_bound} malus points (lower bound: {lower_bound})')
+        self.metrics.finish(malus_score=malus_score, violations=violations, lower_bound=lower_bound)
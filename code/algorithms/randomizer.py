@@ -1,15 +1,20 @@
 import copy
 import logging
 import random
+from typing import Union
 from code.utils.decorators import timer
 import matplotlib.pyplot as plt
 
 from code.algorithms.base import Algorithm
 from code.entities.course import Course
 from code.entities.event import Event
+from code.entities.problem_instance import ProblemInstance
 from code.entities.timeslot import Timeslot
 from code.entities.timetable import Timetable
 from code.utils.enums import EventType, Weekdays
+from code.utils.metrics import MetricsStream
+from code.utils.profiling import phase
+from code.utils.recorder import StatisticsRecorder
 
 
 class Randomizer(Algorithm):
@@ -18,10 +23,11 @@ class Randomizer(Algorithm):
     of the events that violate the constraints.
     """
 
-    def __init__(self) -> None:
-        self.timetable = Timetable()
+    def __init__(self, problem: Union[ProblemInstance, None] = None) -> None:
+        self.timetable = Timetable(problem=problem)
         self.logger = logging.getLogger(__name__)
-        self.statistics = []
+        self.statistics = StatisticsRecorder({'retries': 'l'})
+        self.metrics = MetricsStream()
 
     def create_random_event(self, title: str, event_type: EventType, course: Course) -> Event:
         """
@@ -36,7 +42,7 @@ class Randomizer(Algorithm):
         """
         Creates random events based on the courses data.
         """
-        courses = copy.deepcopy(self.timetable.courses)
+        courses = list(self.timetable.courses)
         for _ in range(len(courses)):
             course = courses.pop(random.randrange(len(courses)))
             # Create the lecture events.
@@ -76,8 +82,7 @@ class Randomizer(Algorithm):
         """
         Swap a given event with another random event.
         """
-        other_events = [e for e in self.timetable.get_events() if e is not event]
-        other_event = random.choice(other_events)
+        other_event = self.timetable.get_random_event(exclude=event)
         self.swap_two_events(event, other_event)
 
     def get_random_event(self) -> Event:
@@ -99,13 +104,14 @@ class Randomizer(Algorithm):
         """
         Plot the list of retries in a line-graph.
         """
-        retries = [stat['retries'] for stat in self.statistics]
+        retries = self.statistics.get_column('retries')
         iterations = len(retries)
 
         plt.xlabel('iterations')
         plt.ylabel('retries')
 
-        plt.plot(range(1, iterations + 1), retries, label='retries')
+        x, y = self.statistics.get_series('retries')
+        plt.plot(x, y, label='retries')
 
         average_retries = int(sum(retries) / len(retries))
         plt.axhline(y=average_retries,
@@ -202,10 +208,13 @@ class Randomizer(Algorithm):
         plt.show()
 
     @timer
+    @phase('construction')
     def run(self, iterations=1) -> None:
         """
         Assign random events until the timetable is valid.
         """
+        self.metrics.start(self.__class__.__name__)
+
         for i in range(iterations):
             self.timetable.clear()
             self.assign_random_events()
@@ -234,7 +243,12 @@ class Randomizer(Algorithm):
                 self.logger.info(f'Failed to create random timetable, exceeded max retries (retries:{retries})')
 
 
-            self.statistics.append({
-                'iteration': i + 1,
-                'retries': retries,
-            })
+            self.statistics.append({ 'retries': retries })
+
+            with self.metrics.scoring():
+                malus_score = self.timetable.calculate_malus_score()
+
+            self.metrics.record_move(found_solution)
+            self.metrics.update(i + 1, malus_score, len(violations))
+
+        self.metrics.finish()
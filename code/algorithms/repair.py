@@ -0,0 +1,219 @@
+import logging
+import random
+from collections.abc import Callable
+from typing import Union
+from code.utils.decorators import timer
+from code.utils.metrics import MetricsStream
+from code.utils.profiling import phase
+from code.utils.recorder import StatisticsRecorder
+import matplotlib.pyplot as plt
+
+from code.algorithms.base import Algorithm
+from code.entities.event import Event
+from code.entities.timetable import Timetable
+from code.utils.enums import EventType
+
+# A function that reverts a move, with the changes in violations and malus score.
+Move = tuple[Union[Callable, None], int, int]
+
+
+class RepairSearch(Algorithm):
+    """
+    Repair search algorithm implementation, which is a hill climber that only
+    moves the events that have been affected by incremental updates of an
+    existing timetable, such as enrolments or rooms that are removed. All the
+    other events only move when they are swapped with an affected event, which
+    keeps the rest of the schedule stable.
+
+    Example usage:
+    timetable.apply_enrolment_delta(student, ['Calculus 2'], [])
+    repair_search = RepairSearch(timetable)
+    repair_search.run(500)
+    """
+
+    def __init__(self, timetable: Timetable) -> None:
+        self.timetable = timetable
+        self.logger = logging.getLogger(__name__)
+        self.statistics = StatisticsRecorder({'malus_score': 'l'})
+        self.metrics = MetricsStream()
+
+    def plot_statistics(self) -> None:
+        """
+        Plot the malus scores during the repair process.
+        """
+        plt.xlabel('iterations')
+        plt.ylabel('malus points')
+
+        iterations = len(self.statistics)
+        x, y = self.statistics.get_series('malus_score')
+        plt.plot(x, y)
+
+        lowest_malus_score = self.statistics.min('malus_score')
+        plt.title(f'Repair search (iterations = {iterations}; malus score = {lowest_malus_score})')
+        plt.show()
+
+    def move_dirty_event(self, event: Event) -> Move:
+        """
+        Move a dirty event to another random timeslot and room.
+
+        :returns: A function that reverts the move, with the changes in
+                  violations and malus score.
+        """
+        similar_event = self.create_similar_event(event)
+        events = [event, similar_event]
+
+        with self.metrics.scoring():
+            violations, malus_score = self.timetable.calculate_local_score(events)
+
+        self.timetable.remove_event(event)
+        self.timetable.add_event(similar_event)
+
+        with self.metrics.scoring():
+            new_violations, new_malus_score = self.timetable.calculate_local_score(events)
+
+        def revert() -> None:
+            self.timetable.remove_event(similar_event)
+            self.timetable.add_event(event)
+
+        return revert, new_violations - violations, new_malus_score - malus_score
+
+    def swap_dirty_event(self, event: Event) -> Move:
+        """
+        Swap a dirty event with another random event.
+
+        :returns: A function that reverts the swap, with the changes in
+                  violations and malus score.
+        """
+        other_event = self.timetable.get_random_event(exclude=event)
+        events = [event, other_event]
+
+        with self.metrics.scoring():
+            violations, malus_score = self.timetable.calculate_local_score(events)
+
+        new_event, new_other_event = self.swap_two_events(event, other_event)
+
+        with self.metrics.scoring():
+            new_violations, new_malus_score = self.timetable.calculate_local_score(events)
+
+        def revert() -> None:
+            self.timetable.remove_event(new_event)
+            self.timetable.remove_event(new_other_event)
+            self.timetable.add_event(event)
+            self.timetable.add_event(other_event)
+
+        return revert, new_violations - violations, new_malus_score - malus_score
+
+    def swap_dirty_student(self) -> Move:
+        """
+        Swap a dirty student with a student of another group of the same
+        seminar or practical, but only if it does not make it worse.
+
+        :returns: No revert function, since the swap is only done if it does
+                  not make it worse, with the changes in violations and malus
+                  score.
+        """
+        student_id = random.choice(list(self.timetable.dirty_student_ids))
+        groups = [
+            (event, events)
+            for (_, event_type), events in self.timetable.course_events.items()
+            if event_type != EventType.LECTURE and len(events) >= 2
+            for event in events
+            if any(student.student_id == student_id for student in event.students)
+        ]
+        if len(groups) == 0:
+            return None, 0, 0
+
+        event, events = random.choice(groups)
+        other_event = random.choice([e for e in events if e is not event])
+        if len(other_event.students) == 0:
+            return None, 0, 0
+
+        student = next(student for student in event.students if student.student_id == student_id)
+        other_student = random.choice(other_event.students)
+        moves = [
+            (student, event, other_event),
+            (other_student, other_event, event),
+        ]
+
+        with self.metrics.scoring():
+            violations_delta, malus_delta = self.timetable.calculate_move_students_delta(moves)
+
+        if violations_delta > 0 or violations_delta == 0 and malus_delta > 0:
+            return None, 0, 0
+
+        self.timetable.move_students(moves)
+        return None, violations_delta, malus_delta
+
+    def mutate_dirty_state(self) -> Move:
+        """
+        Mutate the timetable with a random action for the dirty events or
+        students.
+
+        The actions are as follows:
+        - 40% chance to move a dirty event
+        - 40% chance to swap a dirty event with a random event
+        - 20% chance to swap a dirty student with another student
+
+        Only the timeslots and student days that are touched by the action are
+        scored, rather than the whole timetable.
+
+        :returns: A function that reverts the action, or None if the action
+                  does not need to be reverted, with the changes in violations
+                  and malus score.
+        """
+        dirty_events = self.timetable.get_dirty_events()
+        has_dirty_students = len(self.timetable.dirty_student_ids) > 0
+
+        n = random.random()
+        if len(dirty_events) > 0 and (n < 0.8 or not has_dirty_students):
+            event = random.choice(dirty_events)
+            if n < 0.4:
+                return self.move_dirty_event(event)
+            return self.swap_dirty_event(event)
+
+        if has_dirty_students:
+            return self.swap_dirty_student()
+
+        return None, 0, 0
+
+    @timer
+    @phase('repair')
+    def run(self, iterations: int) -> None:
+        """
+        Run the repair search for n-iterations, after which the timetable is
+        no longer marked as dirty.
+        """
+        has_dirty_events = len(self.timetable.dirty_event_ids) > 0
+        has_dirty_students = len(self.timetable.dirty_student_ids) > 0
+        if not has_dirty_events and not has_dirty_students:
+            self.logger.info('Nothing to repair, because there are no dirty events or students')
+            return
+
+        violations = len(self.timetable.get_violations())
+        malus_score = self.timetable.calculate_malus_score()
+        self.logger.info(f'Repairing {len(self.timetable.dirty_event_ids)} events and {len(self.timetable.dirty_student_ids)} students')
+        self.logger.info(f'Initial solution state has {violations} violations and {malus_score} malus score')
+        self.metrics.start(self.__class__.__name__)
+
+        for i in range(iterations):
+            revert, violations_delta, malus_delta = self.mutate_dirty_state()
+
+            # If it is a better solution or at least equally as good
+            is_better_solution = violations_delta < 0 or violations_delta == 0 and malus_delta <= 0
+
+            # Student swaps are only done if they do not make it worse, so
+            # those never have to be reverted.
+            if is_better_solution or revert is None:
+                if violations_delta != 0 or malus_delta != 0:
+                    violations += violations_delta
+                    malus_score += malus_delta
+                    self.logger.info(f'Found better state with {violations} violations and {malus_score} malus score')
+            else:
+                revert()
+
+            self.statistics.append({ 'malus_score': malus_score })
+            self.metrics.record_move(is_better_solution)
+            self.metrics.update(i + 1, malus_score, violations)
+
+        self.timetable.clear_dirty()
+        self.metrics.finish(malus_score=malus_score, violations=violations)
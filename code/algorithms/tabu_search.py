@@ -1,12 +1,16 @@
-import copy
 import logging
 import random
 from typing import Union
 from code.utils.decorators import timer
+from code.utils.metrics import MetricsStream
+from code.utils.profiling import phase, take_iteration_snapshot
+from code.utils.recorder import StatisticsRecorder
+from code.utils.structures import TranspositionTable
 import matplotlib.pyplot as plt
 
 from code.algorithms.greedy import GreedyLSD
 from code.algorithms.base import Algorithm
+from code.entities.problem_instance import ProblemInstance
 from code.entities.timetable import Timetable
 
 
@@ -15,10 +19,18 @@ class TabuSearch(Algorithm):
     Tabu search algorithm implementation.
     """
 
-    def __init__(self, algorithm: Union[Algorithm, None]=None) -> None:
+    def __init__(self,
+                 algorithm: Union[Algorithm, None]=None,
+                 balance_iterations: int = 10000,
+                 reassign_rooms: bool = False,
+                 problem: Union[ProblemInstance, None]=None) -> None:
         self.logger = logging.getLogger(__name__)
-        self.algorithm = algorithm if algorithm is not None else GreedyLSD()
-        self.statistics = []
+        self.algorithm = algorithm if algorithm is not None else GreedyLSD(problem)
+        self.statistics = StatisticsRecorder({'malus_score': 'l'})
+        self.metrics = MetricsStream()
+        self.transpositions = TranspositionTable()
+        self.balance_iterations = balance_iterations
+        self.reassign_rooms = reassign_rooms
 
     def plot_statistics(self) -> None:
         """
@@ -28,56 +40,93 @@ class TabuSearch(Algorithm):
         plt.xlabel('iterations')
         plt.ylabel('malus points')
 
-        x = range(1, iterations + 1)
-        y = [stat['malus_score'] for stat in self.statistics]
+        x, y = self.statistics.get_series('malus_score')
         plt.plot(x, y)
 
+        lowest_malus_score = self.statistics.min('malus_score')
         base_algorithm_name = self.algorithm.__class__.__name__
-        plt.title(f'TabuSearch based on {base_algorithm_name} (iterations = {iterations}; malus score = {min(y)})')
+        plt.title(f'TabuSearch based on {base_algorithm_name} (iterations = {iterations}; malus score = {lowest_malus_score})')
         plt.show()
 
     def get_initial_solution(self) -> Timetable:
         """
-        Generate a solution using any of the already implemented algorithms.
+        Generate a solution using any of the already implemented algorithms,
+        unless an initial timetable has been given.
         """
-        self.algorithm.run(1)
-        return self.algorithm.timetable
+        if self.initial_timetable is not None:
+            timetable = self.initial_timetable
+        else:
+            # Report the construction of the initial solution in the same stream.
+            self.algorithm.metrics = self.metrics
+
+            self.algorithm.run(1)
+            timetable = self.algorithm.timetable
+
+        self.balance_student_groups(self.balance_iterations, timetable)
+
+        if self.reassign_rooms:
+            self.optimize_rooms(timetable)
+
+        return timetable
 
     def get_neighbor(self, best_candidate: Timetable) -> Timetable:
         """
         Generate n-neighbor solutions based on a given candidate.
         """
         while True:
-            candidate = copy.deepcopy(best_candidate)
+            candidate = best_candidate.snapshot()
             self.mutate_state(candidate)
-            if candidate.is_solution():
+
+            # A valid timetable has no violations and does not exceed the
+            # amount of timeslots, like `Timetable.is_solution`.
+            violations, _ = self.score_state(candidate)
+            if violations == 0 and candidate.get_total_timeslots() <= Timetable.MAX_TIMESLOTS_PER_WEEK:
                 return candidate
 
     @timer
+    @phase('local search')
     def run(self, iterations: int) -> None:
         """
-        Run the tabu search for n-iterations
+        Run the tabu search for n-iterations. If a checkpoint has been loaded,
+        the run continues from that checkpoint.
         """
         max_tabu_list_size = 10000
 
-        initial_solution: Timetable = self.get_initial_solution()
-        best_solution = initial_solution
-        tabu_list: set[int] = set()
-
         # Stop if there is no improvement anymore after this amount of times.
         no_improvement_limit = 10000
 
-        violations = len(initial_solution.get_violations())
-        malus_score = initial_solution.calculate_malus_score()
+        if self.resume_state is not None:
+            state = self.restore_checkpoint()
+            best_solution: Timetable = state['best_solution']
+            tabu_list: set[int] = state['tabu_list']
+            no_improvement_counter = state['no_improvement_counter']
+            start_iteration = state['iteration']
+            self.logger.info(f'Resuming from iteration {start_iteration}')
+        else:
+            best_solution = self.get_initial_solution()
+            tabu_list = set()
+            no_improvement_counter = 0
+            start_iteration = 0
+
+        self.transpositions.clear()
+
+        lower_bound = best_solution.compute_lower_bound()
+        violations, malus_score = self.score_state(best_solution)
         self.logger.info(f'Initial solution state has {violations} violations and {malus_score} malus score')
+        self.logger.info(f'Lower bound for the malus score is {lower_bound}')
+        self.metrics.start(self.__class__.__name__, start_iteration, lower_bound=lower_bound)
 
         tabu_list.add(malus_score)
 
-        no_improvement_counter = 0
-        for i in range(iterations):
+        for i in range(start_iteration, iterations):
+            # No solution can be better than the lower bound.
+            if violations == 0 and malus_score <= lower_bound:
+                self.logger.info('🎉  Found the best solution possible, hooray!')
+                break
+
             if no_improvement_counter == no_improvement_limit:
                 self.logger.info(f'Quitting, because no improvement has been found for {no_improvement_limit} iterations')
-                return
+                break
 
             # Log the current iteration every 100 iterations.
             if (i + 1) % 100 == 0:
@@ -85,15 +134,21 @@ class TabuSearch(Algorithm):
 
             candidate = self.get_neighbor(best_solution)
 
-            candidate_score = candidate.calculate_malus_score()
-            best_solution_score = best_solution.calculate_malus_score()
+            with self.metrics.scoring():
+                _, candidate_score = self.score_state(candidate)
+
+            _, best_solution_score = self.score_state(best_solution)
 
             if candidate_score < best_solution_score:
                 self.logger.info(f'Found new best solution with {candidate_score} malus score (previous:{best_solution_score})')
                 best_solution = candidate
+                violations = 0
+                malus_score = candidate_score
                 no_improvement_counter = 0
+                self.metrics.record_move(True)
             else:
                 no_improvement_counter += 1
+                self.metrics.record_move(False)
 
                 if candidate_score not in tabu_list:
                     tabu_list.add(candidate_score)
@@ -101,9 +156,21 @@ class TabuSearch(Algorithm):
                         tabu_list.pop()
 
             self.statistics.append({ 'malus_score': best_solution_score })
+            self.metrics.update(i + 1, malus_score, violations)
+            take_iteration_snapshot(i + 1)
 
-            if best_solution_score == 0:
-                self.logger.info('🎉  Found the best solution possible, hooray!')
-                break
+            # Candidates are always based on the best solution, so it is the
+            # incumbent as well.
+            self.save_checkpoint(i + 1,
+                                 best_solution=best_solution,
+                                 tabu_list=tabu_list,
+                                 no_improvement_counter=no_improvement_counter)
 
         self.timetable = best_solution
+        if self.optimize_rooms():
+            violations, malus_score = self.score_state(self.timetable)
+            self.logger.info(f'Assigned the best rooms, which gives {violations} violations and {malus_score} malus score')
+
+        self.logger.info(f'Scored {self.transpositions.misses} states and recognised {self.transpositions.hits} revisited states')
+        self.logger.info(f'Optimality gap is {malus_score - lower_bound} malus points (lower bound: {lower_bound})')
+        self.metrics.finish(malus_score=malus_score, violations=violations, lower_bound=lower_bound)
@@ -1,4 +1,5 @@
-from typing import Union
+import copy
+from typing import Any, Union
 
 from code.entities.course import Course
 from code.entities.room import Room
@@ -32,6 +33,16 @@ class Event:
     def __repr__(self) -> str:
         return f'{self.__class__.__name__}(id:{self.id}, title:{self.title}, type:{self.type}, timeslot:{self.timeslot}, course:{self.course.name}, room:{self.room}, weekday:{self.weekday})'
 
+    def __deepcopy__(self, memo: dict[int, Any]) -> 'Event':
+        """
+        Copy the assignment of the event, while the course, room and students
+        are shared with the copy, since those belong to the problem instance.
+        """
+        event = copy.copy(self)
+        event.students = list(self.students)
+        memo[id(self)] = event
+        return event
+
     def __lt__(self, other) -> bool:
         """
         Implement the < operator.
@@ -64,11 +75,12 @@ class Event:
         """
         self.students.append(student)
 
-    def serialize(self) -> dict:
+    def serialize(self, include_students: bool = True) -> dict:
         """
-        Serialize the data inside this class to a JSON-friendly structure.
+        Serialize the data inside this class to a JSON-friendly structure, where
+        the students are referenced by their student id.
         """
-        return {
+        data = {
             'id': self.id,
             'title': self.title,
             'type': self.type.value,
@@ -78,6 +90,11 @@ class Event:
             'room': str(self.room),
         }
 
+        if include_students:
+            data['students'] = [student.student_id for student in self.students]
+
+        return data
+
     def assign_students(self, students: list[Student]) -> None:
         """
         Assign new students to the event.
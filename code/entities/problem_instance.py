@@ -0,0 +1,213 @@
+import copy
+import itertools
+from collections.abc import Sequence
+from types import MappingProxyType
+from typing import Any, Union
+import networkx as nx
+
+from code.entities.course import Course
+from code.entities.room import Room
+from code.entities.student import Student
+from code.utils.data import load_courses, load_rooms, load_students
+from code.utils.profiling import phase
+
+
+class ProblemInstance:
+    """
+    The static data of the timetabling problem, which are the rooms, courses and
+    students, the students that are enrolled per course and the graph of
+    conflicting courses.
+
+    A problem instance is loaded once and then passed to all timetables, which
+    only contain the events that are assigned to the problem. A deepcopy of a
+    timetable shares the same problem instance as well, which is why a problem
+    instance is read-only once it has been created: its rooms, courses and
+    students are tuples and its mappings can not be changed. A timetable that
+    changes the problem data (i.e. incremental enrolment updates) has to use
+    its own copy, which can be changed.
+    """
+
+    def __init__(self, rooms: list[Room], courses: list[Course], students: list[Student]) -> None:
+        self.read_only = False
+        self.set_rooms(rooms)
+        self.courses: Sequence[Course] = courses
+        self.students: Sequence[Student] = students
+
+        # The names of the courses that list a course as conflicting, which is
+        # used to keep the saturation degrees up to date.
+        self.conflicting_course_names: dict[str, list[str]] = {}
+
+        with phase('conflict graph'):
+            self.set_course_conflicts()
+
+        with phase('data load'):
+            self.register_students_to_courses()
+
+        self.freeze()
+
+    @classmethod
+    def load(cls,
+             load_rooms=load_rooms,
+             load_courses=load_courses,
+             load_students=load_students) -> 'ProblemInstance':
+        """
+        Load the problem instance with the given loaders.
+        """
+        with phase('data load'):
+            rooms = load_rooms()
+            courses = load_courses()
+            students = load_students()
+
+        return cls(rooms, courses, students)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(rooms:{len(self.rooms)}, courses:{len(self.courses)}, students:{len(self.students)})'
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> 'ProblemInstance':
+        """
+        Share the problem instance instead of copying it.
+        """
+        return self
+
+    def __getstate__(self) -> dict[str, Any]:
+        """
+        Pickle the read-only mappings as dictionaries, since those can not be
+        pickled otherwise.
+        """
+        return {
+            key: dict(value) if isinstance(value, MappingProxyType) else value
+            for key, value in self.__dict__.items()
+        }
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        """
+        Make the mappings of an unpickled problem instance read-only again.
+        """
+        self.__dict__.update(state)
+        if self.read_only:
+            self.freeze()
+
+    def freeze(self) -> None:
+        """
+        Make the rooms, courses, students and mappings read-only, so changing
+        a shared problem instance fails instead of changing all timetables.
+        """
+        self.read_only = True
+        self.rooms = tuple(self.rooms)
+        self.courses = tuple(self.courses)
+        self.students = tuple(self.students)
+        self.rooms_by_capacity = tuple(self.rooms_by_capacity)
+        self.room_capacities = tuple(self.room_capacities)
+        self.room_bits = MappingProxyType(dict(self.room_bits))
+        self.conflicting_course_names = MappingProxyType({
+            course_name: tuple(course_names)
+            for course_name, course_names in self.conflicting_course_names.items()
+        })
+
+    def copy(self, memo: Union[dict[int, Any], None] = None) -> 'ProblemInstance':
+        """
+        Create a copy of the problem instance that can be changed without
+        changing the shared instance. The copied rooms, courses and students
+        are added to `memo` by the id of the original object.
+        """
+        if memo is None:
+            memo = {}
+
+        problem = self.__class__.__new__(self.__class__)
+        for key, value in self.__dict__.items():
+            if isinstance(value, MappingProxyType):
+                value = dict(value)
+            setattr(problem, key, copy.deepcopy(value, memo))
+
+        problem.read_only = False
+        problem.rooms = list(problem.rooms)
+        problem.courses = list(problem.courses)
+        problem.students = list(problem.students)
+        problem.rooms_by_capacity = list(problem.rooms_by_capacity)
+        problem.room_capacities = list(problem.room_capacities)
+        problem.conflicting_course_names = {
+            course_name: list(course_names)
+            for course_name, course_names in problem.conflicting_course_names.items()
+        }
+
+        return problem
+
+    def set_rooms(self, rooms: list[Room]) -> None:
+        """
+        Set the available rooms and index them by capacity, where the position
+        of a room in the sorted rooms is its bit in a room mask. Rooms with
+        the same capacity keep their order, so the lowest bit of a mask is the
+        first of the smallest rooms, like `sorted(rooms)[0]`.
+        """
+        assert not self.read_only, 'a shared problem instance can not be changed, use a copy instead'
+
+        self.rooms: Sequence[Room] = rooms
+        self.rooms_by_capacity: Sequence[Room] = sorted(rooms)
+        self.room_capacities: Sequence[int] = [room.capacity for room in self.rooms_by_capacity]
+        self.room_bits: dict[str, int] = {room.location_id: 1 << index for index, room in enumerate(self.rooms_by_capacity)}
+        self.all_rooms_mask = (1 << len(rooms)) - 1
+        self.largest_rooms_mask = self.get_room_mask([room for room in rooms if room.is_largest])
+
+    def get_room_mask(self, rooms: Sequence[Room]) -> int:
+        """
+        Get the mask with the bits of the given rooms, ignoring unknown rooms.
+        """
+        mask = 0
+        for room in rooms:
+            mask |= self.room_bits.get(room.location_id, 0)
+
+        return mask
+
+    def select_courses(self, course_names: list[str]) -> 'ProblemInstance':
+        """
+        Create a problem instance with only the given courses, which shares all
+        other data with this problem instance.
+        """
+        problem = copy.copy(self)
+        problem.courses = tuple(course for course in self.courses if course.name in course_names)
+        return problem
+
+    def set_course_conflicts(self) -> None:
+        """
+        Create a graph where each vertice represents a course and the edge in
+        between two vertices indicates that there is at least one student
+        enrolled in both courses, meaning that all neighbors for a node in the
+        graph represent the conflicting courses for a course respectively.
+        """
+        assert not self.read_only, 'a shared problem instance can not be changed, use a copy instead'
+
+        # Create the graph.
+        network = nx.Graph()
+        network.add_nodes_from([course.name for course in self.courses])
+
+        # Get all courses that are overlapping for each student.
+        list_of_overlaps = [student.enrolled_courses for student in self.students]
+
+        # Create each possible combination per overlap and add it as an edge.
+        for courses in list_of_overlaps:
+            for pair in itertools.combinations(courses, 2):
+                network.add_edge(pair[0], pair[1])
+
+        # Gather the data that was generated inside the graph.
+        course_conflicts = {}
+        for course_name in list(network.nodes):
+            course_conflicts[course_name] = sorted(list(network[course_name].keys()))
+
+        # Assign the corresponding conflicting courses to each course.
+        for course in self.courses:
+            course.set_conflicting_courses(course_conflicts[course.name])
+
+        self.conflicting_course_names = {}
+        for course in self.courses:
+            for course_name in course.conflicting_courses:
+                self.conflicting_course_names.setdefault(course_name, []).append(course.name)
+
+    def register_students_to_courses(self) -> None:
+        """
+        Register all the students to the courses that they signed up for.
+        """
+        assert not self.read_only, 'a shared problem instance can not be changed, use a copy instead'
+
+        for course in self.courses:
+            students = [s for s in self.students if course.name in s.enrolled_courses]
+            course.register_students(students)
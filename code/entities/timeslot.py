@@ -3,6 +3,7 @@ from typing import Union
 from code.entities.course import Course
 
 from code.entities.event import Event
+from code.utils.decorators import cached_by_version
 from code.utils.helpers import remove_duplicates
 
 
@@ -19,6 +20,11 @@ class Timeslot:
         self.weekday = weekday
         self.events = events if events is not None else []
 
+        # The scores that have been calculated since the last change to the
+        # events, which is tracked by the version.
+        self.version = 0
+        self.score_cache: dict = {}
+
     def __eq__(self, other) -> bool:
         """
         Check if two timeslots are the same class type and value.
@@ -32,12 +38,21 @@ class Timeslot:
         Add an event to the events list.
         """
         self.events.append(event)
+        self.bump_version()
 
     def remove_event(self, event) -> None:
         """
         Remove an event from the events list.
         """
         self.events.remove(event)
+        self.bump_version()
+
+    def bump_version(self) -> None:
+        """
+        Mark the events as changed, which invalidates the cached scores. This
+        has to be done as well when a scheduled event itself is changed.
+        """
+        self.version += 1
 
     def __len__(self) -> int:
         """
@@ -139,6 +154,7 @@ class Timeslot:
 
         return score
 
+    @cached_by_version
     def calculate_malus_score(self) -> int:
         """
         Calculate the malus score for this particular timeslot.
@@ -179,6 +195,7 @@ class Timeslot:
 
         return score
 
+    @cached_by_version
     def get_violations(self) -> list[Event]:
         """
         Get all events that are violating the constraints.
@@ -208,3 +225,97 @@ class Timeslot:
         Serialize the data inside this class to a JSON-friendly structure.
         """
         return self.events
+
+
+class TimeslotScore:
+    """
+    Malus score components for a single timeslot that are kept up to date as
+    events are added to or removed from that timeslot, such that the score can
+    be read without recalculating it from all the events.
+
+    The components follow the same rules as the `Timeslot.calculate_*` methods.
+    """
+
+    def __init__(self, value: int) -> None:
+        self.value = value
+        self.student_counts: dict[str, int] = {}
+        self.course_counts: dict[str, int] = {}
+        self.largest_room_events = 0
+        self.overlapping_students_score = 0
+        self.room_overfitting_score = 0
+        self.duplicate_course_events_score = 0
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(value:{self.value}, malus_score:{self.get_malus_score()})'
+
+    def add_event(self, event: Event) -> None:
+        """
+        Add the malus score components of a single event.
+        """
+        for student in event.students:
+            count = self.student_counts.get(student.student_id, 0)
+            if count > 0:
+                self.overlapping_students_score += 1
+            self.student_counts[student.student_id] = count + 1
+
+        count = self.course_counts.get(event.course.name, 0)
+        if count > 0:
+            self.duplicate_course_events_score += 1
+        self.course_counts[event.course.name] = count + 1
+
+        self.room_overfitting_score += max(0, len(event.students) - event.room.capacity)
+
+        if event.room.is_largest:
+            self.largest_room_events += 1
+
+    def remove_event(self, event: Event) -> None:
+        """
+        Remove the malus score components of a single event.
+        """
+        for student in event.students:
+            count = self.student_counts[student.student_id]
+            if count > 1:
+                self.overlapping_students_score -= 1
+                self.student_counts[student.student_id] = count - 1
+            else:
+                del self.student_counts[student.student_id]
+
+        count = self.course_counts[event.course.name]
+        if count > 1:
+            self.duplicate_course_events_score -= 1
+            self.course_counts[event.course.name] = count - 1
+        else:
+            del self.course_counts[event.course.name]
+
+        self.room_overfitting_score -= max(0, len(event.students) - event.room.capacity)
+
+        if event.room.is_largest:
+            self.largest_room_events -= 1
+
+    def copy(self) -> 'TimeslotScore':
+        """
+        Create a copy of the score that can be changed independently.
+        """
+        score = TimeslotScore(self.value)
+        score.student_counts = dict(self.student_counts)
+        score.course_counts = dict(self.course_counts)
+        score.largest_room_events = self.largest_room_events
+        score.overlapping_students_score = self.overlapping_students_score
+        score.room_overfitting_score = self.room_overfitting_score
+        score.duplicate_course_events_score = self.duplicate_course_events_score
+        return score
+
+    def get_timeslot_17_malus_score(self) -> int:
+        """
+        Get the malus score for booking the largest room from 17:00 - 19:00.
+        """
+        return 5 if self.value == 17 and self.largest_room_events > 0 else 0
+
+    def get_malus_score(self) -> int:
+        """
+        Get the total malus score for this timeslot.
+        """
+        return self.get_timeslot_17_malus_score() + \
+            self.overlapping_students_score + \
+            self.room_overfitting_score + \
+            self.duplicate_course_events_score
@@ -1,28 +1,43 @@
-from collections.abc import Generator
+import bisect
+from collections.abc import Generator, Hashable, Mapping, Sequence
 import copy
-import csv
-from datetime import datetime, timedelta
-import itertools
 import json
 import logging
-import os
-import re
-import ics
+import math
+import random
+from typing import Any, Union
 import matplotlib.pyplot as plt
 import networkx as nx
 
+from code.entities.course import Course
 from code.entities.event import Event
+from code.entities.problem_instance import ProblemInstance
 from code.entities.room import Room
-from code.entities.timeslot import Timeslot
-from code.utils.constants import OUT_DIR
+from code.entities.student import Student
+from code.entities.timeslot import Timeslot, TimeslotScore
+from code.entities.timetable_day import TimetableDay
+from code.entities.timetable_io import TimetableIO
 from code.utils.data import load_courses, load_rooms, load_students
-from code.utils.enums import Weekdays
-from code.utils.helpers import get_utc_offset, remove_duplicates, serialize
+from code.utils.decorators import cached_by_version
+from code.utils.enums import EventType, Weekdays
+from code.utils.helpers import mix_hash, remove_duplicates, serialize, zobrist_key
+from code.utils.structures import IndexedSet
 
 
-TimetableDay = dict[int, Timeslot]
 TimetableList = list[TimetableDay]
 
+# The timeslots of a single student per day, i.e. [{ 9: Timeslot(...) }, ...].
+StudentTimetable = list[dict[int, Timeslot]]
+
+# A timeslot is identified by its weekday and timeslot value, i.e. (1, 9).
+TimeslotKey = tuple[int, int]
+
+# A student that moves from one event to another event.
+StudentMove = tuple[Student, Event, Event]
+
+# The weekday, timeslot value and room of an event.
+EventPlacement = tuple[int, int, Room]
+
 
 class Timetable:
     """
@@ -53,47 +68,338 @@ class Timetable:
     MAX_TIMESLOTS_PER_WEEK = 145
     DAYS_PER_WEEK = 5
 
+    # The suffix of the title of an event per event type.
+    EVENT_TITLES = {
+        EventType.LECTURE: 'hoorcollege',
+        EventType.SEMINAR: 'werkcollege',
+        EventType.PRACTICUM: 'practicum',
+    }
+
     def __init__(self,
                  load_rooms=load_rooms,
                  load_courses=load_courses,
-                 load_students=load_students) -> None:
+                 load_students=load_students,
+                 problem: Union[ProblemInstance, None] = None) -> None:
         self.logger = logging.getLogger(__name__)
 
         self.timetable: TimetableList = self.new_timetable()
-        self.rooms = load_rooms()
-        self.courses = load_courses()
-        self.students = load_students()
 
-        self.set_course_conflicts()
-        self.register_students_to_courses()
+        # The rooms, courses and students are shared with the other timetables
+        # until this timetable changes them, so pass the same problem instance
+        # to each timetable instead of loading it again.
+        self.problem = problem if problem is not None else ProblemInstance.load(load_rooms, load_courses, load_students)
+        self.owns_problem = False
+
+        # The ids of the events and students that have been affected by an
+        # incremental update, which limits the search that repairs them.
+        self.dirty_event_ids: set[int] = set()
+        self.dirty_student_ids: set[str] = set()
+
+        self.reset_indexes()
+        self.reset_ownership()
+        self.reset_score_cache()
+
+    @property
+    def rooms(self) -> Sequence[Room]:
+        return self.problem.rooms
+
+    @property
+    def courses(self) -> Sequence[Course]:
+        return self.problem.courses
+
+    @property
+    def students(self) -> Sequence[Student]:
+        return self.problem.students
+
+    @property
+    def conflicting_course_names(self) -> Mapping[str, Sequence[str]]:
+        return self.problem.conflicting_course_names
 
-    def set_course_conflicts(self) -> None:
+    def __deepcopy__(self, memo: dict[int, Any]) -> 'Timetable':
         """
-        Create a graph where each vertice represents a course and the edge in
-        between two vertices indicates that there is at least one student
-        enrolled in both courses, meaning that all neighbors for a node in the
-        graph represent the conflicting courses for a course respectively.
+        Copy the events and indexes of the timetable, while the problem
+        instance is shared with the copy.
         """
-        # Create the graph.
-        network = nx.Graph()
-        network.add_nodes_from([course.name for course in self.courses])
+        timetable = self.__class__.__new__(self.__class__)
+        memo[id(self)] = timetable
 
-        # Get all courses that are overlapping for each student.
-        list_of_overlaps = [student.enrolled_courses for student in self.students]
+        for key, value in self.__dict__.items():
+            if key != 'score_cache':
+                setattr(timetable, key, copy.deepcopy(value, memo))
 
-        # Create each possible combination per overlap and add it as an edge.
-        for courses in list_of_overlaps:
-            for pair in itertools.combinations(courses, 2):
-                network.add_edge(pair[0], pair[1])
+        timetable.owns_problem = False
+        timetable.reset_ownership()
+        timetable.reset_score_cache()
+        return timetable
 
-        # Gather the data that was generated inside the graph.
-        course_conflicts = {}
-        for course_name in list(network.nodes):
-            course_conflicts[course_name] = sorted(list(network[course_name].keys()))
+    def __getstate__(self) -> dict[str, Any]:
+        """
+        Pickle the timetable without the originals of the copied events, since
+        the pickled timetable does not share anything anymore, and without the
+        cached scores.
+        """
+        state = dict(self.__dict__)
+        state['is_shared'] = False
+        state['owned'] = set()
+        state['event_copies'] = {}
+        state['score_cache'] = {}
+        return state
+
+    def own_problem(self) -> None:
+        """
+        Replace the shared problem instance by a copy that is only used by this
+        timetable, which has to be done before the problem data is changed.
+        The scheduled events then use the rooms, courses and students of the
+        copy as well.
+        """
+        if self.owns_problem:
+            return
 
-        # Assign the corresponding conflicting courses to each course.
-        for course in self.courses:
-            course.set_conflicting_courses(course_conflicts[course.name])
+        for day_index, day in enumerate(self.timetable):
+            for hour in list(day):
+                self.own_timeslot(day_index + 1, hour)
+
+        memo: dict[int, Any] = {}
+        self.problem = self.problem.copy(memo)
+        self.owns_problem = True
+
+        for event in self.get_events():
+            event.course = memo.get(id(event.course), event.course)
+            event.room = memo.get(id(event.room), event.room)
+            event.students = [memo.get(id(student), student) for student in event.students]
+
+    def reset_ownership(self) -> None:
+        """
+        Mark all the days, timeslots, events and indexes as owned by this
+        timetable, meaning they are not shared with a snapshot.
+        """
+        self.is_shared = False
+
+        # The shared containers that have been copied since the last snapshot.
+        self.owned: set[Hashable] = set()
+
+        # The events that have been copied since the last snapshot, per id of
+        # the original event, which are used to find the copy of an event that
+        # was taken from this timetable before it was copied. The placement of
+        # the original is kept to notice when the original has been changed.
+        self.event_copies: dict[int, tuple[Event, Event, EventPlacement]] = {}
+
+    def snapshot(self) -> 'Timetable':
+        """
+        Create a copy of the timetable that shares the days, timeslots, events
+        and indexes with this timetable. Both timetables copy a part only right
+        before they change it (copy-on-write), so a snapshot costs nothing and
+        each change only copies the timeslots it touches.
+
+        Events that have been taken from a timetable before a snapshot must be
+        taken again after the snapshot.
+        """
+        timetable = copy.copy(self)
+        timetable.dirty_event_ids = set(self.dirty_event_ids)
+        timetable.dirty_student_ids = set(self.dirty_student_ids)
+        timetable.score_cache = dict(self.score_cache)
+        timetable.owns_problem = False
+
+        for t in [self, timetable]:
+            t.reset_ownership()
+            t.is_shared = True
+
+        return timetable
+
+    def own(self, name: str) -> None:
+        """
+        Copy one of the top level containers if it is shared with a snapshot,
+        which are the list of days and the indexes.
+        """
+        if not self.is_shared or name in self.owned:
+            return
+
+        self.owned.add(name)
+        value = getattr(self, name)
+        setattr(self, name, value.copy())
+
+    def own_day(self, weekday: int) -> TimetableDay:
+        """
+        Copy the timeslots of a day if they are shared with a snapshot.
+        """
+        if self.is_shared and ('day', weekday) not in self.owned:
+            self.own('timetable')
+            self.owned.add(('day', weekday))
+            self.timetable[weekday - 1] = self.timetable[weekday - 1].copy()
+
+        return self.timetable[weekday - 1]
+
+    def own_course_events(self, key: tuple[str, EventType]) -> list[Event]:
+        """
+        Copy the list of scheduled events of a course and event type if it is
+        shared with a snapshot.
+        """
+        if self.is_shared and ('course_events', key) not in self.owned:
+            self.own('course_events')
+            self.owned.add(('course_events', key))
+            if key in self.course_events:
+                self.course_events[key] = list(self.course_events[key])
+
+        return self.course_events.setdefault(key, [])
+
+    def own_saturation_degrees(self, course_name: str) -> dict[TimeslotKey, int]:
+        """
+        Copy the saturation degrees of a course if they are shared with a
+        snapshot.
+        """
+        if self.is_shared and ('saturation_degrees', course_name) not in self.owned:
+            self.own('saturation_degrees')
+            self.owned.add(('saturation_degrees', course_name))
+            if course_name in self.saturation_degrees:
+                self.saturation_degrees[course_name] = dict(self.saturation_degrees[course_name])
+
+        return self.saturation_degrees.setdefault(course_name, {})
+
+    def own_timeslot(self, weekday: int, hour: int) -> None:
+        """
+        Copy a timeslot with its events and score if it is shared with a
+        snapshot, which is done for an empty timeslot as well. The copied events
+        replace the original events in the course events index as well.
+        """
+        if not self.is_shared or ('timeslot', weekday, hour) in self.owned:
+            return
+
+        self.owned.add(('timeslot', weekday, hour))
+        day = self.own_day(weekday)
+
+        events = []
+        for event in day.get_timeslot(hour):
+            event_copy = copy.deepcopy(event)
+            self.event_copies[id(event)] = (event, event_copy, (event.weekday, event.timeslot, event.room))
+            events.append(event_copy)
+
+            self.own('events_by_id')
+            self.events_by_id[event.id] = event_copy
+
+            course_events = self.own_course_events((event.course.name, event.type))
+            for index, course_event in enumerate(course_events):
+                if course_event is event:
+                    course_events[index] = event_copy
+                    break
+
+        day.set_timeslot(Timeslot(hour, weekday, events))
+
+        key = (weekday, hour)
+        if key in self.timeslot_scores:
+            self.own('timeslot_scores')
+            self.timeslot_scores[key] = self.timeslot_scores[key].copy()
+
+    def own_event(self, event: Event) -> Event:
+        """
+        Copy the timeslot of a scheduled event if it is shared with a snapshot.
+
+        :returns: The event as it is scheduled in this timetable, which is a
+                  copy if the event was taken before its timeslot was copied.
+        """
+        assert event.weekday is not None, 'weekday must be set'
+        assert event.timeslot is not None, 'timeslot must be set'
+
+        self.own_timeslot(event.weekday, event.timeslot)
+        return self.resolve_event(event)
+
+    def resolve_event(self, event: Event) -> Event:
+        """
+        Get the copy of an event that has been copied since the last snapshot,
+        or the event itself.
+        """
+        if id(event) in self.event_copies:
+            return self.event_copies[id(event)][1]
+
+        return event
+
+    def assert_scheduled(self, event: Event) -> None:
+        """
+        Assert that an event is scheduled in this timetable itself, rather than
+        an event that is only scheduled in a snapshot, which would otherwise
+        change the snapshot as well.
+        """
+        assert self.events_by_id.get(event.id) is event, \
+            f'event {event.id} is not scheduled in this timetable, take it from this timetable again after a snapshot'
+
+    def reset_score_cache(self) -> None:
+        """
+        Reset the version and the scores that have been calculated for it.
+        """
+        # The version is bumped by each change to the events, which invalidates
+        # the cached scores of the previous version.
+        self.version = 0
+        self.score_cache: dict[str, tuple[int, Any]] = {}
+
+    def bump_version(self) -> None:
+        """
+        Mark the events as changed, which invalidates the cached scores.
+        """
+        self.version += 1
+
+    def get_event_hash(self, event: Event) -> int:
+        """
+        Get the Zobrist hash of a scheduled event, which combines the key of
+        its day, timeslot and room with the keys of its students.
+
+        The groups of a course have the same title, so the keys are mixed to
+        tell apart two groups that swapped their timeslots or rooms.
+        """
+        assert event.room is not None, 'room must be set'
+
+        key = (event.course.name, event.type.value, event.title)
+        students_hash = 0
+        for student in event.students:
+            students_hash ^= zobrist_key(*key, student.student_id)
+
+        return mix_hash(zobrist_key(*key, event.weekday, event.timeslot, event.room.location_id) ^ students_hash)
+
+    def add_state_hash(self, event: Event) -> None:
+        """
+        Add the hash of a scheduled event to the state hash.
+
+        The hashes are added rather than combined with XOR, since two events
+        with the same course, title, timeslot, room and students have the same
+        hash and would otherwise cancel each other out.
+        """
+        self.state_hash = (self.state_hash + self.get_event_hash(event)) & 0xffffffffffffffff
+
+    def remove_state_hash(self, event: Event) -> None:
+        """
+        Subtract the hash of a removed event from the state hash.
+        """
+        self.state_hash = (self.state_hash - self.get_event_hash(event)) & 0xffffffffffffffff
+
+    def reset_indexes(self) -> None:
+        """
+        Reset the indexes that are kept up to date while events are added to
+        and removed from the timetable.
+        """
+        # The malus score components for each timeslot that contains events.
+        self.timeslot_scores: dict[TimeslotKey, TimeslotScore] = {}
+
+        # The timeslots that have a malus score higher than zero.
+        self.malus_timeslots = IndexedSet()
+
+        # The saturation degree per course name for each timeslot, which is the
+        # number of conflicting courses that are scheduled in that timeslot.
+        self.saturation_degrees: dict[str, dict[TimeslotKey, int]] = {}
+
+        # The booked rooms for each timeslot that contains events, where each
+        # room is a bit in the room mask of the problem instance.
+        self.room_occupancy: dict[TimeslotKey, int] = {}
+
+        # The ids of the scheduled events, which are sampled at random, and the
+        # scheduled event for each id.
+        self.event_ids = IndexedSet()
+        self.events_by_id: dict[int, Event] = {}
+
+        # The scheduled events per course name and event type.
+        self.course_events: dict[tuple[str, EventType], list[Event]] = {}
+
+        # The sum of the Zobrist hashes of the scheduled events (modulo 2^64),
+        # which is the same for each timetable with the same schedule and
+        # student groups.
+        self.state_hash = 0
 
     def calculate_saturation_degree_for_unscheduled_event(self, event: Event) -> int:
         """
@@ -160,13 +466,32 @@ class Timetable:
 
         return events
 
-    def register_students_to_courses(self):
+    def get_event(self, event_id: int) -> Union[Event, None]:
         """
-        Register all the students to the courses that they signed up for.
+        Get a scheduled event by its id, or None if there is no such event.
         """
-        for course in self.courses:
-            students = [s for s in self.students if course.name in s.enrolled_courses]
-            course.register_students(students)
+        return self.events_by_id.get(event_id)
+
+    def get_random_event(self, exclude: Union[Event, None] = None) -> Event:
+        """
+        Get a uniformly chosen random scheduled event, other than the excluded
+        event if given.
+        """
+        if exclude is None:
+            return self.events_by_id[self.event_ids.choice()]
+
+        assert len(self.event_ids) >= 2, 'there must be another event to choose from'
+
+        while True:
+            event_id = self.event_ids.choice()
+            if event_id != exclude.id:
+                return self.events_by_id[event_id]
+
+    def get_random_events(self, k: int) -> list[Event]:
+        """
+        Get k different uniformly chosen random scheduled events.
+        """
+        return [self.events_by_id[event_id] for event_id in self.event_ids.sample(k)]
 
     def add_event(self, event: Event) -> None:
         """
@@ -175,28 +500,326 @@ class Timetable:
         assert event.weekday is not None, 'weekday must be set'
         assert event.timeslot is not None, 'timeslot must be set'
 
-        weekday = self.timetable[event.weekday - 1]
+        # An event that was copied for this timetable is added as that copy,
+        # since the original is still used by a snapshot, so the original must
+        # not have been moved instead of the copy.
+        if id(event) in self.event_copies:
+            _, event_copy, placement = self.event_copies[id(event)]
+            assert (event.weekday, event.timeslot, event.room) == placement, \
+                f'event {event.id} belongs to a snapshot, change the event that remove_event() returns instead'
+            event = event_copy
+
+        assert event.id not in self.events_by_id, f'event {event.id} is already scheduled'
+
+        self.own_timeslot(event.weekday, event.timeslot)
+        self.timetable[event.weekday - 1].get_timeslot(event.timeslot).add_event(event)
+        self.update_room_occupancy(event.weekday, event.timeslot)
+
+        self.own('event_ids')
+        self.own('events_by_id')
+        self.event_ids.add(event.id)
+        self.events_by_id[event.id] = event
+        self.add_event_score(event)
+        self.own_course_events((event.course.name, event.type)).append(event)
+        self.add_state_hash(event)
+        self.bump_version()
+
+    def remove_event(self, event: Event) -> Event:
+        """
+        Remove a single event from the timetable.
+
+        :returns: The event that has been removed, which is a copy if the given
+                  event was taken before a snapshot, so that one has to be
+                  changed before adding it again.
+        """
+        assert event.weekday is not None, 'weekday must be set'
+        assert event.timeslot is not None, 'timeslot must be set'
+
+        event = self.own_event(event)
+        self.assert_scheduled(event)
+        self.timetable[event.weekday - 1].get_timeslot(event.timeslot).remove_event(event)
+        self.update_room_occupancy(event.weekday, event.timeslot)
+        self.remove_event_score(event)
 
-        if event.timeslot not in weekday:
-            weekday[event.timeslot] = Timeslot(event.timeslot, event.weekday)
+        self.own('event_ids')
+        self.own('events_by_id')
+        self.event_ids.remove(event.id)
+        del self.events_by_id[event.id]
 
-            # Sort the timeslots in ascending order.
-            self.timetable[event.weekday - 1] = dict(sorted(weekday.items()))
+        # Remove the event by identity, since events are compared by value.
+        course_events = self.own_course_events((event.course.name, event.type))
+        for index, course_event in enumerate(course_events):
+            if course_event is event:
+                del course_events[index]
+                break
 
-        weekday[event.timeslot].add_event(event)
+        self.remove_state_hash(event)
+        self.bump_version()
 
-    def remove_event(self, event: Event) -> None:
+        return event
+
+    def assign_students(self, event: Event, students: list[Student]) -> None:
         """
-        Remove a single event from the timetable.
+        Assign new students to an event that is scheduled in the timetable.
+
+        Scheduled events must not be changed directly, because the timetable
+        keeps track of the scores for each timeslot.
         """
-        assert event.weekday is not None, 'weekday must be set'
-        assert event.timeslot is not None, 'timeslot must be set'
+        event = self.own_event(event)
+        self.assert_scheduled(event)
+        self.remove_event_score(event)
+        self.remove_state_hash(event)
+        event.assign_students(students)
+        self.add_event_score(event)
+        self.add_state_hash(event)
+
+        self.timetable[event.weekday - 1].get_timeslot(event.timeslot).bump_version()
+        self.bump_version()
+
+    def move_students(self, moves: list[StudentMove]) -> None:
+        """
+        Move students from one scheduled event to another scheduled event.
+        """
+        groups: dict[int, tuple[Event, list[Student]]] = {}
+
+        for student, event, other_event in moves:
+            for e in [event, other_event]:
+                if id(e) not in groups:
+                    groups[id(e)] = (e, list(e.students))
+
+            groups[id(event)][1].remove(student)
+            groups[id(other_event)][1].append(student)
+
+        for event, students in groups.values():
+            self.assign_students(event, students)
+
+    def get_course_events(self, course: Course, event_type: EventType) -> list[Event]:
+        """
+        Get the scheduled events of a certain type for a single course.
+        """
+        return self.course_events.get((course.name, event_type), [])
+
+    def get_student_day_timeslots(self, student: Student, weekday: int) -> list[int]:
+        """
+        Get the timeslot values in which a student has at least one event on a
+        certain weekday.
+        """
+        timeslots = []
+
+        for hour in self.timetable[weekday - 1]:
+            if student.student_id in self.timeslot_scores[(weekday, hour)].student_counts:
+                timeslots.append(hour)
+
+        return timeslots
+
+    def calculate_empty_timeslots_score(self, timeslots: list[int]) -> tuple[int, int]:
+        """
+        Calculate the amount of violations and the malus score for the empty
+        timeslots in a single day of a student, where 1 empty timeslot gives 1
+        malus point, 2 empty timeslots give 3 malus points and 3 or more empty
+        timeslots are a violation.
+        """
+        violations = 0
+        score = 0
+
+        timeslots = sorted(timeslots)
+        for index in range(1, len(timeslots)):
+            total_empty_timeslots = int((timeslots[index] - timeslots[index - 1] - Timeslot.TIMEFRAME) / Timeslot.TIMEFRAME)
+            if total_empty_timeslots == 1:
+                score += 1
+            elif total_empty_timeslots == 2:
+                score += 3
+            elif total_empty_timeslots >= 3:
+                violations += 1
+
+        return violations, score
+
+    def calculate_move_students_delta(self, moves: list[StudentMove]) -> tuple[int, int]:
+        """
+        Calculate how the violations and malus score change when moving
+        students from one scheduled event to another, using only the day
+        schedules of the moved students rather than the whole timetable.
+
+        The violations delta is the change in the amount of student days that
+        contain 3 or more empty timeslots.
+
+        :returns: Tuple with the violations delta and malus score delta.
+        """
+        violations_delta = 0
+        malus_delta = 0
+
+        # Room capacity: each student too much in a room adds one malus point.
+        group_sizes: dict[int, tuple[Event, int]] = {}
+        for _, event, other_event in moves:
+            size = group_sizes.get(id(event), (event, len(event.students)))[1]
+            group_sizes[id(event)] = (event, size - 1)
+
+            size = group_sizes.get(id(other_event), (other_event, len(other_event.students)))[1]
+            group_sizes[id(other_event)] = (other_event, size + 1)
+
+        for event, size in group_sizes.values():
+            malus_delta += max(0, size - event.room.capacity) - max(0, len(event.students) - event.room.capacity)
+
+        for student, event, other_event in moves:
+            key = (event.weekday, event.timeslot)
+            other_key = (other_event.weekday, other_event.timeslot)
+            if key == other_key:
+                continue
+
+            # Overlapping courses: each extra event in a timeslot for the same
+            # student adds one malus point.
+            if self.timeslot_scores[key].student_counts[student.student_id] > 1:
+                malus_delta -= 1
+            if student.student_id in self.timeslot_scores[other_key].student_counts:
+                malus_delta += 1
+
+            # Empty timeslots: compare the affected days before and after.
+            weekdays = remove_duplicates([event.weekday, other_event.weekday])
+            for weekday in weekdays:
+                timeslots = self.get_student_day_timeslots(student, weekday)
+                new_timeslots = list(timeslots)
+
+                if weekday == event.weekday and self.timeslot_scores[key].student_counts[student.student_id] == 1:
+                    new_timeslots.remove(event.timeslot)
+                if weekday == other_event.weekday and other_event.timeslot not in new_timeslots:
+                    new_timeslots.append(other_event.timeslot)
+
+                violations, score = self.calculate_empty_timeslots_score(timeslots)
+                new_violations, new_score = self.calculate_empty_timeslots_score(new_timeslots)
+                violations_delta += new_violations - violations
+                malus_delta += new_score - score
+
+        return violations_delta, malus_delta
+
+    def get_day_violations(self, weekday: int) -> list[Event]:
+        """
+        Get the events on a single weekday that violate the constraints, which
+        are the events of that weekday in `get_violations()`.
+        """
+        day = self.timetable[weekday - 1]
+        violations = []
+
+        for timeslot in day.values():
+            violations += timeslot.get_violations()
+
+        # A student can only have 3 empty timeslots in-between two events when
+        # those are at 9:00 and 17:00 without any events in-between, where the
+        # 17:00 event is the violation.
+        if 17 in day and 9 in day:
+            first_student_counts = self.timeslot_scores[(weekday, 9)].student_counts
+            other_student_counts = [self.timeslot_scores[(weekday, hour)].student_counts for hour in (11, 13, 15) if hour in day]
+            for event in day[17]:
+                if any(
+                    student.student_id in first_student_counts and \
+                    all(student.student_id not in student_counts for student_counts in other_student_counts)
+                    for student in event.students
+                ):
+                    violations.append(event)
+
+        return remove_duplicates(violations)
+
+    def calculate_local_score(self, events: list[Event]) -> tuple[int, int]:
+        """
+        Calculate the violations and malus score of only the part of the
+        timetable that changes when the given events are moved or swapped
+        between their timeslots, which are the violations on their weekdays and
+        the malus score of their timeslots and of the days of their students.
+        The difference of the local scores before and after such a move is the
+        same as the difference of the full scores.
+
+        :returns: Tuple with the violations and malus score.
+        """
+        keys = remove_duplicates([(event.weekday, event.timeslot) for event in events])
+        weekdays = remove_duplicates([event.weekday for event in events])
+        students = {student.student_id: student for event in events for student in event.students}
+
+        violations = 0
+        for weekday in weekdays:
+            violations += len(self.get_day_violations(weekday))
+
+        malus_score = 0
+        for key in keys:
+            if key in self.timeslot_scores:
+                malus_score += self.timeslot_scores[key].get_malus_score()
+
+        for student in students.values():
+            for weekday in weekdays:
+                _, score = self.calculate_empty_timeslots_score(self.get_student_day_timeslots(student, weekday))
+                malus_score += score
+
+        return violations, malus_score
+
+    def add_event_score(self, event: Event) -> None:
+        """
+        Update the timeslot score and saturation degrees for an added event.
+        """
+        key = (event.weekday, event.timeslot)
+        self.own_timeslot(event.weekday, event.timeslot)
+
+        if key not in self.timeslot_scores:
+            self.own('timeslot_scores')
+            self.timeslot_scores[key] = TimeslotScore(event.timeslot)
+
+        score = self.timeslot_scores[key]
+        score.add_event(event)
+
+        # The first event of a course increases the saturation degree of each
+        # course that conflicts with it.
+        if score.course_counts[event.course.name] == 1:
+            for course_name in self.conflicting_course_names.get(event.course.name, []):
+                degrees = self.own_saturation_degrees(course_name)
+                degrees[key] = degrees.get(key, 0) + 1
+
+        self.update_malus_timeslots(key)
+
+    def remove_event_score(self, event: Event) -> None:
+        """
+        Update the timeslot score and saturation degrees for a removed event.
+        """
+        key = (event.weekday, event.timeslot)
+        self.own_timeslot(event.weekday, event.timeslot)
+        score = self.timeslot_scores[key]
+        score.remove_event(event)
 
-        timeslot = self.timetable[event.weekday - 1][event.timeslot]
-        timeslot.remove_event(event)
+        # The last event of a course decreases the saturation degree of each
+        # course that conflicts with it.
+        if event.course.name not in score.course_counts:
+            for course_name in self.conflicting_course_names.get(event.course.name, []):
+                self.own_saturation_degrees(course_name)[key] -= 1
 
-        if len(timeslot) == 0:
-            del self.timetable[event.weekday - 1][event.timeslot]
+        if len(score.course_counts) == 0:
+            self.own('timeslot_scores')
+            del self.timeslot_scores[key]
+
+        self.update_malus_timeslots(key)
+
+    def update_malus_timeslots(self, key: TimeslotKey) -> None:
+        """
+        Keep track of whether a timeslot has a malus score higher than zero.
+        """
+        is_malus_timeslot = key in self.timeslot_scores and self.timeslot_scores[key].get_malus_score() > 0
+        if is_malus_timeslot != (key in self.malus_timeslots):
+            self.own('malus_timeslots')
+
+        if is_malus_timeslot:
+            self.malus_timeslots.add(key)
+        else:
+            self.malus_timeslots.discard(key)
+
+    def get_random_malus_timeslot(self) -> Timeslot:
+        """
+        Get a random timeslot that has a malus score higher than zero.
+        """
+        weekday, hour = self.malus_timeslots.choice()
+        return self.timetable[weekday - 1][hour]
+
+    def get_saturation_degree(self, course: Course, timeslot: Timeslot) -> int:
+        """
+        Get the saturation degree of a course for a scheduled timeslot, which is
+        the same as `Timeslot.get_saturation_degree_for_course()`.
+        """
+        degrees = self.saturation_degrees.get(course.name, {})
+        return degrees.get((timeslot.weekday, timeslot.value), 0)
 
     def remove_events(self, events: list[Event]) -> None:
         """
@@ -222,6 +845,7 @@ class Timetable:
 
         return total
 
+    @cached_by_version
     def calculate_empty_timeslots_malus_score(self) -> int:
         """
         Calculate malus score for the empty timeslots per student timetable.
@@ -245,6 +869,7 @@ class Timetable:
 
         return score
 
+    @cached_by_version
     def calculate_malus_score(self) -> int:
         """
         Calculates the malus score for the timetable.
@@ -261,6 +886,92 @@ class Timetable:
 
         return score
 
+    def get_lecture_clique(self) -> list[str]:
+        """
+        Get the names of the courses in the heaviest clique of the course
+        conflict graph, where each course weighs its amount of lectures. All
+        enrolled students attend each lecture, so any two lectures of these
+        courses in the same timeslot share at least one student.
+        """
+        course_names = [course.name for course in self.courses]
+
+        network = nx.Graph()
+        for course in self.courses:
+            weight = course.lectures_amount if len(course.enrolled_students) > 0 else 0
+            network.add_node(course.name, weight=weight)
+            for course_name in course.conflicting_courses:
+                if course_name in course_names:
+                    network.add_edge(course.name, course_name)
+
+        clique, _ = nx.max_weight_clique(network, weight='weight')
+
+        return clique
+
+    def calculate_room_overfitting_lower_bound(self) -> int:
+        """
+        Calculate the room capacity malus score that can't be avoided, because
+        some events have more students than the largest room can hold.
+        """
+        largest_capacity = max(room.capacity for room in self.rooms)
+        score = 0
+
+        for course in self.courses:
+            enrolment = len(course.enrolled_students)
+            score += course.lectures_amount * max(0, enrolment - largest_capacity)
+
+            # Students can be divided over the groups in any way, but all of
+            # them have to fit in the rooms of their groups together.
+            for amount, capacity in [(course.seminars_amount, course.seminar_capacity),
+                                     (course.practicals_amount, course.practical_capacity)]:
+                if amount > 0 and enrolment > 0:
+                    total_groups = math.ceil(enrolment / capacity)
+                    score += amount * max(0, enrolment - total_groups * largest_capacity)
+
+        return score
+
+    def calculate_timeslot_17_lower_bound(self) -> int:
+        """
+        Calculate the timeslot 17 malus score that can't be avoided, because
+        there are more events than the timeslots from 9 until 17 can hold.
+        """
+        total_events = 0
+        for course in self.courses:
+            enrolment = len(course.enrolled_students)
+            total_events += course.lectures_amount
+
+            if course.seminars_amount > 0 and enrolment > 0:
+                total_events += course.seminars_amount * math.ceil(enrolment / course.seminar_capacity)
+
+            if course.practicals_amount > 0 and enrolment > 0:
+                total_events += course.practicals_amount * math.ceil(enrolment / course.practical_capacity)
+
+        available_timeslots = self.DAYS_PER_WEEK * (len(Timeslot.OPTIONS) - 1) * len(self.rooms)
+
+        return 5 * max(0, total_events - available_timeslots)
+
+    def calculate_overlapping_students_lower_bound(self) -> int:
+        """
+        Calculate the overlapping student courses malus score that can't be
+        avoided. Each pair of lectures of the courses in the lecture clique
+        shares a student, so a timeslot with n of these lectures adds at least
+        n - 1 malus points.
+        """
+        clique = self.get_lecture_clique()
+        total_lectures = sum(course.lectures_amount for course in self.courses if course.name in clique)
+        total_timeslots = self.DAYS_PER_WEEK * len(Timeslot.OPTIONS)
+
+        return max(0, total_lectures - total_timeslots)
+
+    def compute_lower_bound(self) -> int:
+        """
+        Compute a malus score that no timetable for these courses, rooms and
+        students can go below, which allows algorithms to stop as soon as they
+        found a solution with this score.
+        """
+        return self.calculate_room_overfitting_lower_bound() + \
+            self.calculate_timeslot_17_lower_bound() + \
+            self.calculate_overlapping_students_lower_bound()
+
     def is_solution(self) -> bool:
         """
         Check if the timetable structure is valid by checking constraints.
@@ -283,7 +994,8 @@ class Timetable:
 
         return list(course_events.values())
 
-    def get_student_timetables(self) -> dict[str, TimetableList]:
+    @cached_by_version
+    def get_student_timetables(self) -> dict[str, StudentTimetable]:
         """
         Group all events by student is where each key is the student is and the
         value is a personal timetable list.
@@ -313,7 +1025,7 @@ class Timetable:
                 for event in timeslot:
                     for student in event.students:
                         if student.student_id not in student_timetables:
-                            student_timetables[student.student_id] = self.new_timetable()
+                            student_timetables[student.student_id] = [{} for _ in range(self.DAYS_PER_WEEK)]
                         if hour not in student_timetables[student.student_id][day_index]:
                             student_timetables[student.student_id][day_index][hour] = Timeslot(hour, day_index + 1)
                         if event not in student_timetables[student.student_id][day_index][hour]:
@@ -332,6 +1044,7 @@ class Timetable:
         """
         return int((abs(timeslot.value - prev_timeslot.value) - Timeslot.TIMEFRAME) / Timeslot.TIMEFRAME)
 
+    @cached_by_version
     def get_empty_timeslot_violations(self) -> list[Event]:
         """
         Go through each day of the week and check per student if that day
@@ -362,6 +1075,7 @@ class Timetable:
 
         return remove_duplicates(violations)
 
+    @cached_by_version
     def get_violations(self) -> list[Event]:
         """
         Find the events that violate the constraints.
@@ -379,33 +1093,170 @@ class Timetable:
         return remove_duplicates(violations)
 
     def new_timetable(self) -> TimetableList:
-        return [{}, {}, {}, {}, {}]
+        return [TimetableDay(weekday) for weekday in range(1, self.DAYS_PER_WEEK + 1)]
 
     def clear(self) -> None:
         """
         Remove all data from the timetable.
         """
         self.timetable = self.new_timetable()
+        self.reset_indexes()
+        self.reset_ownership()
+        self.bump_version()
+
+    def update_room_occupancy(self, weekday: int, hour: int) -> None:
+        """
+        Update the booked rooms of a timeslot after its events have changed.
+        """
+        self.own('room_occupancy')
+
+        events = self.timetable[weekday - 1].get_timeslot(hour).events
+        if len(events) > 0:
+            self.room_occupancy[(weekday, hour)] = self.problem.get_room_mask([event.room for event in events])
+        else:
+            self.room_occupancy.pop((weekday, hour), None)
+
+    def reset_room_occupancy(self) -> None:
+        """
+        Update the booked rooms of all timeslots, which has to be done when the
+        rooms have changed.
+        """
+        self.room_occupancy = {}
+        self.owned.add('room_occupancy')
+
+        for weekday, day in enumerate(self.timetable, 1):
+            for hour in day:
+                self.update_room_occupancy(weekday, hour)
+
+    def get_available_room_mask(self, weekday: int, hour: int) -> int:
+        """
+        Get the mask of the rooms that can still be booked in a timeslot.
+        """
+        if hour == 17:
+            # If there is already an event, then there are no more options,
+            # otherwise the largest room is an option.
+            if len(self.timetable[weekday - 1].get_timeslot(hour).events) == 1:
+                return 0
+
+            return self.problem.largest_rooms_mask
+
+        return self.problem.all_rooms_mask & ~self.room_occupancy.get((weekday, hour), 0)
+
+    def find_available_room(self, weekday: int, hour: int, capacity: int, fallback: bool = False) -> Union[Room, None]:
+        """
+        Find the smallest room that can still be booked in a timeslot and has
+        at least the given capacity.
+
+        :param fallback: Use the largest available room if none of them fits.
+        :returns: The room, or None if there is no such room.
+        """
+        available = self.get_available_room_mask(weekday, hour)
+
+        # The rooms are sorted by capacity, so the bits from the first room that
+        # fits upwards are the rooms that fit, of which the lowest is smallest.
+        index = bisect.bisect_left(self.problem.room_capacities, capacity)
+        suitable = available >> index << index
+
+        if suitable != 0:
+            return self.problem.rooms_by_capacity[(suitable & -suitable).bit_length() - 1]
+        elif fallback and available != 0:
+            return self.problem.rooms_by_capacity[available.bit_length() - 1]
+
+        return None
 
     def get_available_timeslot_rooms(self, timeslot: Timeslot) -> list[Room]:
         """
         Get all the rooms in a certain timeslot that are not booked yet.
         """
-        rooms = [room for room in self.rooms]
-
         if timeslot.value == 17:
             # If there is already an event, then there are no more options.
             if len(timeslot.events) == 1:
                 return []
             else:
                 # If there is no event, then the largest room is an option.
-                return [room for room in rooms if room.is_largest]
+                return [room for room in self.rooms if room.is_largest]
+
+        booked = self.problem.get_room_mask([event.room for event in timeslot])
+        return [room for room in self.rooms if not booked & self.problem.room_bits[room.location_id]]
+
+    def get_room_assignment(self, weekday: int, hour: int) -> dict[int, Room]:
+        """
+        Find the rooms for the events in a timeslot with the least double
+        bookings and then the least students that do not fit, using a minimum
+        cost bipartite matching of the events and the rooms. Only the largest
+        room can be booked from 17:00 - 19:00, so there is a single event in
+        that timeslot that gets a room.
 
-        for event in timeslot:
-            rooms.remove(event.room)
+        The events that do not get a room, because there are more events than
+        rooms, keep their room. Events keep their room as well if another room
+        is not better.
 
-        return rooms
+        :returns: The new room per event id of the events that change rooms.
+        """
+        events = self.timetable[weekday - 1].get_timeslot(hour).events
+        rooms = [room for room in self.rooms if room.is_largest] if hour == 17 else self.rooms
+        if len(events) == 0 or len(rooms) == 0:
+            return {}
+
+        def get_overfitting(event: Event, room: Room) -> int:
+            return max(0, len(event.students) - room.capacity)
+
+        # The weight of an edge is the amount of students that fit into the
+        # room but not into the current room of the event. A matching with the
+        # most events has the least double bookings, of which the heaviest one
+        # has the least malus points. The weights are doubled to prefer the
+        # current room of an event if it is just as good as another room.
+        offset = 1 + max(len(event.students) for event in events)
+        network = nx.Graph()
+        for index, event in enumerate(events):
+            for room in rooms:
+                saving = get_overfitting(event, event.room) - get_overfitting(event, room)
+                weight = 2 * (offset + saving) + (room == event.room)
+                network.add_edge(('event', index), ('room', room.location_id), weight=weight)
+
+        rooms_by_id = {room.location_id: room for room in rooms}
+        assignment = {}
+        for edge in nx.max_weight_matching(network, maxcardinality=True):
+            (_, index), (_, location_id) = sorted(edge)
+            event, room = events[index], rooms_by_id[location_id]
+            if room != event.room:
+                assignment[event.id] = room
+
+        return assignment
+
+    def assign_rooms(self, weekday: int, hour: int) -> int:
+        """
+        Move the events in a timeslot to the rooms of the best room assignment.
+
+        :returns: The amount of events that have changed rooms.
+        """
+        assignment = self.get_room_assignment(weekday, hour)
+        events = [self.events_by_id[event_id] for event_id in assignment]
+
+        # Each event is removed before any room changes, since the booked rooms
+        # are updated per event.
+        events = [self.remove_event(event) for event in events]
+        for event in events:
+            event.set_room(assignment[event.id])
+            self.add_event(event)
 
+        return len(events)
+
+    def assign_all_rooms(self) -> int:
+        """
+        Move the events in each timeslot to the rooms of the best room
+        assignment.
+
+        :returns: The amount of events that have changed rooms.
+        """
+        total = 0
+        for weekday, day in enumerate(self.timetable, 1):
+            for hour in day.keys():
+                total += self.assign_rooms(weekday, hour)
+
+        return total
+
+    @cached_by_version
     def get_malus_score_distribution(self) -> dict[str, int]:
         """
         Returns a dictionary containing how the malus points for this timetable
@@ -431,72 +1282,286 @@ class Timetable:
 
         return info
 
-    def export_csv(self, filename: str = 'timetable.csv') -> None:
-        """
-        Export the timetable data to a CSV.
-
-        Below is an example of the exported data:
-        student name,course,type,weekday,timeslot,room
-        'John Doe','Algortimen en Heuristieken','hc','ma',9,'C0.110'
-        'Mary Jane','Algortimen en Heuristieken','hc','ma',9,'C0.110'
-        'Mike Smith','Algortimen en Heuristieken','hc','ma',9,'C0.110'
-        'Lisa Gold','Programming 2','hc','ma',9,'C1.04'
-        'Lisa Gold','Programming 2','hc','ma',9,'C1.04'
-        """
-        filepath = os.path.join(OUT_DIR, filename)
-        rows = 0
-        with open(filepath, 'w') as file:
-            writer = csv.writer(file, quoting=csv.QUOTE_MINIMAL)
-
-            # Write the header.
-            writer.writerow(['student name', 'course', 'type', 'weekday',
-                             'timeslot', 'room'])
-
-            # Write all the other rows.
-            for day in self.timetable:
-                for timeslot in day.values():
-                    for event in timeslot:
-                        for student in event.course.enrolled_students:
-                            row = [
-                                student.get_full_name(),
-                                event.title,
-                                event.type.value,
-                                Weekdays(event.weekday).name,
-                                event.timeslot,
-                                event.room.location_id
-                            ]
-
-                            rows += 1
-                            writer.writerow(row)
-            file.close()
-
-        self.logger.info(f'Successfully saved timetable with {rows} records as {filepath}')
-
-    def create_ics_event(self, event: Event) -> ics.Event:
-        assert event.weekday is not None, 'weekday must be set'
-        assert event.timeslot is not None, 'timeslot must be set'
-        assert event.room is not None, 'room must be set'
+    def get_course(self, name: str) -> Union[Course, None]:
+        """
+        Get a course by its name, or None if there is no such course.
+        """
+        return next((course for course in self.courses if course.name == name), None)
+
+    def mark_dirty(self, event: Event) -> None:
+        """
+        Mark an event as affected by an incremental update.
+        """
+        self.dirty_event_ids.add(event.id)
+
+    def get_dirty_events(self) -> list[Event]:
+        """
+        Get the scheduled events that have been affected by incremental updates.
+        """
+        return [event for event in self.get_events() if event.id in self.dirty_event_ids]
+
+    def clear_dirty(self) -> None:
+        """
+        Forget which events and students have been affected by incremental
+        updates, which is done once they have been repaired.
+        """
+        self.dirty_event_ids = set()
+        self.dirty_student_ids = set()
+
+    def add_course_conflict(self, course_name: str, other_course_name: str) -> None:
+        """
+        Add an edge between two courses in the conflict graph and update the
+        saturation degrees of both courses for the scheduled timeslots.
+        """
+        self.own_problem()
+
+        for name, conflicting_name in [(course_name, other_course_name), (other_course_name, course_name)]:
+            course = self.get_course(name)
+            if course is not None:
+                course.set_conflicting_courses(sorted(course.conflicting_courses + [conflicting_name]))
+
+            self.conflicting_course_names.setdefault(conflicting_name, []).append(name)
+
+            for key, score in self.timeslot_scores.items():
+                if conflicting_name in score.course_counts:
+                    degrees = self.own_saturation_degrees(name)
+                    degrees[key] = degrees.get(key, 0) + 1
+
+    def remove_course_conflict(self, course_name: str, other_course_name: str) -> None:
+        """
+        Remove an edge between two courses in the conflict graph and update the
+        saturation degrees of both courses for the scheduled timeslots.
+        """
+        self.own_problem()
+
+        for name, conflicting_name in [(course_name, other_course_name), (other_course_name, course_name)]:
+            course = self.get_course(name)
+            if course is not None:
+                course.set_conflicting_courses([c for c in course.conflicting_courses if c != conflicting_name])
+
+            self.conflicting_course_names[conflicting_name].remove(name)
+
+            for key, score in self.timeslot_scores.items():
+                if conflicting_name in score.course_counts:
+                    self.own_saturation_degrees(name)[key] -= 1
+
+    def update_course_conflicts(self, course_names: list[str]) -> None:
+        """
+        Update the edges of the conflict graph for a few courses only, instead
+        of creating the whole graph again.
+        """
+        self.own_problem()
+
+        for course_name in course_names:
+            course = self.get_course(course_name)
+            if course is None:
+                continue
+
+            conflicting_courses = {
+                other_course_name
+                for student in self.students
+                if course_name in student.enrolled_courses
+                for other_course_name in student.enrolled_courses
+                if other_course_name != course_name
+            }
+
+            for other_course_name in conflicting_courses - set(course.conflicting_courses):
+                self.add_course_conflict(course_name, other_course_name)
+
+            for other_course_name in set(course.conflicting_courses) - conflicting_courses:
+                self.remove_course_conflict(course_name, other_course_name)
+
+    def create_course_events(self, course: Course) -> list[Event]:
+        """
+        Create the unscheduled lectures, seminars and practicals of a course.
+        """
+        events = []
+
+        for _ in range(course.lectures_amount):
+            event = Event(f'{course.name} {self.EVENT_TITLES[EventType.LECTURE]}', EventType.LECTURE, course)
+            event.assign_students(list(course.enrolled_students))
+            events.append(event)
+
+        for event_type, amount in [(EventType.SEMINAR, course.seminars_amount), (EventType.PRACTICUM, course.practicals_amount)]:
+            if amount == 0 or len(course.enrolled_students) == 0:
+                continue
+
+            for _ in range(amount):
+                student_groups, _ = course.create_student_groups(course.get_capacity_for_type(event_type))
+                for students in student_groups:
+                    event = Event(f'{course.name} {self.EVENT_TITLES[event_type]}', event_type, course)
+                    event.assign_students(students)
+                    events.append(event)
+
+        return events
+
+    def place_event(self, event: Event) -> None:
+        """
+        Schedule an event in the timeslot that adds the least violations and
+        malus points, using the smallest available room that fits the event.
+        """
+        best_possibility = None
+
+        for weekday in range(1, self.DAYS_PER_WEEK + 1):
+            for timeslot_value in Timeslot.OPTIONS:
+                # Use the largest available room if none of them fits.
+                room = self.find_available_room(weekday, timeslot_value, event.get_capacity(), fallback=True)
+                if room is None:
+                    continue
+
+                event.set_weekday(weekday)
+                event.set_timeslot(timeslot_value)
+                event.set_room(room)
+
+                self.add_event(event)
+                score = (len(self.get_violations()), self.calculate_malus_score())
+                self.remove_event(event)
+
+                if best_possibility is None or score < best_possibility[0]:
+                    best_possibility = (score, weekday, timeslot_value, room)
+
+        assert best_possibility is not None, 'there is no room available for the event'
+
+        _, weekday, timeslot_value, room = best_possibility
+        event.set_weekday(weekday)
+        event.set_timeslot(timeslot_value)
+        event.set_room(room)
+        self.add_event(event)
+        self.mark_dirty(event)
+
+    def add_student_to_groups(self, student: Student, course: Course, event_type: EventType, amount: int) -> None:
+        """
+        Add a student to the n-smallest seminar or practical groups of a course,
+        where a new group is created if all the groups are full.
+        """
+        capacity = course.get_capacity_for_type(event_type)
+        events = sorted(self.get_course_events(course, event_type), key=lambda event: len(event.students))
+        events = [event for event in events if len(event.students) < capacity][:amount]
+
+        for event in events:
+            self.assign_students(event, event.students + [student])
+            self.mark_dirty(event)
+
+        for _ in range(amount - len(events)):
+            event = Event(f'{course.name} {self.EVENT_TITLES[event_type]}', event_type, course)
+            event.assign_students([student])
+            self.place_event(event)
+
+    def apply_enrolment_delta(self, student: Student, added_courses: list[str], removed_courses: list[str]) -> None:
+        """
+        Enrol a (new) student in some courses and remove them from others,
+        which updates the courses, the conflict graph and the affected events
+        of this timetable. The affected events and the student are marked as
+        dirty.
+        """
+        self.own_problem()
+
+        existing_student = next((s for s in self.students if s.student_id == student.student_id), None)
+        if existing_student is None:
+            self.students.append(student)
+        else:
+            student = existing_student
+
+        for course_name in removed_courses:
+            course = self.get_course(course_name)
+            assert course is not None, f'unknown course: {course_name}'
+            assert course_name in student.enrolled_courses, f'{student} is not enrolled in {course_name}'
+
+            student.enrolled_courses = [name for name in student.enrolled_courses if name != course_name]
+            course.register_students([s for s in course.enrolled_students if s != student])
+            course.enrolment -= 1
+
+            for event_type in EventType:
+                for event in self.get_course_events(course, event_type):
+                    if student in event.students:
+                        self.assign_students(event, [s for s in event.students if s != student])
+                        self.mark_dirty(event)
+
+        for course_name in added_courses:
+            course = self.get_course(course_name)
+            assert course is not None, f'unknown course: {course_name}'
+            assert course_name not in student.enrolled_courses, f'{student} is already enrolled in {course_name}'
+
+            # Lists are replaced instead of changed, because lectures may share
+            # the list of enrolled students of their course.
+            student.enrolled_courses = student.enrolled_courses + [course_name]
+            course.register_students(course.enrolled_students + [student])
+            course.enrolment += 1
+
+            for event in self.get_course_events(course, EventType.LECTURE):
+                self.assign_students(event, event.students + [student])
+                self.mark_dirty(event)
+
+            for event_type, amount in [(EventType.SEMINAR, course.seminars_amount), (EventType.PRACTICUM, course.practicals_amount)]:
+                if amount > 0:
+                    self.add_student_to_groups(student, course, event_type, amount)
+
+        self.dirty_student_ids.add(student.student_id)
+        self.update_course_conflicts(removed_courses + added_courses)
+
+    def remove_room(self, location_id: str) -> None:
+        """
+        Make a room unavailable and schedule its events somewhere else, which
+        are marked as dirty.
+        """
+        self.own_problem()
+
+        room = next((room for room in self.rooms if room.location_id == location_id), None)
+        assert room is not None, f'unknown room: {location_id}'
+        assert len(self.rooms) > 1, 'the last room can not be removed'
+
+        # Each room can be used in 4 timeslots per day, plus the 17:00 timeslot
+        # of the largest room.
+        available_timeslots = self.DAYS_PER_WEEK * ((len(self.rooms) - 1) * (len(Timeslot.OPTIONS) - 1) + 1)
+        assert len(self.get_events()) <= available_timeslots, f'the events do not fit in the timetable without {location_id}'
+
+        events = [event for event in self.get_events() if event.room == room]
+        self.remove_events(events)
+        events = [self.resolve_event(event) for event in events]
+        rooms = [r for r in self.rooms if r != room]
+
+        # The 17:00 timeslot moves to the largest room that is left. The scores
+        # of the events in that room count the largest room, so those events
+        # are removed before the room changes and added again afterwards.
+        largest_room_events = []
+        if room.is_largest:
+            largest_room = max(rooms)
+            largest_room_events = [self.remove_event(event) for event in self.get_events() if event.room == largest_room]
+            largest_room.set_is_largest(True)
+
+        # The room masks depend on the available rooms.
+        self.problem.set_rooms(rooms)
+        self.reset_room_occupancy()
+
+        for event in largest_room_events:
+            self.add_event(event)
+
+        for event in events:
+            self.place_event(event)
 
-        now = datetime.now()
-        utc_offset = get_utc_offset()
-        last_monday = now - timedelta(days=max(now.weekday(), 0))
+    def add_course(self, course: Course) -> None:
+        """
+        Add a new course with the students that already listed it as one of
+        their courses and schedule its events, which are marked as dirty.
+        """
+        self.own_problem()
+
+        assert self.get_course(course.name) is None, f'{course.name} already exists'
 
-        # Create a list of dates for the current week from mon-fri.
-        current_week_dates = [(last_monday + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(5)]
+        self.courses.append(course)
+        course.register_students([student for student in self.students if course.name in student.enrolled_courses])
+        self.update_course_conflicts([course.name])
 
-        # Create the ICS calendar event
-        e = ics.Event()
-        e.name = event.title
-        e.location = event.room.location_id
-        e.description = f'Enrolled students: {len(event.students)}'
+        for event in self.create_course_events(course):
+            self.place_event(event)
 
-        today_date = current_week_dates[event.weekday - 1]
-        start_time = format(event.timeslot, '02')
-        end_time = event.timeslot + 2
-        e.begin = datetime.fromisoformat(f'{today_date}T{start_time}:00:00{utc_offset}')
-        e.end = datetime.fromisoformat(f'{today_date}T{end_time}:00:00{utc_offset}')
+        self.dirty_student_ids.update(student.student_id for student in course.enrolled_students)
 
-        return e
+    def export_csv(self, filename: str = 'timetable.csv', compress: bool = False) -> None:
+        """
+        Export the timetable to a CSV, see `TimetableIO.export_csv()`.
+        """
+        TimetableIO(self).export_csv(filename, compress)
 
     def get_events_by_course_per_day(self) -> list[list[list[Event]]]:
         """
@@ -536,86 +1601,31 @@ class Timetable:
 
         return timetable
 
-    def export_ics(self, filename: str = 'timetable.ics') -> None:
+    def export_ics(self, filename: str = 'timetable.ics', workers: Union[int, None] = None) -> dict[str, list[str]]:
         """
-        Export the timetable to ics format for this week.
-
-        Since the timetable contains 5 days, every export will be for the
-        current week. If you're doing an export on Saturday, then you will get
-        an export still for that week. This is easy and convenient when
-        importing into any calendar application.
+        Export the timetable to ICS calendars, see `TimetableIO.export_ics()`.
         """
-        ICS_OUT_DIR = os.path.join(OUT_DIR, 'ics')
-        COURSES_OUT_DIR = os.path.join(ICS_OUT_DIR, 'courses')
-        STUDENTS_OUT_DIR = os.path.join(ICS_OUT_DIR, 'students')
+        return TimetableIO(self).export_ics(filename, workers)
 
-        for d in [ICS_OUT_DIR, COURSES_OUT_DIR, STUDENTS_OUT_DIR]:
-            if not os.path.isdir(d):
-                os.mkdir(d)
-
-        # Create the ICS calendar file that contains all events.
-        #  =====================================================
-        total_events = 0
-        calendar = ics.Calendar()
-        for day in self.timetable:
-            for timeslot in day.values():
-                for event in timeslot:
-                    total_events += 1
-                    calendar.events.add(self.create_ics_event(event))
-
-        filepath = os.path.join(ICS_OUT_DIR, filename)
-        with open(filepath, 'w') as file:
-            file.write(calendar.serialize())
-            file.close()
+    def export_json(self, filename: str = 'timetable.json', include_students: bool = False) -> None:
+        """
+        Export the timetable to JSON, see `TimetableIO.export_json()`.
+        """
+        TimetableIO(self).export_json(filename, include_students)
 
-        self.logger.info(f'Successfully saved timetable with {total_events} events as {filepath}')
+    def export_binary(self, filename: str = 'timetable.bin') -> None:
+        """
+        Export the timetable to the binary format, see
+        `TimetableIO.export_binary()`.
+        """
+        TimetableIO(self).export_binary(filename)
 
-        # Create separate ICS calendar files for each student.
-        # ===================================================
-        student_timetables = self.get_student_timetables()
-        for student_id, timetable in student_timetables.items():
-            total_events = 0
-            calendar = ics.Calendar()
-            for day in timetable:
-                for timeslot in day.values():
-                    for event in timeslot:
-                        total_events += 1
-                        calendar.events.add(self.create_ics_event(event))
-
-            filepath = os.path.join(STUDENTS_OUT_DIR, f'{student_id}_{filename}')
-            with open(filepath, 'w') as file:
-                file.write(calendar.serialize())
-                file.close()
-
-            self.logger.info(f'Successfully saved timetable for student #{student_id} with {total_events} events as {filepath}')
-
-
-        # Create separate ICS calendar files for each course and its events.
-        # =================================================================
-        course_events = self.get_events_by_course()
-        for events in course_events:
-            total_events = 0
-            calendar = ics.Calendar()
-
-            for event in events:
-                total_events += 1
-                calendar.events.add(self.create_ics_event(event))
-
-            course_name_raw = events[0].course.name
-            course_name = re.sub(r'[^a-zA-Z0-9]+', '_', course_name_raw.lower())
-            filepath = os.path.join(COURSES_OUT_DIR, f'{course_name}_{filename}')
-            with open(filepath, 'w') as file:
-                file.write(calendar.serialize())
-                file.close()
-
-            self.logger.info(f'Successfully saved timetable for course {course_name_raw} with {total_events} events as {filepath}')
-
-    def export_json(self, filename: str = 'timetable.json') -> None:
-        filepath = os.path.join(OUT_DIR, filename)
-        with open(filepath, 'w') as file:
-            file.write(json.dumps(serialize(copy.deepcopy(self.timetable))))
-            file.close()
-        self.logger.info(f'Successfully saved timetable as {filepath}')
+    def import_file(self, filepath: str) -> None:
+        """
+        Import a timetable from a JSON, CSV or binary export, see
+        `TimetableIO.import_file()`.
+        """
+        TimetableIO(self).import_file(filepath)
 
     def plot_heatmap(self) -> None:
         """
@@ -0,0 +1,91 @@
+from collections.abc import Iterator, Mapping
+
+from code.entities.timeslot import Timeslot
+
+
+class TimetableDay(Mapping):
+    """
+    The timeslots of a single day in the timetable, which are created once for
+    each timeslot option and are kept when they become empty, so adding and
+    removing events never creates or sorts any timeslots.
+
+    A day behaves like a dictionary that maps the timeslot value to the
+    timeslot, but only for the timeslots that contain events and always in
+    ascending order, i.e. { 9: Timeslot(...), 15: Timeslot(...) }.
+    """
+
+    # The position of each timeslot value in the day.
+    INDEXES = {value: index for index, value in enumerate(Timeslot.OPTIONS)}
+
+    def __init__(self, weekday: int) -> None:
+        self.weekday = weekday
+        self.timeslots = [Timeslot(value, weekday) for value in Timeslot.OPTIONS]
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(weekday:{self.weekday}, timeslots:{dict(self.items())})'
+
+    def __getitem__(self, value: int) -> Timeslot:
+        """
+        Get a timeslot that contains events by its value.
+        """
+        timeslot = self.get_timeslot(value)
+        if len(timeslot.events) == 0:
+            raise KeyError(value)
+
+        return timeslot
+
+    def __contains__(self, value: object) -> bool:
+        """
+        Check if the timeslot with this value contains events.
+        """
+        return value in self.INDEXES and len(self.timeslots[self.INDEXES[value]].events) > 0
+
+    def __iter__(self) -> Iterator[int]:
+        """
+        Iterate over the values of the timeslots that contain events.
+        """
+        for timeslot in self.timeslots:
+            if len(timeslot.events) > 0:
+                yield timeslot.value
+
+    def __len__(self) -> int:
+        """
+        Get the amount of timeslots that contain events.
+        """
+        return sum(1 for timeslot in self.timeslots if len(timeslot.events) > 0)
+
+    def keys(self) -> list[int]:
+        return [timeslot.value for timeslot in self.timeslots if len(timeslot.events) > 0]
+
+    def values(self) -> list[Timeslot]:
+        return [timeslot for timeslot in self.timeslots if len(timeslot.events) > 0]
+
+    def items(self) -> list[tuple[int, Timeslot]]:
+        return [(timeslot.value, timeslot) for timeslot in self.timeslots if len(timeslot.events) > 0]
+
+    def get_timeslot(self, value: int) -> Timeslot:
+        """
+        Get the timeslot with this value, which may be empty.
+        """
+        return self.timeslots[self.INDEXES[value]]
+
+    def set_timeslot(self, timeslot: Timeslot) -> None:
+        """
+        Replace the timeslot with the same value by the given timeslot.
+        """
+        self.timeslots[self.INDEXES[timeslot.value]] = timeslot
+
+    def copy(self) -> 'TimetableDay':
+        """
+        Create a copy of the day that shares the timeslots with this day.
+        """
+        day = self.__class__.__new__(self.__class__)
+        day.weekday = self.weekday
+        day.timeslots = list(self.timeslots)
+        return day
+
+    def serialize(self) -> dict[int, Timeslot]:
+        """
+        Serialize the data inside this class to a JSON-friendly structure.
+        """
+        return dict(self.items())
@@ -0,0 +1,572 @@
+from array import array
+import concurrent.futures
+import csv
+from datetime import datetime, timedelta
+import gzip
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+import sys
+from typing import TYPE_CHECKING, Any, Union
+import ics
+
+from code.entities.event import Event
+from code.entities.student import Student
+from code.entities.timeslot import Timeslot
+from code.utils.constants import OUT_DIR
+from code.utils.enums import EventType, Weekdays
+from code.utils.helpers import get_utc_offset, reserve_id
+from code.utils.manifest import ExportManifest, hash_values
+
+if TYPE_CHECKING:
+    from code.entities.timetable import Timetable
+
+
+class TimetableIO:
+    """
+    Export a timetable to CSV, ICS, JSON and binary files and import it again
+    from those files.
+
+    Example usage:
+    TimetableIO(timetable).export_json('timetable.json')
+    """
+
+    # The header of the binary format, which contains the magic bytes, the
+    # version, the amount of values per event record, the amount of courses,
+    # rooms, students, events and student references and the size of the titles.
+    BINARY_MAGIC = b'LROO'
+    BINARY_VERSION = 1
+    BINARY_RECORD_SIZE = 9
+    BINARY_HEADER = struct.Struct('<4sHHIIIIII')
+
+    def __init__(self, timetable: 'Timetable') -> None:
+        self.timetable = timetable
+        self.logger = logging.getLogger(__name__)
+
+    def export_csv(self, filename: str = 'timetable.csv', compress: bool = False) -> None:
+        """
+        Export the timetable data to a CSV, which contains a row for each
+        student of each event. If `compress` is set, the CSV is compressed with
+        gzip and `.gz` is added to the filename. The file is not written again
+        if the rows did not change since the previous export.
+
+        Below is an example of the exported data:
+        student name,course,type,weekday,timeslot,room
+        'John Doe','Algortimen en Heuristieken','hc','ma',9,'C0.110'
+        'Mary Jane','Algortimen en Heuristieken','hc','ma',9,'C0.110'
+        'Mike Smith','Algortimen en Heuristieken','hc','ma',9,'C0.110'
+        'Lisa Gold','Programming 2','hc','ma',9,'C1.04'
+        'Lisa Gold','Programming 2','hc','ma',9,'C1.04'
+        """
+        filepath = os.path.join(OUT_DIR, filename)
+        if compress:
+            filepath += '.gz'
+
+        # Skip the export if none of the rows changed since the previous export.
+        manifest = ExportManifest(f'csv/{os.path.basename(filepath)}', os.path.dirname(filepath))
+        digest = hash_values(*[
+            (event.title, event.type.value, event.weekday, event.timeslot,
+             event.room.location_id if event.room is not None else None,
+             [student.student_id for student in event.students])
+            for event in self.timetable.get_events()
+        ])
+
+        if not manifest.track(filepath, digest):
+            manifest.save()
+            self.logger.info(f'Skipped saving timetable as {filepath}, because it did not change since the previous export')
+            return
+
+        # The columns that are the same for many rows are only created once.
+        student_names = {student.student_id: student.get_full_name() for student in self.timetable.students}
+        weekday_names = {weekday.value: weekday.name for weekday in Weekdays}
+
+        rows = 0
+        with (gzip.open(filepath, 'wt', newline='') if compress else open(filepath, 'w')) as file:
+            writer = csv.writer(file, quoting=csv.QUOTE_MINIMAL)
+
+            # Write the header.
+            writer.writerow(['student name', 'course', 'type', 'weekday',
+                             'timeslot', 'room'])
+
+            # Write all the rows of a single event at once.
+            for day in self.timetable:
+                for timeslot in day.values():
+                    for event in timeslot:
+                        assert event.room is not None, 'room must be set'
+
+                        event_columns = [
+                            event.title,
+                            event.type.value,
+                            weekday_names[event.weekday],
+                            event.timeslot,
+                            event.room.location_id,
+                        ]
+
+                        writer.writerows([
+                            [student_names[student.student_id], *event_columns]
+                            for student in event.students
+                        ])
+                        rows += len(event.students)
+
+        manifest.save()
+        self.logger.info(f'Successfully saved timetable with {rows} records as {filepath}')
+
+    def get_ics_week_dates(self) -> list[str]:
+        """
+        Get the dates from monday to friday of the current week, which are used
+        for the ICS calendar events.
+        """
+        now = datetime.now()
+        last_monday = now - timedelta(days=max(now.weekday(), 0))
+        return [(last_monday + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(5)]
+
+    def create_ics_event(self, event: Event, week_dates: Union[list[str], None] = None,
+                         utc_offset: Union[str, None] = None) -> ics.Event:
+        """
+        Create an ICS calendar event for an event in the current week. The
+        week dates and utc offset can be passed when creating many events, so
+        they are only computed once.
+        """
+        assert event.weekday is not None, 'weekday must be set'
+        assert event.timeslot is not None, 'timeslot must be set'
+        assert event.room is not None, 'room must be set'
+
+        if week_dates is None:
+            week_dates = self.get_ics_week_dates()
+
+        if utc_offset is None:
+            utc_offset = get_utc_offset()
+
+        # Create the ICS calendar event
+        e = ics.Event()
+        e.name = event.title
+        e.location = event.room.location_id
+        e.description = f'Enrolled students: {len(event.students)}'
+
+        # The uid is based on the event, so calendar applications recognize the
+        # same event in later exports.
+        e.uid = f'{event.id}@lesrooster'
+
+        today_date = week_dates[event.weekday - 1]
+        start_time = format(event.timeslot, '02')
+        end_time = event.timeslot + 2
+        e.begin = datetime.fromisoformat(f'{today_date}T{start_time}:00:00{utc_offset}')
+        e.end = datetime.fromisoformat(f'{today_date}T{end_time}:00:00{utc_offset}')
+
+        return e
+
+    def export_ics(self, filename: str = 'timetable.ics', workers: Union[int, None] = None) -> dict[str, list[str]]:
+        """
+        Export the timetable to ics format for this week.
+
+        Since the timetable contains 5 days, every export will be for the
+        current week. If you're doing an export on Saturday, then you will get
+        an export still for that week. This is easy and convenient when
+        importing into any calendar application.
+
+        The calendar with all events and the calendars per student and per
+        course are hashed from their events and only the calendars whose hash
+        differs from the previous export are written, by a pool of `workers`
+        threads. Every event that is needed is rendered only once.
+
+        :returns: The calendar files that are added, changed, unchanged or
+                  removed compared to the previous export.
+        """
+        ICS_OUT_DIR = os.path.join(OUT_DIR, 'ics')
+        COURSES_OUT_DIR = os.path.join(ICS_OUT_DIR, 'courses')
+        STUDENTS_OUT_DIR = os.path.join(ICS_OUT_DIR, 'students')
+
+        for d in [ICS_OUT_DIR, COURSES_OUT_DIR, STUDENTS_OUT_DIR]:
+            if not os.path.isdir(d):
+                os.mkdir(d)
+
+        week_dates = self.get_ics_week_dates()
+        utc_offset = get_utc_offset()
+
+        # Group the events by the calendars they are in.
+        # ==============================================
+        all_events = self.timetable.get_events()
+        student_events: dict[str, list[Event]] = {}
+        course_events: dict[int, list[Event]] = {}
+
+        for event in all_events:
+            if event.course.id not in course_events:
+                course_events[event.course.id] = []
+            course_events[event.course.id].append(event)
+
+            for student in event.students:
+                if student.student_id not in student_events:
+                    student_events[student.student_id] = []
+                student_events[student.student_id].append(event)
+
+        # Collect the file path, log description and events for each calendar.
+        calendars = [(os.path.join(ICS_OUT_DIR, filename), 'timetable', all_events)]
+
+        for student_id, events in student_events.items():
+            filepath = os.path.join(STUDENTS_OUT_DIR, f'{student_id}_{filename}')
+            calendars.append((filepath, f'timetable for student #{student_id}', events))
+
+        for events in course_events.values():
+            course_name_raw = events[0].course.name
+            course_name = re.sub(r'[^a-zA-Z0-9]+', '_', course_name_raw.lower())
+            filepath = os.path.join(COURSES_OUT_DIR, f'{course_name}_{filename}')
+            calendars.append((filepath, f'timetable for course {course_name_raw}', events))
+
+        # Only keep the calendars that changed since the previous export.
+        # ===============================================================
+        manifest = ExportManifest(f'ics/{filename}', ICS_OUT_DIR)
+        event_hashes = {}
+        for event in all_events:
+            assert event.room is not None, 'room must be set'
+            event_hashes[event.id] = hash_values(event.id, event.title, event.room.location_id,
+                                                 event.weekday, event.timeslot, len(event.students))
+
+        calendars = [
+            (filepath, description, events)
+            for (filepath, description, events) in calendars
+            if manifest.track(filepath, hash_values(week_dates, utc_offset, *[event_hashes[event.id] for event in events]))
+        ]
+
+        # Render every event of the changed calendars once.
+        ics_events: dict[int, str] = {}
+        for (_, _, events) in calendars:
+            for event in events:
+                if event.id not in ics_events:
+                    ics_events[event.id] = self.create_ics_event(event, week_dates, utc_offset).serialize()
+
+        # The serialized empty calendar is the header and footer every
+        # calendar file is wrapped in.
+        calendar_header, calendar_footer = ics.Calendar().serialize().rsplit('\r\n', 1)
+
+        def write_calendar(filepath: str, events: list[Event]) -> None:
+            with open(filepath, 'w') as file:
+                file.write('\r\n'.join([calendar_header, *[ics_events[event.id] for event in events], calendar_footer]))
+
+        # Write the changed calendar files in parallel, since this is mostly
+        # waiting on the disk.
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(write_calendar, filepath, events)
+                for (filepath, _, events) in calendars
+            ]
+
+            for future, (filepath, description, events) in zip(futures, calendars):
+                future.result()
+                self.logger.info(f'Successfully saved {description} with {len(events)} events as {filepath}')
+
+        diff = manifest.save()
+        self.logger.info(f'Exported ics calendars compared to the previous export: {manifest.summary()}')
+
+        return diff
+
+    def export_json(self, filename: str = 'timetable.json', include_students: bool = False) -> None:
+        """
+        Export the timetable to JSON, where each day is a dictionary with a list
+        of events per timeslot. The file is written one event at a time while
+        walking through the timetable, so the timetable is not copied or
+        changed. The students of an event are written as a list of student ids
+        if `include_students` is set.
+        """
+        filepath = os.path.join(OUT_DIR, filename)
+        events = 0
+        with open(filepath, 'w') as file:
+            file.write('[')
+            for day_index, day in enumerate(self.timetable):
+                if day_index > 0:
+                    file.write(', ')
+
+                file.write('{')
+                for timeslot_index, (timeslot_value, timeslot) in enumerate(day.items()):
+                    if timeslot_index > 0:
+                        file.write(', ')
+
+                    file.write(f'"{timeslot_value}": [')
+                    for event_index, event in enumerate(timeslot):
+                        if event_index > 0:
+                            file.write(', ')
+
+                        file.write(json.dumps(event.serialize(include_students)))
+                        events += 1
+                    file.write(']')
+                file.write('}')
+            file.write(']')
+
+        self.logger.info(f'Successfully saved timetable with {events} events as {filepath}')
+
+    def export_binary(self, filename: str = 'timetable.bin') -> None:
+        """
+        Export the timetable to a compact binary format, which consists of a
+        header followed by two arrays of little-endian unsigned 32-bit ints and
+        the event titles:
+        - the event records, where each record contains the event id, course
+          index, type index, title index, weekday, timeslot, room index and the
+          offset and amount of its students in the student references.
+        - the student references, which are indices in the list of students.
+        - the unique event titles, separated by newlines.
+
+        The courses, rooms and students are stored as indices, so the file can
+        only be imported with the same data it has been exported with.
+        """
+        assert array('I').itemsize == 4, 'unsigned ints must be 4 bytes'
+
+        course_indices = {course.name: index for index, course in enumerate(self.timetable.courses)}
+        room_indices = {room.location_id: index for index, room in enumerate(self.timetable.rooms)}
+        student_indices = {student.student_id: index for index, student in enumerate(self.timetable.students)}
+        event_types = list(EventType)
+
+        title_indices: dict[str, int] = {}
+
+        records = array('I')
+        student_references = array('I')
+        for day in self.timetable:
+            for timeslot in day.values():
+                for event in timeslot:
+                    assert event.room is not None, 'room must be set'
+                    assert '\n' not in event.title, 'title must not contain newlines'
+
+                    records.extend((
+                        event.id,
+                        course_indices[event.course.name],
+                        event_types.index(event.type),
+                        title_indices.setdefault(event.title, len(title_indices)),
+                        event.weekday,
+                        event.timeslot,
+                        room_indices[event.room.location_id],
+                        len(student_references),
+                        len(event.students),
+                    ))
+                    student_references.extend(student_indices[student.student_id] for student in event.students)
+
+        if sys.byteorder == 'big':
+            records.byteswap()
+            student_references.byteswap()
+
+        titles = '\n'.join(title_indices).encode()
+
+        filepath = os.path.join(OUT_DIR, filename)
+        with open(filepath, 'wb') as file:
+            file.write(self.BINARY_HEADER.pack(
+                self.BINARY_MAGIC,
+                self.BINARY_VERSION,
+                self.BINARY_RECORD_SIZE,
+                len(self.timetable.courses),
+                len(self.timetable.rooms),
+                len(self.timetable.students),
+                len(records) // self.BINARY_RECORD_SIZE,
+                len(student_references),
+                len(titles),
+            ))
+            records.tofile(file)
+            student_references.tofile(file)
+            file.write(titles)
+
+        self.logger.info(f'Successfully saved timetable as {filepath}')
+
+    def import_binary(self, filepath: str) -> None:
+        """
+        Import a timetable that has been exported with `export_binary`. The
+        file is memory-mapped and the records are read from it directly.
+        """
+        event_types = list(EventType)
+
+        with open(filepath, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            magic, version, record_size, total_courses, total_rooms, total_students, total_events, total_references, titles_size = self.BINARY_HEADER.unpack_from(data)
+            assert magic == self.BINARY_MAGIC, f'{filepath} is not a binary timetable'
+            assert version == self.BINARY_VERSION, f'binary timetable version must be {self.BINARY_VERSION}'
+            assert record_size == self.BINARY_RECORD_SIZE, f'event records must contain {self.BINARY_RECORD_SIZE} values'
+            assert (total_courses, total_rooms, total_students) == (len(self.timetable.courses), len(self.timetable.rooms), len(self.timetable.students)), \
+                'binary timetable has been exported with other data'
+
+            titles_offset = self.BINARY_HEADER.size + (total_events * record_size + total_references) * 4
+            titles = data[titles_offset:titles_offset + titles_size].decode().split('\n')
+
+            with memoryview(data) as view, view[self.BINARY_HEADER.size:titles_offset] as body, body.cast('I') as values:
+                if sys.byteorder == 'big':
+                    values = array('I', values)
+                    values.byteswap()
+
+                references_offset = total_events * record_size
+
+                self.timetable.clear()
+                for offset in range(0, references_offset, record_size):
+                    event_id, course_index, type_index, title_index, weekday, timeslot, room_index, students_offset, total_event_students = values[offset:offset + record_size]
+                    start = references_offset + students_offset
+
+                    event = Event(
+                        titles[title_index],
+                        event_types[type_index],
+                        self.timetable.courses[course_index],
+                        weekday,
+                        timeslot,
+                        self.timetable.rooms[room_index],
+                        [self.timetable.students[index] for index in values[start:start + total_event_students]],
+                    )
+                    event.id = event_id
+                    reserve_id(event_id)
+                    self.timetable.add_event(event)
+
+        self.logger.info(f'Successfully imported {total_events} events from {filepath}')
+
+    def import_events(self, rows: list[dict[str, Any]]) -> None:
+        """
+        Replace all the events in the timetable with imported events, where
+        each row contains the title, type, course name, weekday, timeslot, room
+        and student ids of a single event.
+
+        Lectures always get the students that are currently enrolled in the
+        course. Seminars and practicals keep their imported groups, except for
+        students that are no longer enrolled. If the groups are unknown, the
+        students are divided over the events like a new schedule would.
+        """
+        courses = {course.name: course for course in self.timetable.courses}
+        rooms = {room.location_id: room for room in self.timetable.rooms}
+        students = {student.student_id: student for student in self.timetable.students}
+
+        events = []
+        events_without_students: dict[tuple[str, EventType], list[Event]] = {}
+        for row in rows:
+            assert row['course'] in courses, f'unknown course: {row["course"]}'
+            assert row['room'] in rooms, f'unknown room: {row["room"]}'
+            assert row['timeslot'] in Timeslot.OPTIONS, f'invalid timeslot: {row["timeslot"]}'
+
+            course = courses[row['course']]
+            event = Event(row['title'], row['type'], course, row['weekday'], row['timeslot'], rooms[row['room']])
+            student_ids = row['students']
+
+            if event.type == EventType.LECTURE:
+                event.assign_students(course.enrolled_students)
+            elif student_ids is None or len(student_ids) > course.get_capacity_for_type(event.type):
+                events_without_students.setdefault((course.name, event.type), []).append(event)
+            else:
+                event.assign_students([
+                    students[student_id]
+                    for student_id in student_ids
+                    if student_id in students and course.name in students[student_id].enrolled_courses
+                ])
+
+            events.append(event)
+
+        for (course_name, event_type), course_events in events_without_students.items():
+            course = courses[course_name]
+            student_groups, _ = course.create_student_groups(course.get_capacity_for_type(event_type))
+            for index, event in enumerate(course_events):
+                event.assign_students(student_groups[index % len(student_groups)])
+
+        self.timetable.clear()
+        for event in events:
+            self.timetable.add_event(event)
+
+    def import_json(self, filepath: str) -> None:
+        """
+        Import a timetable that has been exported with `export_json`.
+        """
+        with open(filepath, 'r') as file:
+            days = json.load(file)
+
+        rows = []
+        for day in days:
+            for events in day.values():
+                for event in events:
+                    rows.append({
+                        'title': event['title'],
+                        'type': EventType(event['type']),
+                        'course': event['course'],
+                        'weekday': event['weekday'],
+                        'timeslot': event['timeslot'],
+                        'room': event['room'],
+                        'students': event.get('students'),
+                    })
+
+        self.import_events(rows)
+        self.logger.info(f'Successfully imported {len(rows)} events from {filepath}')
+
+    def import_csv(self, filepath: str) -> None:
+        """
+        Import a timetable that has been exported with `export_csv`, where the
+        rows with the same weekday, timeslot, room, title and type belong to a
+        single event. Compressed exports ending with `.gz` are supported as
+        well.
+
+        The CSV only contains the names of the students, which are matched with
+        the students that are enrolled in the course. Rows that can not be told
+        apart, such as two of the same events in the same room or two enrolled
+        students with the same name, are rejected instead of merged.
+        """
+        # The course column contains the event title, which is matched with the
+        # titles that are given to the events of each course. Other titles
+        # start with the course name, so the longest matching name is used.
+        course_titles = {
+            (f'{course.name} {title}', event_type.value): course.name
+            for course in self.timetable.courses
+            for event_type, title in self.timetable.EVENT_TITLES.items()
+        }
+        course_names = sorted([course.name for course in self.timetable.courses], key=len, reverse=True)
+
+        students: dict[str, list[Student]] = {}
+        for student in self.timetable.students:
+            students.setdefault(student.get_full_name(), []).append(student)
+
+        events: dict[tuple[int, int, str, str, str], dict[str, Any]] = {}
+        previous_key = None
+        with (gzip.open(filepath, 'rt', newline='') if filepath.endswith('.gz') else open(filepath, 'r')) as file:
+            for row in csv.DictReader(file):
+                weekday = Weekdays[row['weekday']].value
+                timeslot = int(row['timeslot'])
+                key = (weekday, timeslot, row['room'], row['course'], row['type'])
+
+                # The rows of an event are exported together, so an event that
+                # shows up again is another event with the same values.
+                if key != previous_key:
+                    assert key not in events, f'{row["course"]} is scheduled more than once on {row["weekday"]} {timeslot} in {row["room"]}'
+                    previous_key = key
+
+                if key not in events:
+                    course_name = course_titles.get((row['course'], row['type']))
+                    if course_name is None:
+                        course_name = next((name for name in course_names if row['course'].startswith(name)), None)
+                    assert course_name is not None, f'unknown course: {row["course"]}'
+
+                    events[key] = {
+                        'title': row['course'],
+                        'type': EventType(row['type']),
+                        'course': course_name,
+                        'weekday': weekday,
+                        'timeslot': timeslot,
+                        'room': row['room'],
+                        'students': [],
+                    }
+
+                event = events[key]
+                enrolled_students = [
+                    student
+                    for student in students.get(row['student name'], [])
+                    if event['course'] in student.enrolled_courses
+                ]
+                assert len(enrolled_students) <= 1, f'more than one student of {event["course"]} is named {row["student name"]}'
+                if len(enrolled_students) == 0:
+                    continue
+
+                student_id = enrolled_students[0].student_id
+                assert student_id not in event['students'], f'{row["course"]} is scheduled more than once on {row["weekday"]} {timeslot} in {row["room"]}'
+                event['students'].append(student_id)
+
+        self.import_events(list(events.values()))
+        self.logger.info(f'Successfully imported {len(events)} events from {filepath}')
+
+    def import_file(self, filepath: str) -> None:
+        """
+        Import a timetable from a JSON, CSV or binary export based on its
+        extension.
+        """
+        extension = os.path.splitext(filepath.removesuffix('.gz'))[1]
+        assert extension in ['.json', '.csv', '.bin'], 'timetable must be a .json, .csv, .csv.gz or .bin file'
+
+        if extension == '.csv':
+            self.import_csv(filepath)
+        elif extension == '.bin':
+            self.import_binary(filepath)
+        else:
+            self.import_json(filepath)
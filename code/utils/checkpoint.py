@@ -0,0 +1,52 @@
+"""
+This file contains the functions to save and load checkpoints of a local search,
+which allow a run that has been killed to be resumed where it left off.
+
+A checkpoint is a dictionary with the state of the search that is pickled and
+compressed with zlib. It is first written to a temporary file which then
+replaces the previous checkpoint, so a run that is killed while writing a
+checkpoint never leaves a corrupt checkpoint behind.
+"""
+
+import os
+import pickle
+import zlib
+from typing import Any
+
+from code.utils.helpers import make_id, reserve_id
+
+# Increase this whenever the contents of a checkpoint change, so older
+# checkpoints are refused instead of being resumed incorrectly.
+CHECKPOINT_VERSION = 2
+
+
+def save_checkpoint(filename: str, state: dict[str, Any]) -> None:
+    """
+    Write the state of a search to a checkpoint file, along with the last id
+    that has been created, since the checkpointed events keep their ids.
+    """
+    data = pickle.dumps({'version': CHECKPOINT_VERSION, 'last_id': make_id(), **state}, protocol=pickle.HIGHEST_PROTOCOL)
+
+    temp_filename = f'{filename}.tmp'
+    with open(temp_filename, 'wb') as file:
+        file.write(zlib.compress(data))
+        file.flush()
+        os.fsync(file.fileno())
+
+    os.replace(temp_filename, filename)
+
+
+def load_checkpoint(filename: str) -> dict[str, Any]:
+    """
+    Read the state of a search from a checkpoint file.
+    """
+    with open(filename, 'rb') as file:
+        state = pickle.loads(zlib.decompress(file.read()))
+
+    assert isinstance(state, dict), f'{filename} is not a checkpoint'
+    assert state.get('version') == CHECKPOINT_VERSION, f'checkpoint version must be {CHECKPOINT_VERSION}'
+
+    # The ids of the checkpointed events must not be created again.
+    reserve_id(state['last_id'])
+
+    return state
@@ -2,21 +2,46 @@
 This file contains custom decorators that can be used throughout the project.
 """
 
+import functools
 import timeit
-import logging
 
-logger = logging.getLogger(__name__)
+from code.utils.probes import registry
 
 
 def timer(func):
     """
-    Calculate the execution time of a function.
+    Calculate the execution time of a function, which is added to the probes
+    registry under the qualified name of the function.
     """
+    @functools.wraps(func)
     def wrapper(*args, **kwargs):
         start_time = timeit.default_timer()
-        result = func(*args, **kwargs)
-        end_time = timeit.default_timer()
-        exec_time = end_time - start_time
-        logger.debug(f'{func.__qualname__}() executed in {exec_time:.8f} seconds')
+        try:
+            return func(*args, **kwargs)
+        finally:
+            registry.record(func.__qualname__, timeit.default_timer() - start_time)
+    return wrapper
+
+
+def cached_by_version(func):
+    """
+    Cache the result of a method without arguments until the object changes,
+    which is noticed by the `version` attribute of the object that is bumped by
+    each change. The results are stored in the `score_cache` attribute of the
+    object. A shallow copy of a cached list or dictionary is returned, so
+    callers can add and remove items without changing the cache.
+    """
+    @functools.wraps(func)
+    def wrapper(self):
+        cached = self.score_cache.get(func.__name__)
+        if cached is None or cached[0] != self.version:
+            cached = (self.version, func(self))
+            self.score_cache[func.__name__] = cached
+
+        result = cached[1]
+        if isinstance(result, list):
+            return list(result)
+        if isinstance(result, dict):
+            return dict(result)
         return result
     return wrapper
@@ -2,8 +2,10 @@
 This file contains helper functions that are used throughout the project.
 """
 
-import copy
 from datetime import datetime
+import functools
+import hashlib
+import itertools
 import math
 import os
 import random
@@ -40,7 +42,7 @@ def split_list_random(items: list, k: int) -> list[list]:
     """
     Split a list with items into random groups of size `k`.
     """
-    choices = copy.deepcopy(items)
+    choices = list(items)
     groups = []
     total_groups = math.ceil(len(items) / k)
 
@@ -58,11 +60,47 @@ def split_list_random(items: list, k: int) -> list[list]:
     return groups
 
 
+# The ids that have not been used yet in this process.
+id_counter = itertools.count()
+
+
 def make_id() -> int:
     """
-    Create a random id.
+    Create an id that is unique within this process.
+    """
+    return next(id_counter)
+
+
+def reserve_id(value: int) -> None:
+    """
+    Make sure that an id that has been created by another process, such as an
+    imported or checkpointed id, is never created again by `make_id`.
+    """
+    global id_counter
+
+    next_id = next(id_counter)
+    id_counter = itertools.count(max(next_id, value + 1))
+
+
+@functools.lru_cache(maxsize=None)
+def zobrist_key(*values: Any) -> int:
+    """
+    Get the 64-bit Zobrist key for a combination of values. The key is derived
+    from a hash of the values instead of drawn at random, so it is the same in
+    each run and does not change the random state of the algorithms.
+    """
+    digest = hashlib.blake2b(repr(values).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+
+def mix_hash(value: int) -> int:
+    """
+    Scramble the bits of a 64-bit hash (the SplitMix64 finalizer), so that
+    combining hashes with XOR afterwards does not cancel out any structure.
     """
-    return random.getrandbits(32)
+    value = ((value ^ (value >> 30)) * 0xbf58476d1ce4e5b9) & 0xffffffffffffffff
+    value = ((value ^ (value >> 27)) * 0x94d049bb133111eb) & 0xffffffffffffffff
+    return value ^ (value >> 31)
 
 
 def remove_duplicates(items: list) -> list:
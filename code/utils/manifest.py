@@ -0,0 +1,111 @@
+"""
+This file contains the manifest that is used by the exports to only rewrite the
+output files whose contents have changed since the previous export.
+
+The manifest is a JSON file in the folder of the output files with a section per
+export, where each section maps the path of an output file to the hash of its
+contents. An export tracks the hash of every file it would write and only
+writes the files whose hash is new or different, or that have been removed
+from disk.
+"""
+
+import hashlib
+import json
+import os
+from typing import Any
+
+MANIFEST_FILENAME = 'manifest.json'
+
+
+def hash_values(*values: Any) -> str:
+    """
+    Create a hash of the string representation of the given values.
+    """
+    return hashlib.sha1(repr(values).encode('utf-8')).hexdigest()
+
+
+class ExportManifest:
+    """
+    The hashes of the output files of a single export, which is a section of
+    the manifest in the folder of those output files.
+
+    Example usage:
+    manifest = ExportManifest('ics/timetable.ics', 'out/ics')
+    if manifest.track(filepath, hash_values(*events)):
+        write_file(filepath)
+    manifest.save()
+    """
+
+    def __init__(self, section: str, directory: str) -> None:
+        self.section = section
+        self.directory = directory
+        self.filepath = os.path.join(directory, MANIFEST_FILENAME)
+        self.sections = self.load()
+        self.previous_hashes: dict[str, str] = self.sections.get(section, {})
+        self.hashes: dict[str, str] = {}
+        self.diff: dict[str, list[str]] = {
+            'added': [],
+            'changed': [],
+            'unchanged': [],
+            'removed': [],
+        }
+
+    def load(self) -> dict[str, dict[str, str]]:
+        """
+        Load all sections of the manifest, or nothing if there is no manifest.
+        """
+        if not os.path.isfile(self.filepath):
+            return {}
+
+        with open(self.filepath) as file:
+            return json.load(file)
+
+    def track(self, filepath: str, digest: str) -> bool:
+        """
+        Track the hash of an output file.
+
+        :returns: True if the file has to be written.
+        """
+        key = os.path.relpath(filepath, self.directory)
+        self.hashes[key] = digest
+
+        if key not in self.previous_hashes:
+            self.diff['added'].append(key)
+        elif self.previous_hashes[key] != digest or not os.path.isfile(filepath):
+            self.diff['changed'].append(key)
+        else:
+            self.diff['unchanged'].append(key)
+            return False
+
+        return True
+
+    def save(self) -> dict[str, list[str]]:
+        """
+        Remove the output files of the previous export that are no longer
+        tracked and save the hashes of this export to the manifest.
+
+        :returns: The files that are added, changed, unchanged or removed.
+        """
+        for key in self.previous_hashes:
+            if key not in self.hashes:
+                self.diff['removed'].append(key)
+
+                filepath = os.path.join(self.directory, key)
+                if os.path.isfile(filepath):
+                    os.remove(filepath)
+
+        self.sections[self.section] = self.hashes
+
+        temp_filepath = f'{self.filepath}.tmp'
+        with open(temp_filepath, 'w') as file:
+            json.dump(self.sections, file, indent=2, sort_keys=True)
+
+        os.replace(temp_filepath, self.filepath)
+
+        return self.diff
+
+    def summary(self) -> str:
+        """
+        Get a short summary of the differences with the previous export.
+        """
+        return ', '.join(f'{len(keys)} {name}' for name, keys in self.diff.items())
@@ -0,0 +1,238 @@
+"""
+This file contains the metrics stream which algorithms use to report their
+progress while they are running, such that other programs can follow a run
+without having to parse the log files.
+"""
+
+from collections.abc import Callable, Generator
+import contextlib
+import json
+import sys
+import time
+import timeit
+from typing import Any, Union
+
+try:
+    import resource
+except ImportError:
+    # The resource module is not available on Windows.
+    resource = None
+
+MetricsCallback = Callable[[dict[str, Any]], None]
+
+
+def get_memory_usage() -> Union[float, None]:
+    """
+    Get the peak memory usage of this process in megabytes, or None if it can
+    not be determined on this platform.
+    """
+    if resource is None:
+        return None
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # macOS reports the value in bytes, while Linux reports it in kilobytes.
+    if sys.platform == 'darwin':
+        return round(max_rss / 1024 / 1024, 2)
+
+    return round(max_rss / 1024, 2)
+
+
+class MetricsStream:
+    """
+    Collects the progress of an algorithm and emits it as events to all the
+    subscribed callbacks, where a progress event is emitted every n-iterations.
+
+    Each event is a JSON-friendly dictionary, for example:
+    {
+        'event': 'progress',
+        'algorithm': 'HillClimber',
+        'timestamp': 1697712000.0,
+        'elapsed': 12.5,
+        'iteration': 1000,
+        'iterations_per_second': 80.2,
+        'malus_score': 140,
+        'violations': 0,
+        'best_malus_score': 140,
+        'best_violations': 0,
+        'accepted_moves': 620,
+        'rejected_moves': 380,
+        'scoring_time_ms': 28.1,
+        'memory_mb': 160.3,
+    }
+    """
+
+    def __init__(self, every: int = 100) -> None:
+        self.every = every
+        self.callbacks: list[MetricsCallback] = []
+        self.reset()
+
+    def reset(self, algorithm: Union[str, None]=None, iteration: int = 0) -> None:
+        """
+        Reset all the gathered metrics for a new run.
+
+        :param iteration: The iteration the run starts at, which is not 0 when
+                          a run is resumed from a checkpoint.
+        """
+        self.algorithm = algorithm
+        self.start_time = timeit.default_timer()
+
+        # The time and iteration of the last progress event, which are used to
+        # calculate the iterations per second in between two progress events.
+        self.interval_time = self.start_time
+        self.interval_iteration = iteration
+
+        self.accepted_moves = 0
+        self.rejected_moves = 0
+
+        # The scoring time is only kept for the current interval.
+        self.scoring_calls = 0
+        self.scoring_time = 0.0
+
+        self.best_violations: Union[int, None] = None
+        self.best_malus_score: Union[int, None] = None
+
+    def subscribe(self, callback: MetricsCallback) -> None:
+        """
+        Register a callback that will be called with each emitted event.
+        """
+        self.callbacks.append(callback)
+
+    def emit(self, event: str, **data) -> None:
+        """
+        Send an event along with its data to all the subscribed callbacks.
+        """
+        if len(self.callbacks) == 0:
+            return
+
+        message = {
+            'event': event,
+            'algorithm': self.algorithm,
+            'timestamp': time.time(),
+            'elapsed': round(timeit.default_timer() - self.start_time, 6),
+            **data,
+        }
+
+        for callback in self.callbacks:
+            callback(message)
+
+    def start(self, algorithm: str, iteration: int = 0, **data) -> None:
+        """
+        Start tracking a new run of an algorithm.
+
+        :param iteration: The iteration the run starts at.
+        """
+        self.reset(algorithm, iteration)
+        self.emit('start', every=self.every, iteration=iteration, **data)
+
+    def finish(self, **data) -> None:
+        """
+        Mark the end of the current run of an algorithm.
+        """
+        self.emit('finish',
+                  best_malus_score=self.best_malus_score,
+                  best_violations=self.best_violations,
+                  accepted_moves=self.accepted_moves,
+                  rejected_moves=self.rejected_moves,
+                  memory_mb=get_memory_usage(),
+                  **data)
+
+    def record_move(self, accepted: bool) -> None:
+        """
+        Keep track of whether a move has been accepted or rejected.
+        """
+        if accepted:
+            self.accepted_moves += 1
+        else:
+            self.rejected_moves += 1
+
+    @contextlib.contextmanager
+    def scoring(self) -> Generator:
+        """
+        Measure the time it takes to score a timetable, for example:
+
+        with self.metrics.scoring():
+            malus_score = timetable.calculate_malus_score()
+        """
+        start_time = timeit.default_timer()
+        yield
+        self.scoring_time += timeit.default_timer() - start_time
+        self.scoring_calls += 1
+
+    def update_best(self, malus_score: int, violations: int) -> bool:
+        """
+        Keep track of the best state, which is the state with the fewest
+        violations and then the lowest malus score.
+
+        :returns: True if the given state is better than the best state.
+        """
+        if self.best_violations is None or \
+                (violations, malus_score) < (self.best_violations, self.best_malus_score):
+            self.best_violations = violations
+            self.best_malus_score = malus_score
+            return True
+
+        return False
+
+    def record_solution(self, iteration: int, malus_score: int, violations: int) -> None:
+        """
+        Emit a solution event for algorithms that don't have a current state
+        for every iteration, but do find better solutions over time.
+        """
+        if self.update_best(malus_score, violations):
+            self.emit('solution', iteration=iteration, malus_score=malus_score, violations=violations)
+
+    def update(self, iteration: int, malus_score: int, violations: int, complete: bool = True) -> None:
+        """
+        Update the metrics with the state after an iteration and emit a
+        progress event once every n-iterations.
+
+        :param complete: False if the state is a partial timetable, such as
+                         during construction, which is never the best state.
+        """
+        if complete:
+            self.update_best(malus_score, violations)
+
+        if iteration % self.every != 0 or len(self.callbacks) == 0:
+            return
+
+        now = timeit.default_timer()
+        iterations_per_second = (iteration - self.interval_iteration) / max(now - self.interval_time, 1e-9)
+        scoring_time_ms = self.scoring_time / self.scoring_calls * 1000 if self.scoring_calls > 0 else None
+
+        self.emit('progress',
+                  iteration=iteration,
+                  iterations_per_second=round(iterations_per_second, 2),
+                  malus_score=malus_score,
+                  violations=violations,
+                  best_malus_score=self.best_malus_score,
+                  best_violations=self.best_violations,
+                  accepted_moves=self.accepted_moves,
+                  rejected_moves=self.rejected_moves,
+                  scoring_time_ms=round(scoring_time_ms, 3) if scoring_time_ms is not None else None,
+                  memory_mb=get_memory_usage())
+
+        self.interval_time = now
+        self.interval_iteration = iteration
+        self.scoring_calls = 0
+        self.scoring_time = 0.0
+
+
+class JsonLinesSink:
+    """
+    Metrics callback that writes every event as a single JSON line to a file,
+    which allows other programs to follow the file while the algorithm runs.
+    """
+
+    def __init__(self, filename: str) -> None:
+        # Use line buffering, so every event is written to the file directly.
+        self.file = open(filename, 'w', buffering=1)
+
+    def __call__(self, message: dict[str, Any]) -> None:
+        self.file.write(json.dumps(message) + '\n')
+
+    def close(self) -> None:
+        """
+        Close the underlying file.
+        """
+        self.file.close()
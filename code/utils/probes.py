@@ -0,0 +1,197 @@
+"""
+This file contains the probes registry, which counts how many times the hot
+functions of the project are called and how much time is spent in them.
+
+Probes are disabled by default, in which case the functions are left untouched
+and there is no overhead at all. They can be enabled by setting the
+LESROOSTER_PROBES environment variable to 1 or by passing --probes to main.py,
+after which the probed functions are replaced with wrappers that measure them.
+"""
+
+import copy
+from datetime import datetime
+import functools
+import os
+import timeit
+from typing import Any, Callable
+
+from code.utils.constants import OUT_DIR
+
+ENV_VAR = 'LESROOSTER_PROBES'
+
+
+class ProbeRegistry:
+    """
+    Keeps track of the amount of calls and the total time per probe name.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.counts: dict[str, int] = {}
+        self.times: dict[str, float] = {}
+
+        # The original attributes that have been replaced by a probe, which are
+        # restored when the probes are disabled.
+        self.patches: list[tuple[Any, str, Any]] = []
+
+    def record(self, name: str, duration: float) -> None:
+        """
+        Add a single call along with its duration to a probe.
+        """
+        self.counts[name] = self.counts.get(name, 0) + 1
+        self.times[name] = self.times.get(name, 0.0) + duration
+
+    def reset(self) -> None:
+        """
+        Remove all the measurements.
+        """
+        self.counts = {}
+        self.times = {}
+
+    def wrap(self, name: str, func: Callable) -> Callable:
+        """
+        Create a wrapper for a function that records each call to a probe.
+        """
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start_time = timeit.default_timer()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(name, timeit.default_timer() - start_time)
+
+        return wrapper
+
+    def install(self, owner: Any, attribute: str, name: str) -> None:
+        """
+        Replace an attribute of a class or module with a probed version.
+        """
+        original = owner.__dict__[attribute] if isinstance(owner, type) else getattr(owner, attribute)
+        self.patches.append((owner, attribute, original))
+        setattr(owner, attribute, self.wrap(name, original))
+
+    def install_deepcopy(self) -> None:
+        """
+        Probe copy.deepcopy, where only the outermost call is recorded, since
+        deepcopy calls itself for every object inside the copied object.
+        """
+        original = copy.deepcopy
+        depth = 0
+
+        @functools.wraps(original)
+        def deepcopy(*args, **kwargs):
+            nonlocal depth
+            if depth > 0:
+                return original(*args, **kwargs)
+
+            depth += 1
+            start_time = timeit.default_timer()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                depth -= 1
+                self.record('copy.deepcopy', timeit.default_timer() - start_time)
+
+        self.patches.append((copy, 'deepcopy', original))
+        copy.deepcopy = deepcopy
+
+    def enable(self) -> None:
+        """
+        Install the probes in the hot functions of the project.
+        """
+        if self.enabled:
+            return
+
+        # These are imported here, because the algorithms import the
+        # decorators, which import this file.
+        from code.algorithms.base import Algorithm
+        from code.entities.event import Event
+        from code.entities.timeslot import Timeslot
+        from code.entities.timetable import Timetable
+
+        probes = {
+            Timetable: [
+                'add_event',
+                'remove_event',
+                'calculate_malus_score',
+                'calculate_empty_timeslots_malus_score',
+                'calculate_move_students_delta',
+                'get_violations',
+                'get_empty_timeslot_violations',
+                'get_student_timetables',
+            ],
+            Timeslot: [
+                'calculate_malus_score',
+                'get_overlapping_student_courses_malus_score',
+                'get_violations',
+            ],
+            Event: [
+                '__eq__',
+                '__lt__',
+            ],
+            Algorithm: [
+                'mutate_state',
+                'move_high_malus_score_events',
+                'move_random_event',
+                'swap_two_random_events',
+                'swap_two_events',
+                'permute_students_for_random_course',
+                'swap_students_for_random_course',
+            ],
+        }
+
+        for owner, attributes in probes.items():
+            for attribute in attributes:
+                self.install(owner, attribute, f'{owner.__name__}.{attribute}')
+
+        self.install_deepcopy()
+        self.enabled = True
+
+    def enable_from_environment(self) -> None:
+        """
+        Enable the probes if the environment variable has been set.
+        """
+        if os.environ.get(ENV_VAR, '') not in ['', '0']:
+            self.enable()
+
+    def disable(self) -> None:
+        """
+        Restore all the original functions.
+        """
+        for owner, attribute, original in reversed(self.patches):
+            setattr(owner, attribute, original)
+
+        self.patches = []
+        self.enabled = False
+
+    def report(self, iterations: int = 1) -> str:
+        """
+        Create a table with the calls and time per probe, where the probes with
+        the highest total time are shown first.
+        """
+        lines = [f'{"probe":<60} {"calls":>10} {"calls/iter":>12} {"total (s)":>12} {"avg (ms)":>10}']
+
+        for name, total_time in sorted(self.times.items(), key=lambda item: item[1], reverse=True):
+            calls = self.counts[name]
+            calls_per_iteration = calls / max(iterations, 1)
+            average_time = total_time / calls * 1000
+            lines.append(f'{name:<60} {calls:>10} {calls_per_iteration:>12.1f} {total_time:>12.3f} {average_time:>10.3f}')
+
+        return '\n'.join(lines)
+
+    def save_report(self, iterations: int = 1) -> str:
+        """
+        Write the report to the out/ folder.
+
+        :returns: The path to the report.
+        """
+        filename = f'probes-{datetime.now().strftime("%Y%m%d-%H%M%S")}.txt'
+        filepath = os.path.join(OUT_DIR, filename)
+
+        with open(filepath, 'w') as file:
+            file.write(self.report(iterations) + '\n')
+
+        return filepath
+
+
+registry = ProbeRegistry()
@@ -0,0 +1,272 @@
+"""
+This file contains the tools to profile a run of the program, which consist of
+timing the phases of a run, profiling a whole run using cProfile and profiling
+the memory usage of a run using tracemalloc.
+"""
+
+from collections.abc import Callable, Generator
+import contextlib
+import copy
+import cProfile
+from datetime import datetime
+import io
+import logging
+import os
+import pstats
+import threading
+import timeit
+import tracemalloc
+from typing import Any, Union
+
+from code.utils.constants import OUT_DIR
+from code.utils.metrics import get_memory_usage
+
+logger = logging.getLogger(__name__)
+
+# The total time spent per phase, where the time of a nested phase is only added
+# to that nested phase and not to the phase around it.
+phase_timings: dict[str, float] = {}
+
+# The memory profiler that takes snapshots during a run with --memprofile.
+memory_profiler: Union['MemoryProfiler', None] = None
+
+# The phases that are currently running per thread, where each item contains
+# the name of the phase, its start time and the time spent in nested phases.
+running_phases = threading.local()
+
+
+@contextlib.contextmanager
+def phase(name: str) -> Generator:
+    """
+    Measure the time spent in a phase of a run, such as loading the data or
+    the local search. It can be used as a context manager or as a decorator:
+
+    with phase('export'):
+        timetable.export_csv()
+
+    @phase('construction')
+    def run(self, iterations=1) -> None:
+    """
+    if not hasattr(running_phases, 'stack'):
+        running_phases.stack = []
+
+    if memory_profiler is not None:
+        memory_profiler.take_snapshot(f'start of {name}')
+
+    phase_stack: list[list[Any]] = running_phases.stack
+    phase_stack.append([name, timeit.default_timer(), 0.0])
+    try:
+        yield
+    finally:
+        _, start_time, nested_time = phase_stack.pop()
+        elapsed_time = timeit.default_timer() - start_time
+        phase_timings[name] = phase_timings.get(name, 0.0) + elapsed_time - nested_time
+
+        if len(phase_stack) > 0:
+            phase_stack[-1][2] += elapsed_time
+
+        if memory_profiler is not None:
+            memory_profiler.take_snapshot(f'end of {name}')
+
+
+def reset_phase_timings() -> None:
+    """
+    Remove all the phase timings that have been measured so far.
+    """
+    phase_timings.clear()
+
+
+def format_phase_timings() -> str:
+    """
+    Create a table with the time spent per phase, slowest phase first.
+    """
+    lines = ['Phase timings:']
+
+    total_time = sum(phase_timings.values())
+    for name, seconds in sorted(phase_timings.items(), key=lambda item: item[1], reverse=True):
+        percentage = seconds / total_time * 100 if total_time > 0 else 0
+        lines.append(f'  - {name}: {seconds:.3f}s ({percentage:.1f}%)')
+
+    return '\n'.join(lines)
+
+
+def profile(func: Callable, *args, top: int = 30, **kwargs) -> Any:
+    """
+    Run a function with cProfile enabled and write the results to the out/
+    folder:
+    - profile-<date>.prof: the raw profile, which can be opened with tools
+      such as snakeviz or `python -m pstats`.
+    - profile-<date>.txt: the phase timings and the top-n functions with the
+      highest cumulative time.
+    """
+    reset_phase_timings()
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        profiler.disable()
+
+        filename = f'profile-{datetime.now().strftime("%Y%m%d-%H%M%S")}'
+        prof_filepath = os.path.join(OUT_DIR, f'{filename}.prof')
+        summary_filepath = os.path.join(OUT_DIR, f'{filename}.txt')
+
+        profiler.dump_stats(prof_filepath)
+
+        stream = io.StringIO()
+        stats = pstats.Stats(profiler, stream=stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+
+        summary = f'{format_phase_timings()}\n\n{stream.getvalue()}'
+        with open(summary_filepath, 'w') as file:
+            file.write(summary)
+
+        logger.info(format_phase_timings())
+        logger.info(f'Saved profile to {prof_filepath} and a summary to {summary_filepath}')
+
+    return result
+
+
+class MemoryProfiler:
+    """
+    Takes tracemalloc snapshots at the start and end of each phase and every
+    n-iterations of a local search, where each snapshot is compared to the
+    previous one to show which lines allocated or freed the most memory.
+
+    Only the last snapshot is kept in memory, since a snapshot contains every
+    single allocation that is being traced.
+    """
+
+    def __init__(self, every: int = 1000, top: int = 10) -> None:
+        self.every = every
+        self.top = top
+        self.sections: list[str] = []
+        self.last_snapshot: Union[tracemalloc.Snapshot, None] = None
+        self.last_label: Union[str, None] = None
+
+    def start(self) -> None:
+        """
+        Start tracing the memory allocations.
+        """
+        tracemalloc.start()
+        self.take_snapshot('start')
+
+    def stop(self) -> None:
+        """
+        Stop tracing the memory allocations.
+        """
+        self.last_snapshot = None
+        tracemalloc.stop()
+
+    def take_snapshot(self, label: str) -> None:
+        """
+        Take a snapshot and add the difference with the previous snapshot to
+        the report.
+        """
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+        ])
+
+        if self.last_snapshot is not None:
+            current, peak = tracemalloc.get_traced_memory()
+            lines = [
+                f'{self.last_label} -> {label} (current: {current / 1024 / 1024:.2f} MB, peak: {peak / 1024 / 1024:.2f} MB)',
+            ]
+            for diff in snapshot.compare_to(self.last_snapshot, 'lineno')[:self.top]:
+                lines.append(f'  {diff}')
+            self.sections.append('\n'.join(lines))
+
+        self.last_snapshot = snapshot
+        self.last_label = label
+
+    def take_iteration_snapshot(self, iteration: int) -> None:
+        """
+        Take a snapshot once every n-iterations.
+        """
+        if iteration % self.every == 0:
+            self.take_snapshot(f'iteration {iteration}')
+
+    def get_top_allocations(self) -> list[str]:
+        """
+        Get the lines that hold the most memory in the last snapshot.
+        """
+        if self.last_snapshot is None:
+            return []
+
+        return [str(stat) for stat in self.last_snapshot.statistics('lineno')[:self.top]]
+
+    def measure_retained_size(self, obj: Any) -> int:
+        """
+        Measure how many bytes a deepcopy of an object takes, which is the
+        amount of memory that is retained for each copy of a timetable.
+        """
+        before, _ = tracemalloc.get_traced_memory()
+        obj_copy = copy.deepcopy(obj)
+        after, _ = tracemalloc.get_traced_memory()
+        del obj_copy
+        return after - before
+
+    def report(self, timetable: Any = None) -> str:
+        """
+        Create the report with the memory usage, top allocations and the
+        snapshot differences.
+        """
+        _, peak = tracemalloc.get_traced_memory()
+        lines = [
+            'Memory usage:',
+            f'  - Peak RSS: {get_memory_usage()} MB',
+            f'  - Peak traced memory: {peak / 1024 / 1024:.2f} MB',
+        ]
+
+        if timetable is not None:
+            retained_size = self.measure_retained_size(timetable)
+            lines.append(f'  - Retained size of a timetable: {retained_size / 1024 / 1024:.2f} MB')
+
+        lines.append('')
+        lines.append('Top allocations:')
+        lines += [f'  {line}' for line in self.get_top_allocations()]
+
+        lines.append('')
+        lines.append('Snapshot differences:')
+        lines += self.sections
+
+        return '\n'.join(lines)
+
+
+def take_iteration_snapshot(iteration: int) -> None:
+    """
+    Take a memory snapshot every n-iterations if the memory is being profiled.
+    """
+    if memory_profiler is not None:
+        memory_profiler.take_iteration_snapshot(iteration)
+
+
+def memprofile(func: Callable, *args, every: int = 1000, top: int = 10, **kwargs) -> Any:
+    """
+    Run a function while tracing the memory allocations and write the report
+    to out/memprofile-<date>.txt. If the function returns an algorithm, the
+    retained size of its timetable is added to the report.
+    """
+    global memory_profiler
+
+    memory_profiler = MemoryProfiler(every, top)
+    memory_profiler.start()
+    result = None
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        memory_profiler.take_snapshot('end')
+        report = memory_profiler.report(getattr(result, 'timetable', None))
+        memory_profiler.stop()
+        memory_profiler = None
+
+        filepath = os.path.join(OUT_DIR, f'memprofile-{datetime.now().strftime("%Y%m%d-%H%M%S")}.txt')
+        with open(filepath, 'w') as file:
+            file.write(report + '\n')
+
+        logger.info(f'Saved memory profile to {filepath}')
+
+    return result
@@ -0,0 +1,203 @@
+"""
+This file contains the statistics recorder that algorithms use to keep track of
+their progress, which is used to plot the statistics after a run.
+"""
+
+from array import array
+from collections.abc import Generator
+import math
+import tempfile
+from typing import Any, Union
+
+
+class StatisticsRecorder:
+    """
+    Records rows of statistics in typed arrays, one array per column.
+
+    Rows that are equal to the previous row are stored as a single run with a
+    count, since local search algorithms tend to stay in the same state for a
+    lot of iterations. Once the amount of runs in memory reaches the spill
+    size, they are moved to a temporary file on disk, which keeps the memory
+    usage bounded for long runs.
+
+    The typecodes of the columns are the same as the ones of the array module,
+    for example: StatisticsRecorder({'malus_score': 'l'}).
+    """
+
+    def __init__(self, columns: dict[str, str], spill_size: int = 100000) -> None:
+        assert len(columns) > 0, 'there must be at least one column'
+        assert spill_size > 0, 'spill size must be a positive number'
+
+        self.columns = columns
+        self.spill_size = spill_size
+        self.clear()
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(columns:{list(self.columns)}, rows:{self.total_rows}, runs:{self.total_runs})'
+
+    def __len__(self) -> int:
+        """
+        Implements len() usage, which is the amount of rows that were added.
+        """
+        return self.total_rows
+
+    def __iter__(self) -> Generator:
+        """
+        Allows to iterate over all the rows, where each row is a dictionary.
+        """
+        names = list(self.columns)
+        for values, count in self.get_runs():
+            row = dict(zip(names, values))
+            for _ in range(count):
+                yield dict(row)
+
+    def __getstate__(self) -> dict[str, Any]:
+        """
+        Load the spilled runs back into memory when copying or pickling, since
+        the temporary file can't be copied.
+        """
+        state = self.__dict__.copy()
+        state['data'] = {name: array(typecode) for name, typecode in self.columns.items()}
+        state['counts'] = array('l')
+
+        for values, count in self.get_runs():
+            for name, value in zip(self.columns, values):
+                state['data'][name].append(value)
+            state['counts'].append(count)
+
+        state['spill_file'] = None
+        state['spill_chunks'] = []
+
+        return state
+
+    def clear(self) -> None:
+        """
+        Remove all the recorded rows.
+        """
+        self.data = {name: array(typecode) for name, typecode in self.columns.items()}
+        self.counts = array('l')
+        self.total_rows = 0
+        self.total_runs = 0
+        self.last_values: Union[tuple, None] = None
+        self.spill_file = None
+        self.spill_chunks: list[int] = []
+
+    def append(self, row: dict[str, Any]) -> None:
+        """
+        Add a row of statistics, which must contain a value for each column.
+        """
+        values = tuple(row[name] for name in self.columns)
+        self.total_rows += 1
+
+        # Increase the count of the last run if nothing has changed.
+        if len(self.counts) > 0 and values == self.last_values:
+            self.counts[-1] += 1
+            return
+
+        self.last_values = values
+
+        for name, value in zip(self.columns, values):
+            self.data[name].append(value)
+        self.counts.append(1)
+        self.total_runs += 1
+
+        if len(self.counts) >= self.spill_size:
+            self.spill()
+
+    def get_last_row(self) -> Union[dict[str, Any], None]:
+        """
+        Get the last row that has been added, or None if there are no rows.
+        """
+        if self.last_values is None:
+            return None
+
+        return dict(zip(self.columns, self.last_values))
+
+    def spill(self) -> None:
+        """
+        Move the runs that are in memory to a temporary file.
+        """
+        if self.spill_file is None:
+            self.spill_file = tempfile.TemporaryFile()
+
+        self.spill_file.seek(0, 2)
+        for name in self.columns:
+            self.data[name].tofile(self.spill_file)
+        self.counts.tofile(self.spill_file)
+        self.spill_chunks.append(len(self.counts))
+
+        self.data = {name: array(typecode) for name, typecode in self.columns.items()}
+        self.counts = array('l')
+
+    def get_spilled_runs(self) -> Generator:
+        """
+        Read the runs that were moved to disk, one chunk at a time.
+        """
+        if self.spill_file is None:
+            return
+
+        self.spill_file.seek(0)
+        for size in self.spill_chunks:
+            columns = []
+            for typecode in self.columns.values():
+                column = array(typecode)
+                column.fromfile(self.spill_file, size)
+                columns.append(column)
+
+            counts = array('l')
+            counts.fromfile(self.spill_file, size)
+
+            for index in range(size):
+                yield tuple(column[index] for column in columns), counts[index]
+
+    def get_runs(self) -> Generator:
+        """
+        Iterate over all the runs, which are the row values along with the
+        amount of times they occurred in a row.
+        """
+        yield from self.get_spilled_runs()
+
+        columns = [self.data[name] for name in self.columns]
+        for index, count in enumerate(self.counts):
+            yield tuple(column[index] for column in columns), count
+
+    def get_column(self, name: str) -> list:
+        """
+        Get all the values of a single column.
+        """
+        index = list(self.columns).index(name)
+        return [values[index] for values, count in self.get_runs() for _ in range(count)]
+
+    def get_series(self, name: str, max_points: int = 10000) -> tuple[list[int], list]:
+        """
+        Get the row numbers (starting at 1) and values of a single column for
+        plotting, where every n-th row is taken if there are more rows than the
+        maximum amount of points. The last row is always included.
+        """
+        index = list(self.columns).index(name)
+        step = max(1, math.ceil(self.total_rows / max_points))
+
+        x = []
+        y = []
+        row_number = 0
+        for values, count in self.get_runs():
+            # Find the first row number within this run that is a multiple of
+            # the step size, relative to the first row.
+            first = row_number + (-row_number % step)
+            for number in range(first, row_number + count, step):
+                x.append(number + 1)
+                y.append(values[index])
+            row_number += count
+
+        if len(x) > 0 and x[-1] != self.total_rows:
+            x.append(self.total_rows)
+            y.append(self.get_last_row()[name])
+
+        return x, y
+
+    def min(self, name: str) -> Any:
+        """
+        Get the lowest value of a single column.
+        """
+        index = list(self.columns).index(name)
+        return min(values[index] for values, _ in self.get_runs())
@@ -9,8 +9,13 @@ def print_algorithm_info(algorithm: Algorithm):
     """
     Print statistics for an algorithm that has been executed.
     """
+    malus_score = algorithm.timetable.calculate_malus_score()
+    lower_bound = algorithm.timetable.compute_lower_bound()
+
     logger.info('Timetable info:')
     logger.info(f'  - Solution: {algorithm.timetable.is_solution()}')
     logger.info(f'  - Total timeslots: {algorithm.timetable.get_total_timeslots()}')
-    logger.info(f'  - Malus score: {algorithm.timetable.calculate_malus_score()}')
+    logger.info(f'  - Malus score: {malus_score}')
+    logger.info(f'  - Lower bound: {lower_bound}')
+    logger.info(f'  - Optimality gap: {malus_score - lower_bound}')
     logger.info(f'  - Total violations: {len(algorithm.timetable.get_violations())}')
@@ -0,0 +1,163 @@
+"""
+This file contains data structures that are used throughout the project.
+"""
+
+from collections import OrderedDict
+from collections.abc import Generator, Hashable
+import random
+from typing import Any, Union
+
+
+class IndexedSet:
+    """
+    A set that keeps its items in a list along with a map from each item to its
+    position in that list, which allows O(1) add, remove, membership tests and
+    uniform random sampling.
+    """
+
+    def __init__(self, items: Any=None) -> None:
+        self.items: list[Hashable] = []
+        self.positions: dict[Hashable, int] = {}
+
+        if items is not None:
+            for item in items:
+                self.add(item)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.items})'
+
+    def __len__(self) -> int:
+        """
+        Implements len() usage.
+        """
+        return len(self.items)
+
+    def __contains__(self, item: Hashable) -> bool:
+        """
+        Implements the `in` operator.
+        """
+        return item in self.positions
+
+    def __iter__(self) -> Generator:
+        """
+        Allows to iterate over the items.
+        """
+        for item in self.items:
+            yield item
+
+    def add(self, item: Hashable) -> None:
+        """
+        Add an item if it is not in the set yet.
+        """
+        if item not in self.positions:
+            self.positions[item] = len(self.items)
+            self.items.append(item)
+
+    def remove(self, item: Hashable) -> None:
+        """
+        Remove an item by moving the last item into its position.
+        """
+        index = self.positions.pop(item)
+        last_item = self.items.pop()
+
+        if index < len(self.items):
+            self.items[index] = last_item
+            self.positions[last_item] = index
+
+    def discard(self, item: Hashable) -> None:
+        """
+        Remove an item if it is present.
+        """
+        if item in self.positions:
+            self.remove(item)
+
+    def clear(self) -> None:
+        """
+        Remove all items.
+        """
+        self.items = []
+        self.positions = {}
+
+    def copy(self) -> 'IndexedSet':
+        """
+        Create a copy of the set with the items in the same order.
+        """
+        indexed_set = IndexedSet()
+        indexed_set.items = list(self.items)
+        indexed_set.positions = dict(self.positions)
+        return indexed_set
+
+    def choice(self) -> Hashable:
+        """
+        Get a uniformly chosen random item.
+        """
+        return random.choice(self.items)
+
+    def sample(self, k: int) -> list[Hashable]:
+        """
+        Get k different uniformly chosen random items.
+        """
+        return random.sample(self.items, k)
+
+
+class TranspositionTable:
+    """
+    A bounded cache that maps the state hash of a timetable to its amount of
+    violations and malus score, which allows a search to recognise a state it
+    has visited before without scoring it again. The least recently used state
+    is removed when the table is full.
+    """
+
+    def __init__(self, max_size: int = 100000) -> None:
+        assert max_size > 0, 'max size must be a positive number'
+
+        self.max_size = max_size
+        self.entries: OrderedDict[int, tuple[int, int]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(entries:{len(self.entries)}, hits:{self.hits}, misses:{self.misses})'
+
+    def __len__(self) -> int:
+        """
+        Implements len() usage.
+        """
+        return len(self.entries)
+
+    def __contains__(self, state_hash: int) -> bool:
+        """
+        Implements the `in` operator.
+        """
+        return state_hash in self.entries
+
+    def get(self, state_hash: int) -> Union[tuple[int, int], None]:
+        """
+        Get the violations and malus score of a visited state, or None if the
+        state has not been visited or has been removed from the table.
+        """
+        if state_hash not in self.entries:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.entries.move_to_end(state_hash)
+        return self.entries[state_hash]
+
+    def put(self, state_hash: int, violations: int, malus_score: int) -> None:
+        """
+        Store the violations and malus score of a state.
+        """
+        self.entries[state_hash] = (violations, malus_score)
+        self.entries.move_to_end(state_hash)
+
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Remove all states and reset the counters.
+        """
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
@@ -9,6 +9,7 @@ import concurrent.futures
 from code.algorithms.greedy import Greedy, GreedyLSD
 from code.algorithms.hillclimber import HillClimber
 from code.algorithms.randomizer import Randomizer
+from code.entities.problem_instance import ProblemInstance
 
 
 def plot_hillclimber_stats(iterations: int) -> None:
@@ -17,13 +18,14 @@ def plot_hillclimber_stats(iterations: int) -> None:
     """
     stats = {}
     algorithms = [Randomizer, Greedy, GreedyLSD]
+    problem = ProblemInstance.load()
 
     # Run the algorithms in parallel to speed up the generation.
     with concurrent.futures.ThreadPoolExecutor(max_workers=len(algorithms)) as executor:
         workers = []
         for class_ref in algorithms:
             def worker():
-                instance = class_ref()
+                instance = class_ref(problem)
                 hc = HillClimber(instance)
                 hc.run(iterations)
                 class_name = instance.__class__.__name__
@@ -39,8 +41,7 @@ def plot_hillclimber_stats(iterations: int) -> None:
         plt.ylabel('malus points')
 
         iterations = len(stats)
-        x = range(1, iterations + 1)
-        y = [stat['malus_score'] for stat in stats]
+        x, y = stats.get_series('malus_score')
         plt.plot(x, y, label=class_name)
 
     plt.legend()
@@ -7,6 +7,7 @@ import matplotlib.pyplot as plt
 
 from code.algorithms.hillclimber import HillClimber
 from code.algorithms.tabu_search import TabuSearch
+from code.entities.problem_instance import ProblemInstance
 
 
 def plot_hillclimber_vs_tabu_stats(iterations: int) -> None:
@@ -15,13 +16,14 @@ def plot_hillclimber_vs_tabu_stats(iterations: int) -> None:
     """
     stats = {}
     algorithms = [TabuSearch, HillClimber]
+    problem = ProblemInstance.load()
 
     # Run the algorithms in parallel to speed up the generation.
     with concurrent.futures.ThreadPoolExecutor(max_workers=len(algorithms)) as executor:
         workers = []
         for class_ref in algorithms:
             def worker():
-                instance = class_ref()
+                instance = class_ref(problem=problem)
                 instance.run(iterations)
                 class_name = instance.__class__.__name__
                 stats[class_name] = instance.statistics
@@ -36,8 +38,7 @@ def plot_hillclimber_vs_tabu_stats(iterations: int) -> None:
         plt.ylabel('malus points')
 
         iterations = len(stats)
-        x = range(1, iterations + 1)
-        y = [stat['malus_score'] for stat in stats]
+        x, y = stats.get_series('malus_score')
         plt.plot(x, y, label=class_name)
 
     plt.legend()
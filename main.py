@@ -3,6 +3,7 @@
 import argparse
 from datetime import datetime
 import logging
+from code.algorithms.branch_and_bound import BranchAndBound
 from code.algorithms.tabu_search import TabuSearch
 from code.visualizations.graph_coloring import plot_course_conflict_graph
 from code.visualizations.hillclimber import plot_hillclimber_stats
@@ -13,7 +14,12 @@ from code.algorithms.base import Algorithm
 from code.algorithms.greedy import Greedy, RandomGreedy, GreedyLSD
 from code.algorithms.hillclimber import HillClimber
 from code.algorithms.randomizer import Randomizer
+from code.entities.problem_instance import ProblemInstance
+from code.entities.timetable import Timetable
 from code.utils.constants import LOG_DIR
+from code.utils.metrics import JsonLinesSink
+from code.utils.probes import registry
+from code.utils.profiling import memprofile, phase, profile
 from code.utils.statistics import print_algorithm_info
 
 
@@ -73,15 +79,19 @@ def parse_arguments() -> argparse.Namespace:
                         help='Show any of the visualizations of choice (will not run any other code besides this)')
 
     parser.add_argument('-a', '--algorithm',
-                        choices=['random', 'greedy', 'random-greedy', 'greedy-lsd', 'hillclimber', 'tabu-search'],
+                        choices=['random', 'greedy', 'random-greedy', 'greedy-lsd', 'hillclimber', 'tabu-search', 'branch-and-bound'],
                         help='Run any of the algorithms of choice')
 
     parser.add_argument('-e', '--export',
-                        choices=['csv', 'ics', 'json'],
+                        choices=['csv', 'ics', 'json', 'bin'],
                         action='append',
                         help='Export the timetable result to one of the available choices',
                         nargs='?')
 
+    parser.add_argument('--gzip',
+                        action='store_true',
+                        help='Compress the CSV export with gzip (used with --export csv)')
+
     parser.add_argument('-s', '--plot-stats',
                         action='store_true',
                         help='Plot the statistics after the algorithm has finished running')
@@ -99,53 +109,161 @@ def parse_arguments() -> argparse.Namespace:
                         action='store_true',
                         help='Print timetable debug information, such as malus point calculation details')
 
+    parser.add_argument('--metrics-out',
+                        help='Write progress events as JSON lines to this file while the algorithm runs')
+
+    parser.add_argument('--metrics-every',
+                        type=int,
+                        default=100,
+                        help='Emit a progress event every n-iterations (used with --metrics-out)')
+
+    # Profiling the time and tracing the memory influence each other, so only
+    # one of them can be used at a time.
+    profile_group = parser.add_mutually_exclusive_group()
+    profile_group.add_argument('--profile',
+                              action='store_true',
+                              help='Profile the run with cProfile and save the profile and a summary in the out/ folder')
+
+    parser.add_argument('--profile-top',
+                        type=int,
+                        default=30,
+                        help='Amount of functions or allocation sites to show in the profile summary (used with --profile and --memprofile)')
+
+    profile_group.add_argument('--memprofile',
+                              action='store_true',
+                              help='Trace memory allocations and save a report with snapshot differences in the out/ folder')
+
+    parser.add_argument('--memprofile-every',
+                        type=int,
+                        default=1000,
+                        help='Take a memory snapshot every n-iterations of a local search (used with --memprofile)')
+
+    parser.add_argument('--probes',
+                        action='store_true',
+                        help='Count the calls and time of the hot functions and save a report in the out/ folder (same as LESROOSTER_PROBES=1)')
+
+    # -- LOCAL SEARCH ALGORITHM ARGUMENTS --------------------------------------
+    parser.add_argument('--initial',
+                        help='Start from a previously exported .json, .csv, .csv.gz or .bin timetable instead of constructing one (hillclimber and tabu-search only)')
+
+    parser.add_argument('--balance-iterations',
+                        type=int,
+                        default=10000,
+                        help='Amount of student swaps that balance the student groups of the initial timetable (hillclimber and tabu-search only)')
+
+    parser.add_argument('--reassign-rooms',
+                        action='store_true',
+                        help='Give the events the best rooms after each move instead of only at the end, which finds better timetables per iteration at a higher cost per iteration (hillclimber and tabu-search only)')
+
+    parser.add_argument('--checkpoint',
+                        help='Save a checkpoint to this file while the algorithm runs (hillclimber and tabu-search only)')
+
+    parser.add_argument('--checkpoint-every',
+                        type=int,
+                        default=1000,
+                        help='Save a checkpoint every n-iterations (used with --checkpoint)')
+
+    parser.add_argument('--resume',
+                        help='Continue the run from this checkpoint file instead of starting over (hillclimber and tabu-search only)')
+
     # -- RANDOM ALGORITHM ARGUMENTS --------------------------------------------
     parser.add_argument('--random-walk',
                         action='store_true',
                         help='Do a random walk and plot the results (random algorithm only)')
 
+    # -- BRANCH AND BOUND ALGORITHM ARGUMENTS ----------------------------------
+    parser.add_argument('-c', '--course',
+                        action='append',
+                        help='Only schedule this course, can be used multiple times (branch-and-bound only)')
+
+    parser.add_argument('--time-limit',
+                        type=float,
+                        help='Stop searching after this amount of seconds (branch-and-bound only)')
+
     return parser.parse_args()
 
 
-def run_algorithm(args: argparse.Namespace):
+def run_algorithm(args: argparse.Namespace) -> Algorithm:
     """
     Run any of the selected algorithms.
 
     :param args: The parsed command-line arguments.
+    :returns: The algorithm that has been run.
     """
+    # The problem is loaded once and shared by all timetables of the run.
+    problem = ProblemInstance.load()
+
     algorithm = None
     if args.algorithm == 'random':
-        algorithm = Randomizer()
+        algorithm = Randomizer(problem)
     elif args.algorithm == 'greedy':
-        algorithm = Greedy()
+        algorithm = Greedy(problem)
     elif args.algorithm == 'random-greedy':
-        algorithm = RandomGreedy()
+        algorithm = RandomGreedy(problem)
     elif args.algorithm == 'greedy-lsd':
-        algorithm = GreedyLSD()
+        algorithm = GreedyLSD(problem)
     elif args.algorithm == 'hillclimber':
-        algorithm = HillClimber()
+        algorithm = HillClimber(balance_iterations=args.balance_iterations, reassign_rooms=args.reassign_rooms, problem=problem)
     elif args.algorithm == 'tabu-search':
-        algorithm = TabuSearch()
+        algorithm = TabuSearch(balance_iterations=args.balance_iterations, reassign_rooms=args.reassign_rooms, problem=problem)
+    elif args.algorithm == 'branch-and-bound':
+        algorithm = BranchAndBound(args.course, args.time_limit, problem)
 
     assert isinstance(algorithm, Algorithm), 'algorithm must be an instance of Algorithm'
+    assert args.balance_iterations >= 0, 'balance-iterations must not be a negative number'
 
     if isinstance(algorithm, Randomizer) and args.iterations > 1 and args.random_walk:
         algorithm.plot_random_walk(args.iterations)
-        return
+        return algorithm
+
+    if args.initial is not None:
+        assert isinstance(algorithm, (HillClimber, TabuSearch)), 'an initial timetable is only supported by hillclimber and tabu-search'
+
+        initial_timetable = Timetable(problem=problem)
+        initial_timetable.import_file(args.initial)
+        algorithm.initial_timetable = initial_timetable
+
+    if args.checkpoint is not None or args.resume is not None:
+        assert isinstance(algorithm, (HillClimber, TabuSearch)), 'checkpoints are only supported by hillclimber and tabu-search'
+
+        if args.checkpoint is not None:
+            algorithm.enable_checkpoints(args.checkpoint, args.checkpoint_every)
+
+        if args.resume is not None:
+            algorithm.resume(args.resume)
+
+    metrics_sink = None
+    if args.metrics_out is not None:
+        assert args.metrics_every > 0, 'metrics-every must be a positive number'
+        metrics_sink = JsonLinesSink(args.metrics_out)
+        algorithm.metrics.every = args.metrics_every
+        algorithm.metrics.subscribe(metrics_sink)
+
+    try:
+        algorithm.run(args.iterations)
+    finally:
+        if metrics_sink is not None:
+            metrics_sink.close()
 
-    algorithm.run(args.iterations)
     print_algorithm_info(algorithm)
 
+    if registry.enabled:
+        logging.getLogger('probes').info(f'Probes report:\n{registry.report(args.iterations)}')
+        logging.getLogger('probes').info(f'Saved probes report to {registry.save_report(args.iterations)}')
+
     if args.debug_timetable:
         algorithm.timetable.print_debug_info()
 
     if args.export is not None:
-        if 'csv' in args.export:
-            algorithm.timetable.export_csv()
-        if 'ics' in args.export:
-            algorithm.timetable.export_ics()
-        if 'json' in args.export:
-            algorithm.timetable.export_json()
+        with phase('export'):
+            if 'csv' in args.export:
+                algorithm.timetable.export_csv(compress=args.gzip)
+            if 'ics' in args.export:
+                algorithm.timetable.export_ics()
+            if 'json' in args.export:
+                algorithm.timetable.export_json()
+            if 'bin' in args.export:
+                algorithm.timetable.export_binary()
 
     if args.plot_stats:
         algorithm.plot_statistics()
@@ -153,6 +271,8 @@ def run_algorithm(args: argparse.Namespace):
     if args.plot_heatmap:
         algorithm.timetable.plot_heatmap()
 
+    return algorithm
+
 
 def show_visualization(args) -> None:
     """
@@ -174,6 +294,11 @@ def main():
     args = parse_arguments()
     setup_logging(level=args.log_level, quiet=args.quiet)
 
+    if args.probes:
+        registry.enable()
+    else:
+        registry.enable_from_environment()
+
     # Immediately log as an indication that the program has initialized.
     logger = logging.getLogger('global')
     logger.info('='*45)
@@ -185,7 +310,12 @@ def main():
         show_visualization(args)
     else:
         logger.info(f'Selected algorithm: {args.algorithm}')
-        run_algorithm(args)
+        if args.profile:
+            profile(run_algorithm, args, top=args.profile_top)
+        elif args.memprofile:
+            memprofile(run_algorithm, args, every=args.memprofile_every, top=args.profile_top)
+        else:
+            run_algorithm(args)
 
 
 if __name__ == '__main__':
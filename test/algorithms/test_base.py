@@ -9,6 +9,7 @@ from code.entities.room import Room
 from code.entities.student import Student
 from code.entities.timetable import Timetable
 from code.utils.enums import EventType
+from code.utils.structures import TranspositionTable
 
 class DummyAlgorithm(Algorithm):
 
@@ -59,6 +60,23 @@ class TestBaseAlgorithm(TestCase):
     def _new_dummy_algorithm(self) -> Algorithm:
         return DummyAlgorithm(Timetable(*self.timetable_args))
 
+    def test_score_state(self) -> None:
+        dummy_algorithm = self._new_dummy_algorithm()
+        timetable = dummy_algorithm.timetable
+        timetable.add_event(Event('foo', EventType.LECTURE, self.course1, 1, 17, self.room1, [self.student1]))
+        scores = (len(timetable.get_violations()), timetable.calculate_malus_score())
+        self.assertEqual(dummy_algorithm.score_state(timetable), scores)
+
+        # A visited state is not scored again.
+        dummy_algorithm.transpositions = TranspositionTable()
+        self.assertEqual(dummy_algorithm.score_state(timetable), scores)
+        with mock.patch.object(Timetable, 'calculate_malus_score') as mock_calculate_malus_score:
+            self.assertEqual(dummy_algorithm.score_state(timetable.snapshot()), scores)
+            mock_calculate_malus_score.assert_not_called()
+
+        self.assertEqual(dummy_algorithm.transpositions.hits, 1)
+        self.assertEqual(dummy_algorithm.transpositions.misses, 1)
+
     def test_permute_students_for_random_course(self) -> None:
         dummy_algorithm = self._new_dummy_algorithm()
 
@@ -89,6 +107,74 @@ class TestBaseAlgorithm(TestCase):
         self.assertEqual(event2.students[0] == self.student4, True)
         self.assertEqual(event2.students[1] == self.student2, True)
 
+    def test_get_random_student_groups(self) -> None:
+        dummy_algorithm = self._new_dummy_algorithm()
+        self.assertEqual(dummy_algorithm.get_random_student_groups(), None)
+
+        event1 = Event('foo 1', EventType.SEMINAR, self.course1, 1, 9, self.room1, [self.student1, self.student2])
+        event2 = Event('foo 2', EventType.SEMINAR, self.course1, 2, 9, self.room1, [self.student3, self.student4])
+        event3 = Event('bar', EventType.LECTURE, self.course2, 3, 15, self.room2)
+
+        dummy_algorithm.timetable.add_event(event1)
+        dummy_algorithm.timetable.add_event(event3)
+        self.assertEqual(dummy_algorithm.get_random_student_groups(), None)
+
+        dummy_algorithm.timetable.add_event(event2)
+        self.assertEqual(dummy_algorithm.get_random_student_groups(), [event1, event2])
+
+    def test_swap_students_for_random_course(self) -> None:
+        dummy_algorithm = self._new_dummy_algorithm()
+        self.assertEqual(dummy_algorithm.swap_students_for_random_course(), False)
+
+        event1 = Event('foo 1', EventType.SEMINAR, self.course1, 1, 9, self.room1, [self.student1, self.student2])
+        event2 = Event('foo 2', EventType.SEMINAR, self.course1, 2, 9, self.room1, [self.student3, self.student4])
+
+        dummy_algorithm.timetable.add_event(event1)
+        dummy_algorithm.timetable.add_event(event2)
+
+        # Any swap between these groups does not change the malus score.
+        random.seed(0)
+        self.assertEqual(dummy_algorithm.swap_students_for_random_course(), True)
+        self.assertEqual(len(event1.students), 2)
+        self.assertEqual(len(event2.students), 2)
+        self.assertNotEqual(sorted(event1.students), [self.student1, self.student2])
+        self.assertEqual(sorted(event1.students + event2.students),
+                         sorted([self.student1, self.student2, self.student3, self.student4]))
+
+        # Student 1 has a lecture on tuesday at 15:00, so moving student 1 to
+        # tuesday 9:00 would add an empty timeslot between both events.
+        dummy_algorithm = self._new_dummy_algorithm()
+        event1 = Event('foo 1', EventType.SEMINAR, self.course1, 1, 9, self.room1, [self.student1])
+        event2 = Event('foo 2', EventType.SEMINAR, self.course1, 2, 9, self.room1, [self.student3])
+        event3 = Event('bar', EventType.LECTURE, self.course2, 2, 13, self.room2, [self.student1])
+
+        dummy_algorithm.timetable.add_event(event1)
+        dummy_algorithm.timetable.add_event(event2)
+        dummy_algorithm.timetable.add_event(event3)
+
+        self.assertEqual(dummy_algorithm.swap_students_for_random_course(), False)
+        self.assertEqual(event1.students, [self.student1])
+        self.assertEqual(event2.students, [self.student3])
+
+    def test_balance_student_groups(self) -> None:
+        dummy_algorithm = self._new_dummy_algorithm()
+
+        event1 = Event('foo 1', EventType.SEMINAR, self.course1, 1, 9, self.room1, [self.student1, self.student2])
+        event2 = Event('foo 2', EventType.SEMINAR, self.course1, 1, 11, self.room1, [self.student3, self.student4])
+        event3 = Event('bar', EventType.LECTURE, self.course2, 1, 11, self.room2, [self.student3])
+
+        dummy_algorithm.timetable.add_event(event1)
+        dummy_algorithm.timetable.add_event(event2)
+        dummy_algorithm.timetable.add_event(event3)
+        self.assertEqual(dummy_algorithm.timetable.calculate_malus_score(), 1)
+
+        # Student 3 should be moved out of the seminar that overlaps with the
+        # lecture of student 3.
+        random.seed(0)
+        dummy_algorithm.balance_student_groups(100)
+        self.assertEqual(dummy_algorithm.timetable.calculate_malus_score(), 0)
+        self.assertEqual(self.student3 in event1.students, True)
+
     def test_swap_two_events(self) -> None:
         dummy_algorithm = self._new_dummy_algorithm()
 
@@ -198,6 +284,38 @@ class TestBaseAlgorithm(TestCase):
 
         self.assertEqual(is_different_timeslot, True)
 
+    def test_reassign_rooms_after_move(self) -> None:
+        dummy_algorithm = self._new_dummy_algorithm()
+        timetable = dummy_algorithm.timetable
+        event1 = Event('foo', EventType.LECTURE, self.course1, 1, 9, self.room2, [self.student1, self.student2])
+        event2 = Event('bar', EventType.LECTURE, self.course2, 1, 9, self.room1, [self.student3])
+        timetable.add_event(event1)
+        timetable.add_event(event2)
+
+        # The rooms are only reassigned if it has been enabled.
+        dummy_algorithm.reassign_rooms_after_move([event1])
+        self.assertEqual(timetable.get_event(event1.id).room, self.room2)
+
+        dummy_algorithm.reassign_rooms = True
+        dummy_algorithm.reassign_rooms_after_move([event1])
+        self.assertEqual(timetable.get_event(event1.id).room, self.room1)
+        self.assertEqual(timetable.get_event(event2.id).room, self.room2)
+
+        # A moved event gets the room that fits best in its new timeslot.
+        timetable.remove_event(event2)
+        dummy_algorithm.move_random_event()
+        self.assertEqual(timetable.get_events()[0].room, self.room1)
+
+    def test_optimize_rooms(self) -> None:
+        dummy_algorithm = self._new_dummy_algorithm()
+        timetable = dummy_algorithm.timetable
+        event = Event('foo', EventType.LECTURE, self.course1, 1, 9, self.room2, [self.student1, self.student2])
+        timetable.add_event(event)
+
+        self.assertEqual(dummy_algorithm.optimize_rooms(), True)
+        self.assertEqual(timetable.get_event(event.id).room, self.room1)
+        self.assertEqual(dummy_algorithm.optimize_rooms(timetable), False)
+
     def test_move_high_malus_score_events(self) -> None:
         dummy_algorithm = self._new_dummy_algorithm()
 
@@ -235,8 +353,8 @@ class TestBaseAlgorithm(TestCase):
 
     @mock.patch('random.random')
     def test_mutate_state(self, mock_random) -> None:
-        random.seed(0)
-        mock_random_values = [0, 0.3, 0.6, 0.9]
+        random.seed(1)
+        mock_random_values = [0, 0.3, 0.6, 0.85]
         for mock_value in mock_random_values:
             mock_random.return_value = mock_value
             dummy_algorithm = self._new_dummy_algorithm()
@@ -250,3 +368,10 @@ class TestBaseAlgorithm(TestCase):
             old_timetable = copy.deepcopy(dummy_algorithm.timetable)
             dummy_algorithm.mutate_state()
             self.assertEqual(dummy_algorithm.timetable != old_timetable, True)
+
+        # The last action swaps two students within a course.
+        mock_random.return_value = 0.95
+        dummy_algorithm = self._new_dummy_algorithm()
+        with mock.patch.object(dummy_algorithm, 'swap_students_for_random_course') as mock_swap_students:
+            dummy_algorithm.mutate_state()
+            mock_swap_students.assert_called_once_with(dummy_algorithm.timetable)
@@ -0,0 +1,41 @@
+from unittest import TestCase
+
+from code.algorithms.branch_and_bound import BranchAndBound
+
+class TestBranchAndBound(TestCase):
+
+    def setUp(self) -> None:
+        self.course_names = ['Heuristieken 1', 'Heuristieken 2']
+
+    def test_init(self) -> None:
+        algorithm = BranchAndBound(self.course_names)
+        self.assertEqual([course.name for course in algorithm.timetable.courses], self.course_names)
+        self.assertRaises(AssertionError, BranchAndBound, ['foo'])
+
+    def test_run(self) -> None:
+        algorithm = BranchAndBound(self.course_names)
+        algorithm.run()
+
+        self.assertEqual(algorithm.is_optimal, True)
+        self.assertEqual(algorithm.best_score, 0)
+        self.assertEqual(len(algorithm.timetable.get_events()), 6)
+        self.assertEqual(algorithm.timetable.calculate_malus_score(), algorithm.best_score)
+        self.assertEqual(algorithm.timetable.is_solution(), True)
+
+    def test_run_time_limit(self) -> None:
+        algorithm = BranchAndBound(self.course_names, time_limit=0)
+        algorithm.run()
+        self.assertEqual(algorithm.is_optimal, False)
+        self.assertEqual(algorithm.timetable.get_events(), [])
+
+    def test_calculate_room_overfitting(self) -> None:
+        algorithm = BranchAndBound(self.course_names)
+        algorithm.run()
+
+        # The largest room has a capacity of 117.
+        self.assertEqual(algorithm.calculate_room_overfitting([120], 17), 3)
+        self.assertEqual(algorithm.calculate_room_overfitting([10, 10], 17), None)
+
+        # The two largest rooms have a capacity of 117 and 60.
+        self.assertEqual(algorithm.calculate_room_overfitting([70, 120], 9), 13)
+        self.assertEqual(algorithm.calculate_room_overfitting([1 for _ in range(8)], 9), None)
@@ -0,0 +1,60 @@
+import random
+from unittest import TestCase, mock
+
+from code.algorithms.repair import RepairSearch
+from code.entities.course import Course
+from code.entities.event import Event
+from code.entities.room import Room
+from code.entities.student import Student
+from code.entities.timetable import Timetable
+from code.utils.enums import EventType
+
+class TestRepairSearch(TestCase):
+
+    @mock.patch('code.utils.data.load_students')
+    @mock.patch('code.utils.data.load_courses')
+    @mock.patch('code.utils.data.load_rooms')
+    def setUp(self, mock_load_rooms, mock_load_courses, mock_load_students) -> None:
+        self.room1 = Room('C0.110', 4, True)
+        self.room2 = Room('C1.04', 4)
+        mock_load_rooms.return_value = [self.room1, self.room2]
+
+        self.course1 = Course('foo', 1, 0, 0, 0, 0, 3)
+        self.course2 = Course('bar', 1, 0, 0, 0, 0, 2)
+        mock_load_courses.return_value = [self.course1, self.course2]
+
+        self.student1 = Student('John', 'Doe', '1', ['foo', 'bar'])
+        self.student2 = Student('Mary', 'Jane', '2', ['foo'])
+        self.student3 = Student('Steven', 'London', '3', ['bar', 'foo'])
+        mock_load_students.return_value = [self.student1, self.student2, self.student3]
+
+        self.timetable = Timetable(mock_load_rooms, mock_load_courses, mock_load_students)
+
+        # Both lectures are in the same timeslot, so two students overlap.
+        self.event1 = Event('foo hoorcollege', EventType.LECTURE, self.course1, 1, 9, self.room1,
+                            [self.student1, self.student2, self.student3])
+        self.event2 = Event('bar hoorcollege', EventType.LECTURE, self.course2, 1, 9, self.room2,
+                            [self.student1, self.student3])
+        self.timetable.add_event(self.event1)
+        self.timetable.add_event(self.event2)
+
+    def test_run(self) -> None:
+        random.seed(0)
+        malus_score = self.timetable.calculate_malus_score()
+
+        self.timetable.mark_dirty(self.event2)
+        repair_search = RepairSearch(self.timetable)
+        repair_search.run(50)
+
+        self.assertEqual(len(repair_search.statistics), 50)
+        self.assertEqual(self.timetable.calculate_malus_score() < malus_score, True)
+        self.assertEqual(len(self.timetable.get_violations()), 0)
+        self.assertEqual(len(self.timetable.get_events()), 2)
+        self.assertEqual(self.timetable.dirty_event_ids, set())
+
+    def test_run_without_dirty_events(self) -> None:
+        repair_search = RepairSearch(self.timetable)
+        repair_search.run(50)
+
+        self.assertEqual(len(repair_search.statistics), 0)
+        self.assertEqual(self.timetable.get_events(), [self.event1, self.event2])
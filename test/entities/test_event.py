@@ -1,3 +1,4 @@
+import copy
 from unittest import TestCase
 
 from code.entities.course import Course
@@ -22,6 +23,23 @@ class TestEvent(TestCase):
         self.assertEqual(event.room, room)
         self.assertEqual(event.students, [])
 
+    def test_deepcopy(self) -> None:
+        course = Course('foo', 1, 2, 10, 0, 0, 22)
+        room = Room('C0.110', 50)
+        student = Student('John', 'Doe', '1', ['foo'])
+        event = Event('foo', EventType.LECTURE, course, 1, 9, room, [student])
+
+        event_copy = copy.deepcopy(event)
+        event_copy.set_timeslot(11)
+        event_copy.add_student(Student('Mary', 'Jane', '2', ['foo']))
+
+        self.assertEqual(event_copy.id, event.id)
+        self.assertEqual(event_copy.course is course, True)
+        self.assertEqual(event_copy.room is room, True)
+        self.assertEqual(event_copy.students[0] is student, True)
+        self.assertEqual(event.timeslot, 9)
+        self.assertEqual(event.students, [student])
+
     def test_lt(self) -> None:
         course = Course('foo', 1, 2, 10, 0, 0, 22)
 
@@ -84,9 +102,13 @@ class TestEvent(TestCase):
             'weekday': 1,
             'timeslot': 9,
             'room': 'C1.08',
+            'students': [],
         }
         self.assertEqual(event.serialize(), output)
 
+        del output['students']
+        self.assertEqual(event.serialize(include_students=False), output)
+
     def test_set_room(self) -> None:
         room1 = Room('C1.08', 50)
         event = Event('foo', EventType.LECTURE, Course('bar', 1, 2, 10, 0, 0, 22), 1, 9, room1)
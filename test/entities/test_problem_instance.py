@@ -0,0 +1,106 @@
+import copy
+from unittest import TestCase, mock
+
+from code.entities.course import Course
+from code.entities.problem_instance import ProblemInstance
+from code.entities.room import Room
+from code.entities.student import Student
+
+class TestProblemInstance(TestCase):
+
+    def setUp(self) -> None:
+        self.room1 = Room('C0.110', 5, True)
+        self.room2 = Room('C1.04', 2)
+        self.course1 = Course('foo', 1, 0, 0, 0, 0, 2)
+        self.course2 = Course('bar', 1, 0, 0, 0, 0, 1)
+        self.student1 = Student('John', 'Doe', '1', ['foo', 'bar'])
+        self.student2 = Student('Mary', 'Jane', '2', ['foo'])
+        self.problem = ProblemInstance([self.room1, self.room2], [self.course1, self.course2],
+                                       [self.student1, self.student2])
+
+    def test_init(self) -> None:
+        self.assertEqual(self.course1.enrolled_students, [self.student1, self.student2])
+        self.assertEqual(self.course2.enrolled_students, [self.student1])
+        self.assertEqual(self.course1.conflicting_courses, ['bar'])
+        self.assertEqual(self.course2.conflicting_courses, ['foo'])
+        self.assertEqual(dict(self.problem.conflicting_course_names), {'bar': ('foo',), 'foo': ('bar',)})
+
+    def test_load(self) -> None:
+        load_rooms = mock.MagicMock(return_value=[self.room1])
+        load_courses = mock.MagicMock(return_value=[self.course1])
+        load_students = mock.MagicMock(return_value=[self.student2])
+
+        problem = ProblemInstance.load(load_rooms, load_courses, load_students)
+        self.assertEqual(load_rooms.call_count, 1)
+        self.assertEqual(problem.students, (self.student2,))
+
+        # Each load creates a new problem instance, which has to be passed to
+        # the timetables that share it.
+        self.assertEqual(ProblemInstance.load(load_rooms, load_courses, load_students) is problem, False)
+        self.assertEqual(load_rooms.call_count, 2)
+
+    def test_deepcopy(self) -> None:
+        self.assertEqual(copy.deepcopy(self.problem) is self.problem, True)
+        self.assertEqual(copy.deepcopy([self.problem])[0] is self.problem, True)
+
+    def test_copy(self) -> None:
+        memo = {}
+        problem = self.problem.copy(memo)
+
+        self.assertEqual(problem is self.problem, False)
+        self.assertEqual(problem.courses, list(self.problem.courses))
+        self.assertEqual(problem.courses[0] is self.course1, False)
+        self.assertEqual(memo[id(self.course1)] is problem.courses[0], True)
+        self.assertEqual(memo[id(self.student1)] is problem.students[0], True)
+
+        problem.courses[0].register_students([])
+        self.assertEqual(self.course1.enrolled_students, [self.student1, self.student2])
+
+        # The copy can be changed, unlike the shared problem instance.
+        problem.courses.append(Course('baz', 1, 0, 0, 0, 0, 1))
+        problem.conflicting_course_names['foo'].append('baz')
+        problem.set_rooms([self.room1])
+        self.assertEqual(len(self.problem.courses), 2)
+        self.assertEqual(self.problem.conflicting_course_names['foo'], ('bar',))
+
+    def test_read_only(self) -> None:
+        with self.assertRaises(AttributeError):
+            self.problem.courses.append(Course('baz', 1, 0, 0, 0, 0, 1))
+
+        with self.assertRaises(TypeError):
+            self.problem.conflicting_course_names['baz'] = ('foo',)
+
+        with self.assertRaises(AttributeError):
+            self.problem.conflicting_course_names['foo'].append('baz')
+
+        with self.assertRaises(AssertionError):
+            self.problem.set_rooms([self.room1])
+
+        with self.assertRaises(AssertionError):
+            self.problem.set_course_conflicts()
+
+    def test_set_rooms(self) -> None:
+        self.assertEqual(self.problem.rooms_by_capacity, (self.room2, self.room1))
+        self.assertEqual(self.problem.room_capacities, (2, 5))
+        self.assertEqual(dict(self.problem.room_bits), {'C1.04': 1, 'C0.110': 2})
+        self.assertEqual(self.problem.all_rooms_mask, 3)
+        self.assertEqual(self.problem.largest_rooms_mask, 2)
+
+        # Rooms with the same capacity keep their order.
+        room3 = Room('C1.08', 2)
+        problem = self.problem.copy()
+        problem.set_rooms([self.room1, self.room2, room3])
+        self.assertEqual(problem.rooms_by_capacity, [self.room2, room3, self.room1])
+        self.assertEqual(problem.room_bits, {'C1.04': 1, 'C1.08': 2, 'C0.110': 4})
+
+    def test_get_room_mask(self) -> None:
+        self.assertEqual(self.problem.get_room_mask([]), 0)
+        self.assertEqual(self.problem.get_room_mask([self.room1]), 2)
+        self.assertEqual(self.problem.get_room_mask([self.room1, self.room2]), 3)
+        self.assertEqual(self.problem.get_room_mask([Room('C1.08', 2)]), 0)
+
+    def test_select_courses(self) -> None:
+        problem = self.problem.select_courses(['bar'])
+        self.assertEqual(problem.courses, (self.course2,))
+        self.assertEqual(problem.rooms is self.problem.rooms, True)
+        self.assertEqual(self.problem.courses, (self.course1, self.course2))
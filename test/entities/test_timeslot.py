@@ -4,7 +4,7 @@ from code.entities.course import Course
 from code.entities.event import Event
 from code.entities.room import Room
 from code.entities.student import Student
-from code.entities.timeslot import Timeslot
+from code.entities.timeslot import Timeslot, TimeslotScore
 from code.utils.enums import EventType
 
 class TestTimeslot(TestCase):
@@ -193,3 +193,75 @@ class TestTimeslot(TestCase):
 
         self.assertEqual(timeslot.get_overlapping_student_courses_malus_score(), 2)
         self.assertEqual(timeslot.calculate_malus_score(), 2)
+
+    def test_score_cache(self) -> None:
+        timeslot = Timeslot(9, 1)
+
+        student1 = Student('John', 'Doe', '1', ['course 1'])
+        student2 = Student('Mary', 'Jane', '2', ['course 1'])
+
+        course = Course('course 1', 1, 2, 10, 0, 0, 22)
+        event1 = Event('foo 1', EventType.LECTURE, course, 1, 9, Room('C1.08', 1), [student1])
+        event2 = Event('foo 2', EventType.SEMINAR, course, 1, 9, Room('C1.08', 30), [student1])
+
+        timeslot.add_event(event1)
+        self.assertEqual(timeslot.calculate_malus_score(), 0)
+        self.assertEqual(timeslot.get_violations(), [])
+
+        # Adding and removing events invalidates the cached scores.
+        timeslot.add_event(event2)
+        self.assertEqual(timeslot.calculate_malus_score(), 2)
+        self.assertEqual(timeslot.get_violations(), [event2])
+
+        timeslot.remove_event(event2)
+        self.assertEqual(timeslot.calculate_malus_score(), 0)
+
+        # Changing an event requires bumping the version.
+        event1.assign_students([student1, student2])
+        self.assertEqual(timeslot.calculate_malus_score(), 0)
+        timeslot.bump_version()
+        self.assertEqual(timeslot.calculate_malus_score(), 1)
+
+    def test_timeslot_score(self) -> None:
+        timeslot = Timeslot(17, 1)
+        score = TimeslotScore(17)
+
+        student1 = Student('John', 'Doe', '1', ['course 1'])
+        student2 = Student('Mary', 'Jane', '2', ['course 1'])
+
+        course1 = Course('course 1', 1, 2, 10, 0, 0, 22)
+        course2 = Course('course 2', 1, 2, 10, 0, 0, 22)
+
+        event1 = Event('foo 1', EventType.LECTURE, course1, 1, 17, Room('C1.08', 1, True))
+        event2 = Event('foo 2', EventType.SEMINAR, course1, 1, 17, Room('C1.06', 35))
+        event3 = Event('foo 3', EventType.PRACTICUM, course2, 1, 17, Room('C1.04', 25))
+
+        event1.assign_students([student1, student2])
+        event2.assign_students([student1])
+        event3.assign_students([student2])
+
+        for event in [event1, event2, event3]:
+            timeslot.add_event(event)
+            score.add_event(event)
+            self.assertEqual(score.get_malus_score(), timeslot.calculate_malus_score())
+
+        self.assertEqual(score.get_timeslot_17_malus_score(), 5)
+        self.assertEqual(score.overlapping_students_score, 2)
+        self.assertEqual(score.room_overfitting_score, 1)
+        self.assertEqual(score.duplicate_course_events_score, 1)
+
+        # A copy of the score is not changed by the original.
+        score_copy = score.copy()
+
+        for event in [event2, event1, event3]:
+            timeslot.remove_event(event)
+            score.remove_event(event)
+            self.assertEqual(score.get_malus_score(), timeslot.calculate_malus_score())
+
+        self.assertEqual(score.student_counts, {})
+        self.assertEqual(score.course_counts, {})
+        self.assertEqual(score.largest_room_events, 0)
+
+        self.assertEqual(score_copy.get_malus_score(), 5 + 2 + 1 + 1)
+        self.assertEqual(score_copy.student_counts, {'1': 2, '2': 2})
+        self.assertEqual(score_copy.course_counts, {'course 1': 2, 'course 2': 1})
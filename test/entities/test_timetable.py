@@ -1,4 +1,5 @@
-from datetime import datetime
+import copy
+import random
 from unittest import TestCase, mock
 
 from code.entities.course import Course
@@ -9,14 +10,6 @@ from code.entities.timeslot import Timeslot
 from code.entities.timetable import Timetable
 from code.utils.enums import EventType
 
-def date_in_current_week(date: datetime) -> bool:
-    """
-    Check if a given datetime object is within the current week.
-    """
-    current_year, current_week, _ = datetime.now().isocalendar()
-    year, week, _ = date.isocalendar()
-    return (current_year, current_week) == (year, week)
-
 class TestTimetable(TestCase):
 
     @mock.patch('code.utils.data.load_students')
@@ -82,9 +75,9 @@ class TestTimetable(TestCase):
     def test_init(self) -> None:
         timetable = self._new_timetable_instance()
 
-        self.assertEqual(timetable.rooms, [self.room1, self.room2])
-        self.assertEqual(timetable.courses, [self.course1, self.course2])
-        self.assertEqual(timetable.students, [self.student1, self.student2, self.student3, self.student4])
+        self.assertEqual(timetable.rooms, (self.room1, self.room2))
+        self.assertEqual(timetable.courses, (self.course1, self.course2))
+        self.assertEqual(timetable.students, (self.student1, self.student2, self.student3, self.student4))
 
         self.assertEqual(timetable.courses[0].enrolled_students, [self.student1, self.student2, self.student3, self.student4])
         self.assertEqual(timetable.courses[1].enrolled_students, [self.student1, self.student4])
@@ -133,6 +126,233 @@ class TestTimetable(TestCase):
         another_event.set_room(self.room2)
         self.assertEqual(timetable1 == timetable2, True)
 
+    def test_deepcopy(self) -> None:
+        timetable = self._new_timetable_instance()
+        timetable.add_event(self.event1)
+        timetable_copy = copy.deepcopy(timetable)
+
+        # Only the events are copied, the problem instance is shared.
+        self.assertEqual(timetable_copy == timetable, True)
+        self.assertEqual(timetable_copy.problem is timetable.problem, True)
+        self.assertEqual(timetable_copy.get_events()[0] is self.event1, False)
+        self.assertEqual(timetable_copy.get_events()[0].course is self.course1, True)
+        self.assertEqual(timetable_copy.get_events()[0].students[0] is self.student1, True)
+
+        # Changing the problem of the copy does not change the original.
+        timetable_copy.apply_enrolment_delta(self.student2, [], ['foo'])
+        self.assertEqual(timetable_copy.problem is timetable.problem, False)
+        self.assertEqual(timetable.get_course('foo').enrolled_students, [self.student1, self.student2, self.student3, self.student4])
+        self.assertEqual(self.event1.students, [self.student1, self.student2, self.student3, self.student4])
+
+    def test_snapshot(self) -> None:
+        timetable = self._new_timetable_instance()
+        timetable.add_event(self.event1)
+        timetable.add_event(self.event2)
+        timetable.add_event(self.event3)
+        malus_score = timetable.calculate_malus_score()
+
+        snapshot = timetable.snapshot()
+        self.assertEqual(snapshot == timetable, True)
+        self.assertEqual(snapshot.timetable[0] is timetable.timetable[0], True)
+
+        # Only the changed timeslots are copied.
+        timetable.remove_event(self.event2)
+        timetable.assign_students(self.event1, [self.student1])
+        self.assertEqual(snapshot.timetable[0] is timetable.timetable[0], False)
+        self.assertEqual(snapshot.timetable[2] is timetable.timetable[2], True)
+        self.assertEqual(timetable.get_events()[0].students, [self.student1])
+        self.assertEqual(len(timetable.get_course_events(self.course2, EventType.LECTURE)), 0)
+
+        # The snapshot still contains the original events and indexes.
+        self.assertEqual(snapshot.get_events(), [self.event1, self.event2, self.event3])
+        self.assertEqual(self.event1.students, [self.student1, self.student2, self.student3, self.student4])
+        self.assertEqual(snapshot.calculate_malus_score(), malus_score)
+        self.assertEqual(snapshot.get_saturation_degree(self.course1, snapshot[0][9]), 1)
+        self.assertEqual(len(snapshot.get_course_events(self.course2, EventType.LECTURE)), 1)
+
+        # Events that were taken before they were copied can still be used.
+        timetable.remove_event(self.event1)
+        timetable.add_event(self.event1)
+        self.assertEqual(len(timetable.get_events()), 2)
+        self.assertEqual(len(timetable.get_course_events(self.course1, EventType.LECTURE)), 1)
+
+        # A branch of the snapshot does not change the snapshot either.
+        branch = snapshot.snapshot()
+        branch.apply_enrolment_delta(self.student2, [], ['foo'])
+        self.assertEqual(snapshot.get_events()[0].students, [self.student1, self.student2, self.student3, self.student4])
+        self.assertEqual(snapshot.problem is timetable.problem, True)
+        self.assertEqual(snapshot.calculate_malus_score(), malus_score)
+
+    def test_snapshot_stale_events(self) -> None:
+        timetable = self._new_timetable_instance()
+        timetable.add_event(self.event1)
+        timetable.add_event(self.event3)
+        snapshot = timetable.snapshot()
+
+        # A removed event that was taken before the snapshot is a copy, which
+        # is the one that has to be moved.
+        event = timetable.remove_event(self.event1)
+        self.assertEqual(event is self.event1, False)
+        self.event1.set_timeslot(11)
+        self.assertRaises(AssertionError, timetable.add_event, self.event1)
+        self.event1.set_timeslot(9)
+
+        event.set_timeslot(11)
+        timetable.add_event(event)
+        self.assertEqual(timetable.get_events()[0].timeslot, 11)
+        self.assertEqual(snapshot.get_events()[0].timeslot, 9)
+
+        # Events that were taken before an earlier snapshot can not be used
+        # anymore once they have been copied.
+        timetable.assign_students(self.event3, [self.student1])
+        timetable.snapshot()
+        self.assertRaises(AssertionError, timetable.remove_event, self.event3)
+        self.assertRaises(AssertionError, timetable.assign_students, self.event3, [self.student2])
+        self.assertEqual(snapshot.get_events()[1].students, [self.student4])
+
+    def test_score_cache(self) -> None:
+        timetable = self._new_timetable_instance()
+        timetable.add_event(self.event1)
+        timetable.add_event(self.event2)
+        timetable.add_event(self.event5)
+        malus_score = timetable.calculate_malus_score()
+        violations = timetable.get_violations()
+        distribution = timetable.get_malus_score_distribution()
+
+        # Scores of an unchanged timetable are not calculated again.
+        with mock.patch.object(Timetable, 'get_student_timetables') as mock_get_student_timetables:
+            self.assertEqual(timetable.calculate_malus_score(), malus_score)
+            self.assertEqual(timetable.get_violations(), violations)
+            self.assertEqual(timetable.get_malus_score_distribution(), distribution)
+            mock_get_student_timetables.assert_not_called()
+
+        # A cached list or dictionary can be changed by the caller.
+        timetable.get_violations().clear()
+        self.assertEqual(timetable.get_violations(), violations)
+
+        student_timetables = timetable.get_student_timetables()
+        student_timetables.pop(self.student1.student_id)
+        student_timetables['foo'] = []
+        self.assertEqual(self.student1.student_id in timetable.get_student_timetables(), True)
+        self.assertEqual('foo' in timetable.get_student_timetables(), False)
+
+        timetable.get_malus_score_distribution()['foo'] = 1
+        timetable.get_malus_score_distribution().clear()
+        self.assertEqual(timetable.get_malus_score_distribution(), distribution)
+        self.assertEqual(timetable.calculate_malus_score(), malus_score)
+
+        # A snapshot uses the scores of the timetable it was taken from.
+        snapshot = timetable.snapshot()
+        with mock.patch.object(Timetable, 'get_student_timetables') as mock_get_student_timetables:
+            self.assertEqual(snapshot.calculate_malus_score(), malus_score)
+            mock_get_student_timetables.assert_not_called()
+
+        # Each change invalidates the cached scores.
+        timetable.assign_students(self.event1, [self.student2, self.student3])
+        self.assertEqual(timetable.calculate_malus_score(), copy.deepcopy(timetable).calculate_malus_score())
+        self.assertEqual(timetable.calculate_malus_score() != malus_score, True)
+
+        timetable.remove_event(self.event5)
+        self.assertEqual(timetable.get_violations(), copy.deepcopy(timetable).get_violations())
+        self.assertEqual(timetable.get_malus_score_distribution(), copy.deepcopy(timetable).get_malus_score_distribution())
+
+        timetable.clear()
+        self.assertEqual(timetable.calculate_malus_score(), 0)
+        self.assertEqual(timetable.get_violations(), [])
+
+        # The snapshot still has the scores of the original state.
+        self.assertEqual(snapshot.calculate_malus_score(), malus_score)
+        self.assertEqual(snapshot.get_violations(), violations)
+
+    def test_state_hash(self) -> None:
+        timetable1 = self._new_timetable_instance()
+        timetable2 = self._new_timetable_instance()
+        self.assertEqual(timetable1.state_hash, 0)
+
+        # The hash does not depend on the order in which events are added.
+        for event in [self.event1, self.event2, self.event3]:
+            timetable1.add_event(event)
+        for event in [self.event3, self.event1, self.event2]:
+            timetable2.add_event(copy.deepcopy(event))
+        self.assertEqual(timetable1.state_hash, timetable2.state_hash)
+        self.assertEqual(timetable1.state_hash != 0, True)
+
+        # Removing an event and adding it again gives the same hash.
+        state_hash = timetable1.state_hash
+        timetable1.remove_event(self.event3)
+        self.assertEqual(timetable1.state_hash != state_hash, True)
+        timetable1.add_event(self.event3)
+        self.assertEqual(timetable1.state_hash, state_hash)
+
+        # Assigning other students changes the hash.
+        timetable1.assign_students(self.event2, [self.student1])
+        self.assertEqual(timetable1.state_hash != state_hash, True)
+        timetable1.assign_students(self.event2, [self.student4, self.student1])
+        self.assertEqual(timetable1.state_hash, state_hash)
+
+        # Groups with the same title that swap their timeslots are told apart.
+        group1 = Event('bar seminar', EventType.SEMINAR, self.course2, 3, 9, self.room2, [self.student1])
+        group2 = Event('bar seminar', EventType.SEMINAR, self.course2, 3, 11, self.room2, [self.student4])
+        timetable1.add_event(group1)
+        timetable1.add_event(group2)
+        state_hash = timetable1.state_hash
+        timetable1.assign_students(group1, [self.student4])
+        timetable1.assign_students(group2, [self.student1])
+        self.assertEqual(timetable1.state_hash != state_hash, True)
+
+        # Two equal events in the same timeslot and room do not cancel out, so
+        # moving them to another timeslot and room changes the hash.
+        timetable3 = self._new_timetable_instance()
+        timetable4 = self._new_timetable_instance()
+        for timetable, weekday, timeslot, room in [(timetable3, 1, 9, self.room1), (timetable4, 3, 13, self.room2)]:
+            for _ in range(2):
+                timetable.add_event(Event('foo lecture', EventType.LECTURE, self.course1, weekday, timeslot, room,
+                                          [self.student1, self.student2]))
+        self.assertEqual(timetable3.state_hash != 0, True)
+        self.assertEqual(timetable3.state_hash != timetable4.state_hash, True)
+
+        # A snapshot keeps its own hash.
+        snapshot = timetable1.snapshot()
+        timetable1.clear()
+        self.assertEqual(timetable1.state_hash, 0)
+        self.assertEqual(snapshot.state_hash != 0, True)
+        self.assertEqual(copy.deepcopy(snapshot).state_hash, snapshot.state_hash)
+
+    def test_event_registry(self) -> None:
+        timetable = self._new_timetable_instance()
+        self.assertEqual(timetable.get_event(self.event1.id), None)
+
+        timetable.add_event(self.event1)
+        timetable.add_event(self.event2)
+        timetable.add_event(self.event3)
+        self.assertEqual(timetable.get_event(self.event2.id) is self.event2, True)
+        self.assertRaises(AssertionError, timetable.add_event, self.event2)
+
+        random.seed(0)
+        events = [self.event1, self.event2, self.event3]
+        self.assertEqual(timetable.get_random_event() in events, True)
+        for _ in range(10):
+            self.assertEqual(timetable.get_random_event(exclude=self.event1) is not self.event1, True)
+
+        sample = timetable.get_random_events(3)
+        self.assertEqual(sorted(event.id for event in sample), sorted(event.id for event in events))
+
+        # Removing an event removes it from the registry.
+        timetable.remove_event(self.event2)
+        self.assertEqual(timetable.get_event(self.event2.id), None)
+        self.assertEqual(len(timetable.event_ids), 2)
+
+        # A snapshot registers the copies of the events that it changes.
+        snapshot = timetable.snapshot()
+        snapshot.assign_students(self.event1, [self.student1])
+        self.assertEqual(snapshot.get_event(self.event1.id) is self.event1, False)
+        self.assertEqual(snapshot.get_event(self.event1.id).students, [self.student1])
+        self.assertEqual(timetable.get_event(self.event1.id) is self.event1, True)
+
+        snapshot.remove_event(self.event3)
+        self.assertEqual(snapshot.get_event(self.event3.id), None)
+        self.assertEqual(timetable.get_event(self.event3.id) is self.event3, True)
+        self.assertRaises(AssertionError, snapshot.get_random_event, self.event1)
 
     def test_serialize(self) -> None:
         timetable = self._new_timetable_instance()
@@ -174,6 +394,192 @@ class TestTimetable(TestCase):
         self.assertEqual(timetable.timetable, [{}, {}, {}, {}, {}])
         self.assertEqual(timetable.get_events(), [])
 
+        # The empty timeslot is used again when another event is added.
+        timeslot = timetable.timetable[0].get_timeslot(9)
+        timetable.add_event(self.event1)
+        self.assertEqual(timetable[0][9] is timeslot, True)
+
+    def test_timeslot_scores(self) -> None:
+        timetable = self._new_timetable_instance()
+
+        timetable.add_event(self.event1)
+        timetable.add_event(self.event2)
+        timetable.add_event(self.event3)
+        self.assertEqual(list(timetable.timeslot_scores.keys()), [(1, 9), (3, 15)])
+        self.assertEqual(timetable.timeslot_scores[(1, 9)].get_malus_score(), 2)
+        self.assertEqual(timetable.timeslot_scores[(3, 15)].get_malus_score(), 0)
+        self.assertEqual(list(timetable.malus_timeslots), [(1, 9)])
+        self.assertEqual(timetable.get_random_malus_timeslot(), Timeslot(9, 1))
+
+        # Assigning other students should update the timeslot score.
+        timetable.assign_students(self.event2, [self.student2])
+        self.assertEqual(self.event2.students, [self.student2])
+        self.assertEqual(timetable.timeslot_scores[(1, 9)].get_malus_score(), 1)
+
+        timetable.remove_event(self.event2)
+        self.assertEqual(timetable.timeslot_scores[(1, 9)].get_malus_score(), 0)
+        self.assertEqual(list(timetable.malus_timeslots), [])
+
+        timetable.remove_event(self.event1)
+        timetable.remove_event(self.event3)
+        self.assertEqual(timetable.timeslot_scores, {})
+
+        timetable.add_event(self.event1)
+        timetable.clear()
+        self.assertEqual(timetable.timeslot_scores, {})
+
+    def test_get_saturation_degree(self) -> None:
+        timetable = self._new_timetable_instance()
+        timetable.add_event(self.event2)
+        timetable.add_event(self.event3)
+        timetable.add_event(self.event4)
+
+        for day in timetable:
+            for timeslot in day.values():
+                for course in [self.course1, self.course2]:
+                    self.assertEqual(timetable.get_saturation_degree(course, timeslot),
+                                     timeslot.get_saturation_degree_for_course(course))
+
+        self.assertEqual(timetable.get_saturation_degree(self.course1, timetable[2][15]), 1)
+        self.assertEqual(timetable.get_saturation_degree(self.course2, timetable[2][15]), 0)
+
+        timetable.remove_event(self.event3)
+        self.assertEqual(timetable.get_saturation_degree(self.course1, Timeslot(15, 3)), 0)
+
+    def test_get_course_events(self) -> None:
+        timetable = self._new_timetable_instance()
+        timetable.add_event(self.event2)
+        timetable.add_event(self.event3)
+        timetable.add_event(self.event4)
+        self.assertEqual(timetable.get_course_events(self.course2, EventType.SEMINAR), [self.event3, self.event4])
+        self.assertEqual(timetable.get_course_events(self.course2, EventType.LECTURE), [self.event2])
+        self.assertEqual(timetable.get_course_events(self.course1, EventType.LECTURE), [])
+
+        timetable.remove_event(self.event3)
+        self.assertEqual(timetable.get_course_events(self.course2, EventType.SEMINAR), [self.event4])
+
+    def test_move_students(self) -> None:
+        timetable = self._new_timetable_instance()
+        timetable.add_event(self.event3)
+        timetable.add_event(self.event4)
+
+        timetable.move_students([
+            (self.student4, self.event3, self.event4),
+            (self.student1, self.event4, self.event3),
+        ])
+        self.assertEqual(self.event3.students, [self.student1])
+        self.assertEqual(self.event4.students, [self.student4])
+
+        timetable.move_students([(self.student1, self.event3, self.event4)])
+        self.assertEqual(self.event3.students, [])
+        self.assertEqual(self.event4.students, [self.student4, self.student1])
+        self.assertEqual(timetable.timeslot_scores[(3, 9)].student_counts, {'4': 1, '1': 1})
+
+    def test_get_student_day_timeslots(self) -> None:
+        timetable = self._new_timetable_instance()
+        timetable.add_event(self.event3)
+        timetable.add_event(self.event4)
+        timetable.add_event(self.event6)
+        self.assertEqual(timetable.get_student_day_timeslots(self.student1, 3), [9, 15])
+        self.assertEqual(timetable.get_student_day_timeslots(self.student4, 3), [15])
+        self.assertEqual(timetable.get_student_day_timeslots(self.student4, 1), [])
+
+    def test_calculate_empty_timeslots_score(self) -> None:
+        timetable = self._new_timetable_instance()
+        self.assertEqual(timetable.calculate_empty_timeslots_score([]), (0, 0))
+        self.assertEqual(timetable.calculate_empty_timeslots_score([9, 11]), (0, 0))
+        self.assertEqual(timetable.calculate_empty_timeslots_score([13, 9]), (0, 1))
+        self.assertEqual(timetable.calculate_empty_timeslots_score([9, 15]), (0, 3))
+        self.assertEqual(timetable.calculate_empty_timeslots_score([9, 17]), (1, 0))
+
+    def test_calculate_move_students_delta(self) -> None:
+        timetable = self._new_timetable_instance()
+        timetable.add_event(self.event3)
+        timetable.add_event(self.event4)
+        timetable.add_event(self.event6)
+
+        # Moving student 1 to wednesday 15:00 removes 2 empty timeslots, but
+        # adds an overlapping course for student 1.
+        moves = [(self.student1, self.event4, self.event3)]
+        malus_score = timetable.calculate_malus_score()
+        self.assertEqual(timetable.calculate_move_students_delta(moves), (0, -2))
+        timetable.move_students(moves)
+        self.assertEqual(timetable.calculate_malus_score() - malus_score, -2)
+
+        # Moving both students to wednesday 9:00 removes both overlapping
+        # courses, but adds 2 empty timeslots for both students.
+        moves = [
+            (self.student4, self.event3, self.event4),
+            (self.student1, self.event3, self.event4),
+        ]
+        malus_score = timetable.calculate_malus_score()
+        self.assertEqual(timetable.calculate_move_students_delta(moves), (0, 4))
+        timetable.move_students(moves)
+        self.assertEqual(timetable.calculate_malus_score() - malus_score, 4)
+
+        # Moving student 1 back to wednesday 15:00 removes 2 empty timeslots,
+        # but adds an overlapping course and a student too much for the room
+        # of event 3, which has a capacity of 2.
+        timetable.move_students([(self.student4, self.event4, self.event3)])
+        timetable.assign_students(self.event3, [self.student2, self.student3])
+        moves = [(self.student1, self.event4, self.event3)]
+        malus_score = timetable.calculate_malus_score()
+        self.assertEqual(timetable.calculate_move_students_delta(moves), (0, -1))
+        timetable.move_students(moves)
+        self.assertEqual(timetable.calculate_malus_score() - malus_score, -1)
+
+    def test_calculate_move_students_delta_violations(self) -> None:
+        timetable = self._new_timetable_instance()
+        event = Event('bar seminar 5', EventType.SEMINAR, self.course1, 3, 17, self.room1, [self.student4])
+        timetable.add_event(self.event4)
+        timetable.add_event(self.event6)
+        timetable.add_event(event)
+
+        # Moving student 1 to wednesday 17:00 leaves 3 empty timeslots after
+        # the event at 9:00, which is a violation.
+        moves = [(self.student1, self.event6, event)]
+        self.assertEqual(timetable.calculate_move_students_delta(moves), (1, -3))
+
+    def test_get_day_violations(self) -> None:
+        timetable = self._new_timetable_instance()
+        event = Event('bar seminar 5', EventType.SEMINAR, self.course1, 3, 17, self.room1, [self.student1])
+        timetable.add_event(self.event4)
+        timetable.add_event(event)
+        timetable.add_event(self.event7)
+
+        # Student 1 has 3 empty timeslots before the event at 17:00.
+        self.assertEqual(timetable.get_day_violations(3), [event])
+        self.assertEqual(timetable.get_day_violations(4), [])
+        self.assertEqual(timetable.get_violations(), [event])
+
+        # An event in-between leaves fewer empty timeslots.
+        timetable.add_event(self.event6)
+        self.assertEqual(timetable.get_day_violations(3), [])
+        self.assertEqual(timetable.get_violations(), [])
+
+    def test_calculate_local_score(self) -> None:
+        timetable = self._new_timetable_instance()
+        timetable.add_event(self.event2)
+        timetable.add_event(self.event4)
+        timetable.add_event(self.event6)
+        timetable.add_event(self.event7)
+
+        # Move event 6 from wednesday 15:00 to wednesday 17:00, which leaves 3
+        # empty timeslots for student 1.
+        moved_event = copy.deepcopy(self.event6)
+        moved_event.set_timeslot(17)
+        events = [self.event6, moved_event]
+
+        violations, malus_score = timetable.calculate_local_score(events)
+        full_violations, full_malus_score = len(timetable.get_violations()), timetable.calculate_malus_score()
+        timetable.remove_event(self.event6)
+        timetable.add_event(moved_event)
+        new_violations, new_malus_score = timetable.calculate_local_score(events)
+
+        self.assertEqual(new_violations - violations, 1)
+        self.assertEqual(new_violations - violations, len(timetable.get_violations()) - full_violations)
+        self.assertEqual(new_malus_score - malus_score, timetable.calculate_malus_score() - full_malus_score)
+
     def test_get_total_timeslots(self) -> None:
         timetable = self._new_timetable_instance()
         timetable.add_event(self.event1)
@@ -222,6 +628,90 @@ class TestTimetable(TestCase):
         timeslot.add_event(self.event2)
         self.assertEqual(timetable.get_available_timeslot_rooms(timeslot), [self.room1])
 
+    def test_find_available_room(self) -> None:
+        timetable = self._new_timetable_instance()
+
+        # The smallest room that fits is used, if there is one.
+        self.assertEqual(timetable.find_available_room(1, 9, 2), self.room2)
+        self.assertEqual(timetable.find_available_room(1, 9, 3), self.room1)
+        self.assertEqual(timetable.find_available_room(1, 9, 6), None)
+        self.assertEqual(timetable.find_available_room(1, 9, 6, fallback=True), self.room1)
+
+        # Booked rooms are skipped and freed again when the event is removed.
+        timetable.add_event(self.event2)
+        self.assertEqual(timetable.room_occupancy, {(1, 9): 1})
+        self.assertEqual(timetable.find_available_room(1, 9, 2), self.room1)
+        timetable.add_event(self.event1)
+        self.assertEqual(timetable.find_available_room(1, 9, 2, fallback=True), None)
+        timetable.remove_event(self.event2)
+        self.assertEqual(timetable.room_occupancy, {(1, 9): 2})
+        self.assertEqual(timetable.find_available_room(1, 9, 2), self.room2)
+        timetable.remove_event(self.event1)
+        self.assertEqual(timetable.room_occupancy, {})
+
+        # Only the largest room can be used in timeslot 17:00 - 19:00.
+        self.assertEqual(timetable.find_available_room(1, 17, 2), self.room1)
+        timetable.add_event(self.event5)
+        self.assertEqual(timetable.find_available_room(1, 17, 2, fallback=True), None)
+
+    def test_room_occupancy_snapshot(self) -> None:
+        timetable = self._new_timetable_instance()
+        timetable.add_event(self.event2)
+
+        snapshot = timetable.snapshot()
+        snapshot.remove_event(snapshot.get_event(self.event2.id))
+        self.assertEqual(snapshot.room_occupancy, {})
+        self.assertEqual(timetable.room_occupancy, {(1, 9): 1})
+
+    def test_get_room_assignment(self) -> None:
+        timetable = self._new_timetable_instance()
+        self.event1.set_room(self.room2)
+        self.event2.set_room(self.room1)
+        timetable.add_event(self.event1)
+        timetable.add_event(self.event2)
+
+        # Both events fit better into the room of the other event.
+        self.assertEqual(timetable.get_room_assignment(1, 9), {self.event1.id: self.room1, self.event2.id: self.room2})
+
+        # A double booking is solved before the students that do not fit.
+        timetable.remove_event(self.event2)
+        self.event2.set_room(self.room2)
+        timetable.add_event(self.event2)
+        self.assertEqual(timetable.get_room_assignment(1, 9), {self.event1.id: self.room1})
+
+        # An event keeps its room if another room is not better.
+        timetable.add_event(self.event3)
+        self.assertEqual(timetable.get_room_assignment(3, 15), {})
+        self.assertEqual(timetable.get_room_assignment(2, 9), {})
+
+        # Only the largest room can be booked from 17:00 - 19:00.
+        self.event5.set_room(self.room2)
+        timetable.add_event(self.event5)
+        self.assertEqual(timetable.get_room_assignment(1, 17), {self.event5.id: self.room1})
+
+    def test_assign_rooms(self) -> None:
+        timetable = self._new_timetable_instance()
+        self.event1.set_room(self.room2)
+        self.event2.set_room(self.room1)
+        timetable.add_event(self.event1)
+        timetable.add_event(self.event2)
+        timetable.add_event(self.event3)
+        snapshot = timetable.snapshot()
+        malus_score = timetable.calculate_malus_score()
+
+        self.assertEqual(timetable.assign_rooms(1, 9), 2)
+        self.assertEqual(timetable.get_event(self.event1.id).room, self.room1)
+        self.assertEqual(timetable.get_event(self.event2.id).room, self.room2)
+        self.assertEqual(timetable.calculate_malus_score(), malus_score - 2)
+        self.assertEqual(timetable.room_occupancy[(1, 9)], 3)
+        self.assertEqual(timetable.assign_rooms(1, 9), 0)
+
+        # The snapshot keeps the rooms of the events.
+        self.assertEqual(snapshot.get_event(self.event1.id).room, self.room2)
+        self.assertEqual(snapshot.calculate_malus_score(), malus_score)
+        self.assertEqual(snapshot.assign_all_rooms(), 2)
+        self.assertEqual(snapshot.state_hash, timetable.state_hash)
+
     def test_get_student_timetables(self) -> None:
         timetable = self._new_timetable_instance()
         timetable.add_event(self.event1)
@@ -301,6 +791,31 @@ class TestTimetable(TestCase):
             'dubbele vak activiteiten': 0
         })
 
+    def test_get_lecture_clique(self) -> None:
+        timetable = self._new_timetable_instance()
+        self.assertEqual(sorted(timetable.get_lecture_clique()), ['bar', 'foo'])
+
+    def test_compute_lower_bound(self) -> None:
+        timetable = self._new_timetable_instance()
+        self.assertEqual(timetable.compute_lower_bound(), 0)
+
+        # The foo lectures have 4 students, which doesn't fit in 3 seats.
+        self.room1.capacity = 3
+        self.assertEqual(timetable.calculate_room_overfitting_lower_bound(), 1)
+        self.assertEqual(timetable.compute_lower_bound(), 1)
+
+        # There are 31 lectures in the clique for only 25 timeslots.
+        self.course1.lectures_amount = 30
+        self.assertEqual(timetable.calculate_room_overfitting_lower_bound(), 30)
+        self.assertEqual(timetable.calculate_overlapping_students_lower_bound(), 6)
+        self.assertEqual(timetable.calculate_timeslot_17_lower_bound(), 0)
+        self.assertEqual(timetable.compute_lower_bound(), 36)
+
+        # There are 42 events for only 40 timeslots before 17:00.
+        self.course1.lectures_amount = 40
+        self.assertEqual(timetable.calculate_timeslot_17_lower_bound(), 10)
+        self.assertEqual(timetable.compute_lower_bound(), 40 + 16 + 10)
+
     def test_get_events_by_course_per_day(self) -> None:
         timetable = self._new_timetable_instance()
         timetable.add_event(self.event1)
@@ -323,96 +838,125 @@ class TestTimetable(TestCase):
             []
         ])
 
-    def test_create_ics_event(self) -> None:
+    def test_apply_enrolment_delta(self) -> None:
         timetable = self._new_timetable_instance()
-        ics_event = timetable.create_ics_event(self.event1)
-        assert self.event1.room is not None, 'event1 room must bet set'
-        self.assertEqual(ics_event.name, self.event1.title)
-        self.assertEqual(ics_event.location, self.event1.room.location_id)
-        self.assertEqual(ics_event.description, 'Enrolled students: ' + str(len(self.event1.students)))
-        self.assertEqual(date_in_current_week(ics_event.begin), True)
-        self.assertEqual(date_in_current_week(ics_event.end), True)
+        timetable.add_event(self.event1)
+        timetable.add_event(self.event3)
 
-    def test_export_csv(self) -> None:
+        timetable.apply_enrolment_delta(self.student2, ['bar'], ['foo'])
+
+        # The timetable changes its own copy of the problem instance.
+        self.assertEqual(timetable.students[1].enrolled_courses, ['bar'])
+        self.assertEqual(self.student2.enrolled_courses, ['foo'])
+        self.assertEqual(timetable.get_course('foo').enrolled_students, [self.student1, self.student3, self.student4])
+        self.assertEqual(timetable.get_course('bar').enrolled_students, [self.student1, self.student4, self.student2])
+        self.assertEqual(self.course1.enrolled_students, [self.student1, self.student2, self.student3, self.student4])
+        self.assertEqual(self._new_timetable_instance().problem is timetable.problem, False)
+        self.assertEqual(self.event1.students, [self.student1, self.student3, self.student4])
+        self.assertEqual(self.event3.students, [self.student4, self.student2])
+        self.assertEqual(timetable.dirty_event_ids, {self.event1.id, self.event3.id})
+        self.assertEqual(timetable.dirty_student_ids, {'2'})
+
+        # A new student is added to the students of the timetable.
+        student = Student('Jane', 'Doe', '5', [])
+        timetable.apply_enrolment_delta(student, ['foo'], [])
+        self.assertEqual(timetable.students[-1], student)
+        self.assertEqual(self.event1.students[-1], student)
+
+        with self.assertRaises(AssertionError):
+            timetable.apply_enrolment_delta(student, ['foo'], [])
+
+    def test_update_course_conflicts(self) -> None:
         timetable = self._new_timetable_instance()
         timetable.add_event(self.event1)
-        timetable.add_event(self.event3)
-        with mock.patch('code.entities.timetable.open'):
-            mock_writer = mock.MagicMock()
-            with mock.patch('csv.writer', return_value=mock_writer):
-                timetable.export_csv()
-            self.assertEqual(mock_writer.writerow.call_count, 7)
-            self.assertEqual(mock_writer.writerow.call_args_list, [
-                mock.call(['student name', 'course', 'type', 'weekday', 'timeslot', 'room']),
-                mock.call(['John Doe', 'foo lecture 1', 'hc', 'mon', 9, 'C0.110']),
-                mock.call(['Mary Jane', 'foo lecture 1', 'hc', 'mon', 9, 'C0.110']),
-                mock.call(['Mike Smith', 'foo lecture 1', 'hc', 'mon', 9, 'C0.110']),
-                mock.call(['Steven London', 'foo lecture 1', 'hc', 'mon', 9, 'C0.110']),
-                mock.call(['John Doe', 'bar seminar 1', 'wc', 'wed', 15, 'C1.04']),
-                mock.call(['Steven London', 'bar seminar 1', 'wc', 'wed', 15, 'C1.04']),
-            ])
-
-    def test_export_ics(self) -> None:
+        timetable.add_event(self.event2)
+        timeslot = timetable[0][9]
+        self.assertEqual(timetable.get_saturation_degree(self.course1, timeslot), 1)
+
+        # Nobody is enrolled in both courses anymore.
+        timetable.apply_enrolment_delta(self.student1, [], ['bar'])
+        timetable.apply_enrolment_delta(self.student4, [], ['bar'])
+
+        self.assertEqual(timetable.get_course('foo').conflicting_courses, [])
+        self.assertEqual(timetable.get_course('bar').conflicting_courses, [])
+        self.assertEqual(timetable.get_saturation_degree(self.course1, timeslot), 0)
+        self.assertEqual(timetable.get_saturation_degree(self.course2, timeslot), 0)
+
+        timetable.apply_enrolment_delta(self.student2, ['bar'], [])
+        self.assertEqual(timetable.get_course('foo').conflicting_courses, ['bar'])
+        self.assertEqual(timetable.get_course('bar').conflicting_courses, ['foo'])
+        self.assertEqual(timetable.get_saturation_degree(self.course1, timeslot), 1)
+        self.assertEqual(timetable.get_saturation_degree(self.course2, timeslot), 1)
+
+    def test_add_course(self) -> None:
+        timetable = self._new_timetable_instance()
+        timetable.add_event(self.event1)
+
+        self.student3.enrolled_courses.append('baz')
+        course = Course('baz', 1, 0, 0, 0, 0, 1)
+        timetable.add_course(course)
+
+        self.assertEqual(timetable.get_course('baz'), course)
+        self.assertEqual(course.enrolled_students, [self.student3])
+        self.assertEqual(course.conflicting_courses, ['foo'])
+        self.assertEqual(timetable.get_course('foo').conflicting_courses, ['bar', 'baz'])
+        self.assertEqual(self.course1.conflicting_courses, ['bar'])
+
+        events = timetable.get_course_events(course, EventType.LECTURE)
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0].students, [self.student3])
+        self.assertEqual(timetable.get_dirty_events(), events)
+        self.assertEqual(timetable.dirty_student_ids, {'3'})
+        self.assertEqual(len(timetable.get_violations()), 0)
+
+        with self.assertRaises(AssertionError):
+            timetable.add_course(course)
+
+    def test_remove_room(self) -> None:
         timetable = self._new_timetable_instance()
         timetable.add_event(self.event1)
         timetable.add_event(self.event3)
-        with mock.patch('code.entities.timetable.open'):
-            mock_ics_calendar = mock.MagicMock()
-            mock_mkdir = mock.MagicMock()
 
-            mock_isdir = mock.MagicMock()
-            mock_isdir.return_value = False
+        timetable.remove_room('C1.04')
+
+        self.assertEqual(timetable.rooms, [self.room1])
+        self.assertEqual(self.event3.room, self.room1)
+        self.assertEqual(timetable.get_dirty_events(), [self.event3])
+        self.assertEqual(len(timetable.get_events()), 2)
+        self.assertEqual(len(timetable.get_violations()), 0)
+
+        self.assertEqual(timetable.room_occupancy, {(1, 9): 1, (self.event3.weekday, self.event3.timeslot): 1})
+        self.assertEqual(timetable.find_available_room(1, 9, 1), None)
+
+        with self.assertRaises(AssertionError):
+            timetable.remove_room('C0.110')
+
+    def test_remove_largest_room(self) -> None:
+        timetable = self._new_timetable_instance()
+        timetable.add_event(self.event1)
 
-            with mock.patch('ics.Calendar', return_value=mock_ics_calendar), \
-                    mock.patch('os.mkdir', mock_mkdir), \
-                    mock.patch('os.path.isdir', mock_isdir):
-                timetable.export_ics()
+        timetable.remove_room('C0.110')
 
-            self.assertEqual(mock_ics_calendar.events.add.call_count, 9)
-            self.assertEqual(mock_ics_calendar.serialize.call_count, 7)
-            self.assertEqual(mock_mkdir.call_count, 3)
+        self.assertEqual(timetable.rooms[0].is_largest, True)
+        self.assertEqual(self.room2.is_largest, False)
+        self.assertEqual(self.event1.room, self.room2)
+        self.assertEqual(len(timetable.get_events()), 1)
 
-    def test_export_json(self) -> None:
+    def test_remove_largest_room_scores(self) -> None:
         timetable = self._new_timetable_instance()
+        event = Event('bar seminar 5', EventType.SEMINAR, self.course2, 2, 17, self.room2, [self.student4])
         timetable.add_event(self.event1)
         timetable.add_event(self.event3)
-        with mock.patch('code.entities.timetable.open'):
-            mock_json_dumps = mock.MagicMock()
-            with mock.patch('json.dumps', mock_json_dumps):
-                timetable.export_json()
-            mock_json_dumps.assert_called()
-            mock_json_dumps.call_args(
-                mock.call([
-                    [
-                        {
-                            9: [
-                                {
-                                    'id': self.event1.id,
-                                    'title': 'foo lecture 1',
-                                    'type': 'hc',
-                                    'course': 'foo',
-                                    'weekday': 1,
-                                    'timeslot': 9,
-                                    'room': 'C0.110'
-                                }
-                            ]
-                        },
-                        {},
-                        {
-                            15: [
-                                {
-                                    'id': self.event3.id,
-                                    'title': 'bar seminar 1',
-                                    'type': 'wc',
-                                    'course': 'bar',
-                                    'weekday': 3,
-                                    'timeslot': 15,
-                                    'room': 'C1.04'
-                                }
-                            ]
-                        },
-                        {},
-                        {}
-                    ]
-                ])
-            )
+        timetable.add_event(event)
+
+        # The event at 17:00 is now in the largest room, which adds 5 malus
+        # points to its timeslot.
+        timetable.remove_room('C0.110')
+        for (weekday, hour), score in timetable.timeslot_scores.items():
+            self.assertEqual(score.get_malus_score(), timetable[weekday - 1][hour].calculate_malus_score())
+        self.assertEqual(timetable.timeslot_scores[(2, 17)].get_timeslot_17_malus_score(), 5)
+        self.assertEqual((2, 17) in timetable.malus_timeslots, True)
+
+        timetable.remove_event(event)
+        self.assertEqual((2, 17) in timetable.timeslot_scores, False)
+        self.assertEqual((2, 17) in timetable.malus_timeslots, False)
@@ -0,0 +1,63 @@
+import copy
+from unittest import TestCase
+
+from code.entities.course import Course
+from code.entities.event import Event
+from code.entities.room import Room
+from code.entities.timeslot import Timeslot
+from code.entities.timetable_day import TimetableDay
+from code.utils.enums import EventType
+
+class TestTimetableDay(TestCase):
+
+    def setUp(self) -> None:
+        course = Course('foo', 1, 0, 0, 0, 0, 5)
+        self.event1 = Event('foo 1', EventType.LECTURE, course, 2, 15, Room('C0.110', 5, True))
+        self.event2 = Event('foo 2', EventType.LECTURE, course, 2, 9, Room('C1.04', 2))
+
+    def test_init(self) -> None:
+        day = TimetableDay(2)
+        self.assertEqual(day.weekday, 2)
+        self.assertEqual([timeslot.value for timeslot in day.timeslots], Timeslot.OPTIONS)
+        self.assertEqual(len(day), 0)
+        self.assertEqual(day, {})
+
+    def test_mapping(self) -> None:
+        day = TimetableDay(2)
+        day.get_timeslot(15).add_event(self.event1)
+        day.get_timeslot(9).add_event(self.event2)
+
+        # Only the timeslots with events are part of the day, in ascending order.
+        self.assertEqual(list(day), [9, 15])
+        self.assertEqual(day.keys(), [9, 15])
+        self.assertEqual([timeslot.events for timeslot in day.values()], [[self.event2], [self.event1]])
+        self.assertEqual(day.items(), [(9, day.get_timeslot(9)), (15, day.get_timeslot(15))])
+        self.assertEqual(len(day), 2)
+        self.assertEqual(9 in day, True)
+        self.assertEqual(11 in day, False)
+        self.assertEqual(day[15].events, [self.event1])
+        self.assertRaises(KeyError, lambda: day[11])
+        self.assertEqual(day.get(11), None)
+        self.assertEqual(day, { 9: Timeslot(9, 2), 15: Timeslot(15, 2) })
+        self.assertEqual(day.serialize(), { 9: day.get_timeslot(9), 15: day.get_timeslot(15) })
+
+        # An empty timeslot is kept, but is no longer part of the day.
+        timeslot = day.get_timeslot(9)
+        timeslot.remove_event(self.event2)
+        self.assertEqual(list(day), [15])
+        self.assertEqual(day.get_timeslot(9) is timeslot, True)
+
+    def test_copy(self) -> None:
+        day = TimetableDay(2)
+        day.get_timeslot(15).add_event(self.event1)
+
+        day_copy = day.copy()
+        self.assertEqual(day_copy.get_timeslot(15) is day.get_timeslot(15), True)
+
+        day_copy.set_timeslot(Timeslot(15, 2, [self.event2]))
+        self.assertEqual(day[15].events, [self.event1])
+        self.assertEqual(day_copy[15].events, [self.event2])
+
+        day_deepcopy = copy.deepcopy(day)
+        self.assertEqual(day_deepcopy.get_timeslot(15) is day.get_timeslot(15), False)
+        self.assertEqual(day_deepcopy, day)
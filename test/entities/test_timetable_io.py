@@ -0,0 +1,441 @@
+from datetime import datetime
+import gzip
+import json
+import os
+import tempfile
+from unittest import TestCase, mock
+import ics
+
+from code.entities.course import Course
+from code.entities.event import Event
+from code.entities.problem_instance import ProblemInstance
+from code.entities.room import Room
+from code.entities.student import Student
+from code.entities.timetable import Timetable
+from code.entities.timetable_io import TimetableIO
+from code.utils.enums import EventType
+
+def date_in_current_week(date: datetime) -> bool:
+    """
+    Check if a given datetime object is within the current week.
+    """
+    current_year, current_week, _ = datetime.now().isocalendar()
+    year, week, _ = date.isocalendar()
+    return (current_year, current_week) == (year, week)
+
+class TestTimetableIO(TestCase):
+
+    @mock.patch('code.utils.data.load_students')
+    @mock.patch('code.utils.data.load_courses')
+    @mock.patch('code.utils.data.load_rooms')
+    def setUp(self, mock_load_rooms, mock_load_courses, mock_load_students) -> None:
+        # Mock the load_rooms() function.
+        self.room1 = Room('C0.110', 5, True)
+        self.room2 = Room('C1.04', 2)
+        mock_load_rooms.return_value = [self.room1, self.room2]
+
+        # Mock the load_courses() function.
+        self.course1 = Course('foo', 1, 0, 0, 0, 0, 5)
+        self.course2 = Course('bar', 1, 1, 3, 0, 0, 5)
+        self.course1.set_conflicting_courses(['bar'])
+        self.course2.set_conflicting_courses(['foo'])
+        mock_load_courses.return_value = [self.course1, self.course2]
+
+        # Mock the load_students() function.
+        self.student1 = Student('John', 'Doe', '1', ['foo', 'bar'])
+        self.student2 = Student('Mary', 'Jane', '2', ['foo'])
+        self.student3 = Student('Mike', 'Smith', '3', ['foo'])
+        self.student4 = Student('Steven', 'London', '4', ['bar', 'foo'])
+        mock_load_students.return_value = [
+            self.student1,
+            self.student2,
+            self.student3,
+            self.student4,
+        ]
+
+        # Prepare some test events that can be added in each unit test.
+        self.event1 = Event('foo lecture 1', EventType.LECTURE, self.course1, 1, 9, self.room1,
+                            [self.student1, self.student2, self.student3, self.student4])
+
+        self.event3 = Event('bar seminar 1', EventType.SEMINAR, self.course2, 3, 15, self.room2,
+                            [self.student4])
+
+        self.event4 = Event('bar seminar 2', EventType.SEMINAR, self.course2, 3, 9, self.room2,
+                            [self.student1])
+
+        # Set the mocked functions in a certain property that can be accessed by
+        # the _new_timetable_instance() to create a new timetable per test.
+        self.timetable_args = [mock_load_rooms, mock_load_courses, mock_load_students]
+
+    def _new_timetable_instance(self) -> Timetable:
+        return Timetable(*self.timetable_args)
+
+    def test_create_ics_event(self) -> None:
+        timetable_io = TimetableIO(self._new_timetable_instance())
+        ics_event = timetable_io.create_ics_event(self.event1)
+        assert self.event1.room is not None, 'event1 room must bet set'
+        self.assertEqual(ics_event.name, self.event1.title)
+        self.assertEqual(ics_event.location, self.event1.room.location_id)
+        self.assertEqual(ics_event.description, 'Enrolled students: ' + str(len(self.event1.students)))
+        self.assertEqual(date_in_current_week(ics_event.begin), True)
+        self.assertEqual(date_in_current_week(ics_event.end), True)
+
+    def test_export_csv(self) -> None:
+        timetable = self._new_timetable_instance()
+        timetable.add_event(self.event1)
+        timetable.add_event(self.event3)
+        with tempfile.TemporaryDirectory() as directory, \
+                mock.patch('code.entities.timetable_io.OUT_DIR', directory), \
+                mock.patch('code.entities.timetable_io.open'):
+            mock_writer = mock.MagicMock()
+            with mock.patch('csv.writer', return_value=mock_writer):
+                timetable.export_csv()
+            self.assertEqual(mock_writer.writerow.call_args_list, [
+                mock.call(['student name', 'course', 'type', 'weekday', 'timeslot', 'room']),
+            ])
+
+            # Only the students of the seminar group itself are exported.
+            self.assertEqual(mock_writer.writerows.call_args_list, [
+                mock.call([
+                    ['John Doe', 'foo lecture 1', 'hc', 'mon', 9, 'C0.110'],
+                    ['Mary Jane', 'foo lecture 1', 'hc', 'mon', 9, 'C0.110'],
+                    ['Mike Smith', 'foo lecture 1', 'hc', 'mon', 9, 'C0.110'],
+                    ['Steven London', 'foo lecture 1', 'hc', 'mon', 9, 'C0.110'],
+                ]),
+                mock.call([
+                    ['Steven London', 'bar seminar 1', 'wc', 'wed', 15, 'C1.04'],
+                ]),
+            ])
+
+    def test_export_csv_compress(self) -> None:
+        timetable = self._new_timetable_instance()
+        timetable.add_event(self.event1)
+        timetable.add_event(self.event3)
+
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, 'timetable.csv')
+            timetable.export_csv(filepath, compress=True)
+
+            with gzip.open(f'{filepath}.gz', 'rt') as file:
+                lines = file.read().splitlines()
+
+            imported_timetable = self._new_timetable_instance()
+            imported_timetable.import_file(f'{filepath}.gz')
+
+        self.assertEqual(lines, [
+            'student name,course,type,weekday,timeslot,room',
+            'John Doe,foo lecture 1,hc,mon,9,C0.110',
+            'Mary Jane,foo lecture 1,hc,mon,9,C0.110',
+            'Mike Smith,foo lecture 1,hc,mon,9,C0.110',
+            'Steven London,foo lecture 1,hc,mon,9,C0.110',
+            'Steven London,bar seminar 1,wc,wed,15,C1.04',
+        ])
+        self.assertEqual(imported_timetable, timetable)
+
+    def test_export_csv_unchanged(self) -> None:
+        timetable = self._new_timetable_instance()
+        timetable.add_event(self.event1)
+
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, 'timetable.csv')
+            timetable.export_csv(filepath)
+
+            # Nothing changed, so the file is not written again.
+            with mock.patch('code.entities.timetable_io.open') as mock_open:
+                timetable.export_csv(filepath)
+            self.assertEqual(mock_open.call_count, 0)
+
+            timetable.add_event(self.event3)
+            timetable.export_csv(filepath)
+            with open(filepath) as file:
+                lines = file.read().splitlines()
+
+        self.assertEqual(lines[-1], 'Steven London,bar seminar 1,wc,wed,15,C1.04')
+
+    def test_export_ics(self) -> None:
+        timetable = self._new_timetable_instance()
+        timetable.add_event(self.event1)
+        timetable.add_event(self.event3)
+        timetable_io = TimetableIO(timetable)
+
+        with tempfile.TemporaryDirectory() as directory, \
+                mock.patch('code.entities.timetable_io.OUT_DIR', directory), \
+                mock.patch.object(timetable_io, 'create_ics_event', wraps=timetable_io.create_ics_event) as mock_create_ics_event:
+            timetable_io.export_ics(workers=2)
+
+            ics_dir = os.path.join(directory, 'ics')
+            with open(os.path.join(ics_dir, 'timetable.ics')) as file:
+                calendar = file.read()
+            with open(os.path.join(ics_dir, 'students', '4_timetable.ics')) as file:
+                student_calendar = file.read()
+            with open(os.path.join(ics_dir, 'courses', 'bar_timetable.ics')) as file:
+                course_calendar = file.read()
+
+            student_files = os.listdir(os.path.join(ics_dir, 'students'))
+            course_files = os.listdir(os.path.join(ics_dir, 'courses'))
+
+        # Each event is only rendered once for all the calendars.
+        self.assertEqual(mock_create_ics_event.call_count, 2)
+        self.assertEqual(sorted(student_files), ['1_timetable.ics', '2_timetable.ics', '3_timetable.ics', '4_timetable.ics'])
+        self.assertEqual(sorted(course_files), ['bar_timetable.ics', 'foo_timetable.ics'])
+
+        self.assertEqual(calendar.startswith('BEGIN:VCALENDAR\n'), True)
+        self.assertEqual(calendar.endswith('END:VCALENDAR'), True)
+        self.assertEqual(calendar.count('BEGIN:VEVENT'), 2)
+        self.assertEqual(student_calendar.count('BEGIN:VEVENT'), 2)
+        self.assertEqual(course_calendar.count('BEGIN:VEVENT'), 1)
+        self.assertEqual('SUMMARY:bar seminar 1' in course_calendar, True)
+
+        # The calendars must be the same as when they are created by ics.
+        calendar_events = list(ics.Calendar(calendar).events)
+        self.assertEqual(sorted(e.name for e in calendar_events), ['bar seminar 1', 'foo lecture 1'])
+        self.assertEqual(all(date_in_current_week(e.begin) for e in calendar_events), True)
+
+    def test_export_ics_incremental(self) -> None:
+        timetable = self._new_timetable_instance()
+        timetable.add_event(self.event1)
+        timetable.add_event(self.event3)
+
+        with tempfile.TemporaryDirectory() as directory, \
+                mock.patch('code.entities.timetable_io.OUT_DIR', directory):
+            diff = timetable.export_ics()
+            self.assertEqual(len(diff['added']), 7)
+
+            # Nothing changed, so nothing is written again.
+            with mock.patch('code.entities.timetable_io.open') as mock_open:
+                diff = timetable.export_ics()
+            self.assertEqual(mock_open.call_count, 0)
+            self.assertEqual(len(diff['unchanged']), 7)
+
+            # Move the seminar to another timeslot.
+            moved_event = Event('bar seminar 1', EventType.SEMINAR, self.course2, 4, 11, self.room2,
+                                [self.student4])
+            timetable.remove_event(self.event3)
+            timetable.add_event(moved_event)
+            diff = timetable.export_ics()
+
+            with open(os.path.join(directory, 'ics', 'students', '4_timetable.ics')) as file:
+                student_calendar = file.read()
+
+            # Remove the seminar, so its course calendar is removed.
+            timetable.remove_event(moved_event)
+            removed_diff = timetable.export_ics()
+            course_files = os.listdir(os.path.join(directory, 'ics', 'courses'))
+
+        self.assertEqual(sorted(diff['changed']), [
+            'courses/bar_timetable.ics',
+            'students/4_timetable.ics',
+            'timetable.ics',
+        ])
+        self.assertEqual(len(diff['unchanged']), 4)
+        self.assertEqual(f'UID:{moved_event.id}@lesrooster' in student_calendar, True)
+        self.assertEqual(f'UID:{self.event3.id}@lesrooster' in student_calendar, False)
+        self.assertEqual(removed_diff['removed'], ['courses/bar_timetable.ics'])
+        self.assertEqual(course_files, ['foo_timetable.ics'])
+
+    def test_export_json(self) -> None:
+        timetable = self._new_timetable_instance()
+        timetable.add_event(self.event1)
+        timetable.add_event(self.event3)
+
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, 'timetable.json')
+            timetable.export_json(filepath, include_students=True)
+            with open(filepath) as file:
+                data = json.load(file)
+
+            # The students are left out by default.
+            timetable.export_json(filepath)
+            with open(filepath) as file:
+                data_without_students = json.load(file)
+
+        self.assertEqual(data, [
+            {
+                '9': [
+                    {
+                        'id': self.event1.id,
+                        'title': 'foo lecture 1',
+                        'type': 'hc',
+                        'course': 'foo',
+                        'weekday': 1,
+                        'timeslot': 9,
+                        'room': 'C0.110',
+                        'students': ['1', '2', '3', '4'],
+                    }
+                ]
+            },
+            {},
+            {
+                '15': [
+                    {
+                        'id': self.event3.id,
+                        'title': 'bar seminar 1',
+                        'type': 'wc',
+                        'course': 'bar',
+                        'weekday': 3,
+                        'timeslot': 15,
+                        'room': 'C1.04',
+                        'students': ['4'],
+                    }
+                ]
+            },
+            {},
+            {}
+        ])
+        self.assertEqual('students' in data_without_students[0]['9'][0], False)
+
+        # The timetable itself must not have been changed.
+        self.assertEqual(timetable.get_events(), [self.event1, self.event3])
+
+    def test_import_json(self) -> None:
+        timetable = self._new_timetable_instance()
+        timetable.add_event(self.event1)
+        timetable.add_event(self.event3)
+
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, 'timetable.json')
+            timetable.export_json(filepath, include_students=True)
+
+            imported_timetable = self._new_timetable_instance()
+            imported_timetable.import_file(filepath)
+
+        self.assertEqual(imported_timetable, timetable)
+        self.assertEqual(imported_timetable.calculate_malus_score(), timetable.calculate_malus_score())
+
+    def test_import_csv(self) -> None:
+        timetable = self._new_timetable_instance()
+        timetable.add_event(self.event1)
+        timetable.add_event(self.event3)
+
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, 'timetable.csv')
+            timetable.export_csv(filepath)
+
+            imported_timetable = self._new_timetable_instance()
+            imported_timetable.import_file(filepath)
+
+        events = imported_timetable.get_events()
+        self.assertEqual(len(events), 2)
+        self.assertEqual(events[0].course, self.course1)
+        self.assertEqual(events[0].students, [self.student1, self.student2, self.student3, self.student4])
+        self.assertEqual((events[1].weekday, events[1].timeslot, events[1].room), (3, 15, self.room2))
+        self.assertEqual(events[1].course, self.course2)
+        self.assertEqual(events[1].students, [self.student4])
+
+    def test_import_csv_double_booked(self) -> None:
+        timetable = self._new_timetable_instance()
+        event = Event('bar lecture 1', EventType.LECTURE, self.course2, 1, 9, self.room1,
+                      [self.student1, self.student4])
+        timetable.add_event(self.event1)
+        timetable.add_event(event)
+
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, 'timetable.csv')
+            timetable.export_csv(filepath)
+
+            imported_timetable = self._new_timetable_instance()
+            imported_timetable.import_file(filepath)
+
+            # Two of the same events in the same room can not be told apart.
+            timetable.add_event(Event('bar lecture 1', EventType.LECTURE, self.course2, 1, 9, self.room1,
+                                      [self.student1, self.student4]))
+            timetable.export_csv(filepath)
+            with self.assertRaises(AssertionError):
+                self._new_timetable_instance().import_file(filepath)
+
+        events = imported_timetable.get_events()
+        self.assertEqual(len(events), 2)
+        self.assertEqual([event.course for event in events], [self.course1, self.course2])
+        self.assertEqual(events[1].students, [self.student1, self.student4])
+
+    def test_import_csv_same_student_names(self) -> None:
+        student5 = Student('John', 'Doe', '5', ['foo'])
+        problem = ProblemInstance([self.room1, self.room2], [self.course1, self.course2],
+                                  [self.student1, self.student2, self.student3, self.student4, student5])
+        timetable = Timetable(problem=problem)
+        timetable.add_event(Event('bar seminar 1', EventType.SEMINAR, self.course2, 3, 15, self.room2, [self.student1]))
+
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, 'timetable.csv')
+
+            # Only student 1 named John Doe is enrolled in bar.
+            timetable.export_csv(filepath)
+            imported_timetable = Timetable(problem=problem)
+            imported_timetable.import_file(filepath)
+            self.assertEqual(imported_timetable.get_events()[0].students, [self.student1])
+
+            # Both students named John Doe are enrolled in foo.
+            timetable.add_event(Event('foo lecture 1', EventType.LECTURE, self.course1, 1, 9, self.room1, [self.student1, student5]))
+            timetable.export_csv(filepath)
+            with self.assertRaises(AssertionError):
+                Timetable(problem=problem).import_file(filepath)
+
+    def test_import_events(self) -> None:
+        timetable = self._new_timetable_instance()
+        timetable_io = TimetableIO(timetable)
+        timetable_io.import_events([
+            {
+                'title': 'bar seminar 1',
+                'type': EventType.SEMINAR,
+                'course': 'bar',
+                'weekday': 3,
+                'timeslot': 15,
+                'room': 'C1.04',
+                'students': ['2', '4', '5'],
+            },
+        ])
+
+        # Students that are not enrolled in the course or do not exist anymore
+        # are left out.
+        self.assertEqual(timetable.get_events()[0].students, [self.student4])
+
+        # A group that exceeds the capacity is created again.
+        timetable_io.import_events([
+            {
+                'title': 'bar seminar 1',
+                'type': EventType.SEMINAR,
+                'course': 'bar',
+                'weekday': 3,
+                'timeslot': 15,
+                'room': 'C1.04',
+                'students': ['1', '2', '3', '4'],
+            },
+        ])
+        self.assertEqual(timetable.get_events()[0].students, [self.student1, self.student4])
+
+        with self.assertRaises(AssertionError):
+            timetable_io.import_events([{ 'course': 'baz', 'room': 'C1.04' }])
+
+    def test_export_import_binary(self) -> None:
+        timetable = self._new_timetable_instance()
+        timetable.add_event(self.event1)
+        timetable.add_event(self.event3)
+        timetable.add_event(self.event4)
+
+        with tempfile.TemporaryDirectory() as directory:
+            timetable.export_binary(os.path.join(directory, 'timetable.bin'))
+
+            imported_timetable = self._new_timetable_instance()
+            imported_timetable.import_file(os.path.join(directory, 'timetable.bin'))
+
+            # The JSON form of both timetables must be exactly the same.
+            timetable.export_json(os.path.join(directory, 'timetable.json'))
+            imported_timetable.export_json(os.path.join(directory, 'imported.json'))
+            with open(os.path.join(directory, 'timetable.json')) as file, \
+                    open(os.path.join(directory, 'imported.json')) as imported_file:
+                self.assertEqual(imported_file.read(), file.read())
+
+        self.assertEqual(imported_timetable, timetable)
+        self.assertEqual([event.id for event in imported_timetable.get_events()], [event.id for event in timetable.get_events()])
+        self.assertEqual(imported_timetable.calculate_malus_score(), timetable.calculate_malus_score())
+
+    def test_import_binary_invalid(self) -> None:
+        timetable = self._new_timetable_instance()
+
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, 'timetable.bin')
+            with open(filepath, 'wb') as file:
+                file.write(b'\0' * TimetableIO.BINARY_HEADER.size)
+
+            with self.assertRaises(AssertionError):
+                TimetableIO(timetable).import_binary(filepath)
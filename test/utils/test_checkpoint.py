@@ -0,0 +1,97 @@
+import itertools
+import os
+import pickle
+import random
+import tempfile
+import zlib
+from unittest import TestCase, mock
+
+from code.algorithms.hillclimber import HillClimber
+from code.algorithms.randomizer import Randomizer
+from code.algorithms.tabu_search import TabuSearch
+from code.utils.checkpoint import load_checkpoint, save_checkpoint
+from code.utils import helpers
+
+class TestCheckpoint(TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, 'run.ckpt')
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_save_and_load_checkpoint(self) -> None:
+        save_checkpoint(self.filename, { 'iteration': 10, 'tabu_list': {1, 2} })
+        state = load_checkpoint(self.filename)
+
+        self.assertEqual(state['iteration'], 10)
+        self.assertEqual(state['tabu_list'], {1, 2})
+        self.assertEqual(os.path.exists(f'{self.filename}.tmp'), False)
+
+    def test_load_checkpoint_ids(self) -> None:
+        save_checkpoint(self.filename, {})
+        with open(self.filename, 'rb') as file:
+            last_id = pickle.loads(zlib.decompress(file.read()))['last_id']
+
+        # The ids that have been created before the checkpoint was saved are
+        # not created again after it is loaded in a new process.
+        with mock.patch.object(helpers, 'id_counter', itertools.count()):
+            load_checkpoint(self.filename)
+            self.assertEqual(helpers.make_id() > last_id, True)
+
+    def test_load_checkpoint_version(self) -> None:
+        with open(self.filename, 'wb') as file:
+            file.write(zlib.compress(pickle.dumps({ 'version': 0 })))
+
+        with self.assertRaises(AssertionError):
+            load_checkpoint(self.filename)
+
+    def test_resume_other_algorithm(self) -> None:
+        save_checkpoint(self.filename, { 'algorithm': 'TabuSearch' })
+
+        with self.assertRaises(AssertionError):
+            HillClimber(Randomizer()).resume(self.filename)
+
+    def test_resume_hillclimber(self) -> None:
+        random.seed(1)
+        hillclimber = HillClimber(Randomizer())
+        hillclimber.run(20)
+        expected_statistics = hillclimber.statistics.get_column('malus_score')
+        expected_malus_score = hillclimber.timetable.calculate_malus_score()
+
+        # Run the first half and save a checkpoint at the end of it.
+        random.seed(1)
+        hillclimber = HillClimber(Randomizer())
+        hillclimber.enable_checkpoints(self.filename, 10)
+        hillclimber.run(10)
+
+        # Mess up the random state to make sure it is restored.
+        random.seed(2)
+        hillclimber = HillClimber(Randomizer())
+        hillclimber.resume(self.filename)
+        hillclimber.run(20)
+
+        self.assertEqual(hillclimber.statistics.get_column('malus_score'), expected_statistics)
+        self.assertEqual(hillclimber.timetable.calculate_malus_score(), expected_malus_score)
+
+    def test_resume_tabu_search(self) -> None:
+        random.seed(1)
+        tabu_search = TabuSearch(Randomizer())
+        tabu_search.enable_checkpoints(self.filename, 5)
+        tabu_search.run(10)
+
+        state = load_checkpoint(self.filename)
+        self.assertEqual(state['iteration'], 10)
+
+        # The rooms of the best solution are only optimized after the search.
+        best_solution = state['best_solution']
+        best_solution.assign_all_rooms()
+        self.assertEqual(best_solution.calculate_malus_score(), tabu_search.timetable.calculate_malus_score())
+        self.assertEqual(len(state['statistics']), 10)
+
+        tabu_search = TabuSearch(Randomizer())
+        tabu_search.resume(self.filename)
+        tabu_search.run(15)
+
+        self.assertEqual(len(tabu_search.statistics), 15)
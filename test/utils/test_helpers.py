@@ -7,10 +7,14 @@ from code.utils.constants import ROOT_DIR
 from code.utils.helpers import (
     data_path,
     get_utc_offset,
+    make_id,
+    mix_hash,
     remove_duplicates,
+    reserve_id,
     serialize,
     split_list,
     split_list_random,
+    zobrist_key,
 )
 
 class TestUtilsHelpers(TestCase):
@@ -29,9 +33,35 @@ class TestUtilsHelpers(TestCase):
         self.assertEqual(split_list_random(['a', 'b', 'c', 'd', 'e'], 4), [['d', 'c', 'b', 'e'], ['a']])
 
     def test_make_id(self) -> None:
-        value = random.getrandbits(32)
+        value = make_id()
         self.assertEqual(isinstance(value, int), True)
-        self.assertEqual(len(str(value)) > 0, True)
+        self.assertEqual(len(set(make_id() for _ in range(100000))), 100000)
+        self.assertEqual(make_id() > value, True)
+
+    def test_reserve_id(self) -> None:
+        value = make_id()
+        reserve_id(value + 10)
+        self.assertEqual(make_id(), value + 11)
+
+        # Lower ids have been created already, so those are ignored.
+        reserve_id(value)
+        self.assertEqual(make_id(), value + 12)
+
+    def test_zobrist_key(self) -> None:
+        key = zobrist_key('foo', 1, 9)
+        self.assertEqual(0 <= key < 2**64, True)
+        self.assertEqual(zobrist_key('foo', 1, 9), key)
+        self.assertEqual(zobrist_key('foo', 1, 11) != key, True)
+
+        # The keys do not depend on the random state.
+        random.seed(0)
+        zobrist_key.cache_clear()
+        self.assertEqual(zobrist_key('foo', 1, 9), key)
+
+    def test_mix_hash(self) -> None:
+        self.assertEqual(mix_hash(0), 0)
+        self.assertEqual(mix_hash(1) != mix_hash(2), True)
+        self.assertEqual(0 <= mix_hash(2**64 - 1) < 2**64, True)
 
     def test_remove_duplicates(self) -> None:
         self.assertEqual(remove_duplicates(['a', 'b', 'b', 'c']), ['a', 'b', 'c'])
@@ -0,0 +1,75 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from code.utils.manifest import ExportManifest, hash_values
+
+class TestManifest(TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.filepath = os.path.join(self.directory.name, 'foo.txt')
+        self.other_filepath = os.path.join(self.directory.name, 'bar.txt')
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def write(self, filepath: str) -> None:
+        with open(filepath, 'w') as file:
+            file.write('foo')
+
+    def test_hash_values(self) -> None:
+        self.assertEqual(hash_values(1, 'foo'), hash_values(1, 'foo'))
+        self.assertEqual(hash_values(1, 'foo') == hash_values('foo', 1), False)
+
+    def test_track(self) -> None:
+        manifest = ExportManifest('foo', self.directory.name)
+        self.assertEqual(manifest.track(self.filepath, hash_values(1)), True)
+        self.write(self.filepath)
+        manifest.save()
+
+        # Same hash and the file still exists.
+        manifest = ExportManifest('foo', self.directory.name)
+        self.assertEqual(manifest.track(self.filepath, hash_values(1)), False)
+
+        # Other hash.
+        manifest = ExportManifest('foo', self.directory.name)
+        self.assertEqual(manifest.track(self.filepath, hash_values(2)), True)
+        self.assertEqual(manifest.diff['changed'], ['foo.txt'])
+
+        # Same hash, but the file has been removed.
+        os.remove(self.filepath)
+        manifest = ExportManifest('foo', self.directory.name)
+        self.assertEqual(manifest.track(self.filepath, hash_values(1)), True)
+
+    def test_save(self) -> None:
+        manifest = ExportManifest('foo', self.directory.name)
+        manifest.track(self.filepath, hash_values(1))
+        manifest.track(self.other_filepath, hash_values(2))
+        self.write(self.filepath)
+        self.write(self.other_filepath)
+        manifest.save()
+
+        # Other sections are kept in the same manifest.
+        ExportManifest('bar', self.directory.name).save()
+
+        manifest = ExportManifest('foo', self.directory.name)
+        manifest.track(self.filepath, hash_values(1))
+        diff = manifest.save()
+
+        self.assertEqual(diff, {
+            'added': [],
+            'changed': [],
+            'unchanged': ['foo.txt'],
+            'removed': ['bar.txt'],
+        })
+        self.assertEqual(manifest.summary(), '0 added, 0 changed, 1 unchanged, 1 removed')
+        self.assertEqual(os.path.exists(self.filepath), True)
+        self.assertEqual(os.path.exists(self.other_filepath), False)
+
+        with open(os.path.join(self.directory.name, 'manifest.json')) as file:
+            self.assertEqual(json.load(file), {
+                'bar': {},
+                'foo': { 'foo.txt': hash_values(1) },
+            })
@@ -0,0 +1,101 @@
+import json
+import os
+import tempfile
+from unittest import TestCase, mock
+
+from code.utils.metrics import JsonLinesSink, MetricsStream
+
+class TestMetrics(TestCase):
+
+    def test_emit(self) -> None:
+        messages = []
+        metrics = MetricsStream()
+        metrics.subscribe(messages.append)
+        metrics.start('Foo', total_events=3)
+        self.assertEqual(len(messages), 1)
+        self.assertEqual(messages[0]['event'], 'start')
+        self.assertEqual(messages[0]['algorithm'], 'Foo')
+        self.assertEqual(messages[0]['total_events'], 3)
+        self.assertEqual(messages[0]['every'], 100)
+
+    def test_update(self) -> None:
+        messages = []
+        metrics = MetricsStream(every=2)
+        metrics.subscribe(messages.append)
+        metrics.start('Foo')
+
+        for i, (malus_score, violations) in enumerate([(10, 1), (8, 0), (9, 0), (12, 0)]):
+            with metrics.scoring():
+                pass
+            metrics.record_move(malus_score < 10)
+            metrics.update(i + 1, malus_score, violations)
+
+        progress = [message for message in messages if message['event'] == 'progress']
+        self.assertEqual([message['iteration'] for message in progress], [2, 4])
+        self.assertEqual(progress[0]['malus_score'], 8)
+        self.assertEqual(progress[1]['malus_score'], 12)
+        self.assertEqual(progress[1]['best_malus_score'], 8)
+        self.assertEqual(progress[1]['best_violations'], 0)
+        self.assertEqual(progress[1]['accepted_moves'], 2)
+        self.assertEqual(progress[1]['rejected_moves'], 2)
+        self.assertEqual(progress[1]['scoring_time_ms'] >= 0, True)
+
+        metrics.finish()
+        self.assertEqual(messages[-1]['event'], 'finish')
+        self.assertEqual(messages[-1]['best_malus_score'], 8)
+
+    def test_update_partial(self) -> None:
+        messages = []
+        metrics = MetricsStream(every=1)
+        metrics.subscribe(messages.append)
+        metrics.start('Foo')
+
+        # A partial timetable is reported, but is never the best state.
+        metrics.update(1, 0, 0, complete=False)
+        self.assertEqual(messages[-1]['malus_score'], 0)
+        self.assertEqual(messages[-1]['best_malus_score'], None)
+
+        metrics.update(2, 10, 0)
+        metrics.update(3, 5, 0, complete=False)
+        self.assertEqual(messages[-1]['best_malus_score'], 10)
+
+    def test_update_resumed(self) -> None:
+        messages = []
+        metrics = MetricsStream(every=10)
+        metrics.subscribe(messages.append)
+
+        # Use a fake clock, such that one second passes between the events.
+        clock = [0.0]
+        with mock.patch('timeit.default_timer', lambda: clock[0]):
+            metrics.start('Foo', 1000)
+            clock[0] = 1.0
+            metrics.update(1010, 10, 0)
+
+        # Only the iterations since resuming count towards the speed.
+        self.assertEqual(messages[0]['iteration'], 1000)
+        self.assertEqual(messages[-1]['iterations_per_second'], 10)
+
+    def test_record_solution(self) -> None:
+        messages = []
+        metrics = MetricsStream()
+        metrics.subscribe(messages.append)
+        metrics.record_solution(1, 10, 0)
+        metrics.record_solution(2, 12, 0)
+        metrics.record_solution(3, 5, 0)
+        self.assertEqual([message['malus_score'] for message in messages], [10, 5])
+
+    def test_json_lines_sink(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'metrics.jsonl')
+            sink = JsonLinesSink(filename)
+            metrics = MetricsStream(every=1)
+            metrics.subscribe(sink)
+            metrics.start('Foo')
+            metrics.update(1, 10, 0)
+            metrics.finish()
+            sink.close()
+
+            with open(filename) as file:
+                events = [json.loads(line)['event'] for line in file]
+
+            self.assertEqual(events, ['start', 'progress', 'finish'])
@@ -0,0 +1,59 @@
+import copy
+from unittest import TestCase
+
+from code.entities.course import Course
+from code.entities.event import Event
+from code.utils.decorators import timer
+from code.utils.enums import EventType
+from code.utils.probes import ProbeRegistry, registry
+
+class TestProbes(TestCase):
+
+    def test_record(self) -> None:
+        probes = ProbeRegistry()
+        probes.record('foo', 0.5)
+        probes.record('foo', 1.5)
+        probes.record('bar', 1.0)
+        self.assertEqual(probes.counts, { 'foo': 2, 'bar': 1 })
+        self.assertEqual(probes.times, { 'foo': 2.0, 'bar': 1.0 })
+
+        report = probes.report(2).split('\n')
+        self.assertEqual(len(report), 3)
+        self.assertEqual(report[1].split(), ['foo', '2', '1.0', '2.000', '1000.000'])
+        self.assertEqual(report[2].split(), ['bar', '1', '0.5', '1.000', '1000.000'])
+
+        probes.reset()
+        self.assertEqual(probes.counts, {})
+
+    def test_enable_disable(self) -> None:
+        probes = ProbeRegistry()
+        original_eq = Event.__eq__
+        original_deepcopy = copy.deepcopy
+
+        course = Course('foo', 1, 0, 0, 0, 0, 2)
+        event = Event('foo 1', EventType.LECTURE, course)
+        other_event = Event('foo 2', EventType.LECTURE, course)
+
+        probes.enable()
+        try:
+            self.assertEqual(probes.enabled, True)
+            self.assertEqual(event == other_event, False)
+            copy.deepcopy([event, other_event])
+        finally:
+            probes.disable()
+
+        self.assertEqual(probes.enabled, False)
+        self.assertEqual(Event.__eq__, original_eq)
+        self.assertEqual(copy.deepcopy, original_deepcopy)
+        self.assertEqual(probes.counts['Event.__eq__'] >= 1, True)
+        self.assertEqual(probes.counts['copy.deepcopy'], 1)
+
+    def test_timer(self) -> None:
+        @timer
+        def foo() -> int:
+            return 1
+
+        registry.reset()
+        self.assertEqual(foo(), 1)
+        self.assertEqual(registry.counts, { 'TestProbes.test_timer.<locals>.foo': 1 })
+        registry.reset()
@@ -0,0 +1,70 @@
+import os
+from unittest import TestCase, mock
+
+from code.utils import profiling
+from code.utils.profiling import MemoryProfiler, format_phase_timings, memprofile, phase, profile, reset_phase_timings
+
+class TestProfiling(TestCase):
+
+    def setUp(self) -> None:
+        reset_phase_timings()
+
+    def test_phase(self) -> None:
+        with mock.patch('timeit.default_timer', side_effect=[0, 1, 3, 10]):
+            with phase('outer'):
+                with phase('inner'):
+                    pass
+
+        self.assertEqual(profiling.phase_timings, { 'inner': 2, 'outer': 8 })
+
+    def test_phase_decorator(self) -> None:
+        @phase('foo')
+        def foo() -> int:
+            return 1
+
+        self.assertEqual(foo(), 1)
+        self.assertEqual(foo(), 1)
+        self.assertEqual(list(profiling.phase_timings), ['foo'])
+
+    def test_format_phase_timings(self) -> None:
+        profiling.phase_timings.update({ 'foo': 1.0, 'bar': 3.0 })
+        self.assertEqual(format_phase_timings(), '\n'.join([
+            'Phase timings:',
+            '  - bar: 3.000s (75.0%)',
+            '  - foo: 1.000s (25.0%)',
+        ]))
+
+    def test_profile(self) -> None:
+        with mock.patch('code.utils.profiling.open', mock.mock_open()) as mock_open, \
+                mock.patch('cProfile.Profile.dump_stats') as mock_dump_stats:
+            result = profile(lambda x: x * 2, 21, top=5)
+
+        self.assertEqual(result, 42)
+        mock_dump_stats.assert_called_once()
+        self.assertEqual(mock_dump_stats.call_args[0][0].endswith('.prof'), True)
+        self.assertEqual(os.path.basename(mock_open.call_args[0][0]).startswith('profile-'), True)
+
+    def test_memory_profiler(self) -> None:
+        profiler = MemoryProfiler(every=2, top=3)
+        profiler.start()
+        try:
+            profiler.take_iteration_snapshot(1)
+            data = [list(range(100)) for _ in range(100)]
+            profiler.take_iteration_snapshot(2)
+            retained_size = profiler.measure_retained_size(data)
+            report = profiler.report()
+        finally:
+            profiler.stop()
+
+        self.assertEqual(len(profiler.sections), 1)
+        self.assertEqual(profiler.sections[0].startswith('start -> iteration 2'), True)
+        self.assertEqual(retained_size > 0, True)
+        self.assertEqual('Top allocations:' in report, True)
+
+    def test_memprofile(self) -> None:
+        with mock.patch('code.utils.profiling.open', mock.mock_open()) as mock_open:
+            result = memprofile(lambda x: x * 2, 21)
+
+        self.assertEqual(result, 42)
+        self.assertEqual(profiling.memory_profiler, None)
+        self.assertEqual(os.path.basename(mock_open.call_args[0][0]).startswith('memprofile-'), True)
@@ -0,0 +1,54 @@
+import copy
+from unittest import TestCase
+
+from code.utils.recorder import StatisticsRecorder
+
+class TestStatisticsRecorder(TestCase):
+
+    def setUp(self) -> None:
+        self.rows = [{ 'malus_score': score } for score in [5, 5, 5, 4, 4, 6, 3, 3, 3, 3]]
+
+    def test_append(self) -> None:
+        recorder = StatisticsRecorder({'malus_score': 'l'})
+        for row in self.rows:
+            recorder.append(row)
+        self.assertEqual(len(recorder), 10)
+        self.assertEqual(recorder.total_runs, 4)
+        self.assertEqual(list(recorder.counts), [3, 2, 1, 4])
+        self.assertEqual(list(recorder), self.rows)
+        self.assertEqual(recorder.get_last_row(), { 'malus_score': 3 })
+
+    def test_clear(self) -> None:
+        recorder = StatisticsRecorder({'malus_score': 'l'})
+        for row in self.rows:
+            recorder.append(row)
+        recorder.clear()
+        self.assertEqual(len(recorder), 0)
+        self.assertEqual(list(recorder), [])
+        self.assertEqual(recorder.get_last_row(), None)
+
+    def test_spill(self) -> None:
+        recorder = StatisticsRecorder({'malus_score': 'l'}, spill_size=2)
+        for row in self.rows:
+            recorder.append(row)
+        self.assertEqual(recorder.spill_chunks, [2, 2])
+        self.assertEqual(list(recorder.counts), [4])
+        self.assertEqual(list(recorder), self.rows)
+        self.assertEqual(recorder.get_column('malus_score'), [row['malus_score'] for row in self.rows])
+        self.assertEqual(recorder.min('malus_score'), 3)
+
+    def test_deepcopy(self) -> None:
+        recorder = StatisticsRecorder({'malus_score': 'l'}, spill_size=2)
+        for row in self.rows:
+            recorder.append(row)
+        recorder_copy = copy.deepcopy(recorder)
+        self.assertEqual(recorder_copy.spill_file, None)
+        self.assertEqual(list(recorder_copy), self.rows)
+
+    def test_get_series(self) -> None:
+        recorder = StatisticsRecorder({'malus_score': 'l'})
+        for row in self.rows:
+            recorder.append(row)
+        self.assertEqual(recorder.get_series('malus_score'), (list(range(1, 11)), [5, 5, 5, 4, 4, 6, 3, 3, 3, 3]))
+        self.assertEqual(recorder.get_series('malus_score', 4), ([1, 4, 7, 10], [5, 4, 3, 3]))
+        self.assertEqual(recorder.get_series('malus_score', 3), ([1, 5, 9, 10], [5, 4, 3, 3]))
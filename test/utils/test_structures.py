@@ -0,0 +1,69 @@
+import random
+from unittest import TestCase
+
+from code.utils.structures import IndexedSet, TranspositionTable
+
+class TestUtilsStructures(TestCase):
+
+    def test_indexed_set_add_remove(self) -> None:
+        items = IndexedSet(['a', 'b', 'c'])
+        self.assertEqual(len(items), 3)
+        self.assertEqual('b' in items, True)
+
+        # Adding an existing item should not change anything.
+        items.add('a')
+        self.assertEqual(list(items), ['a', 'b', 'c'])
+
+        # Removing an item moves the last item into its position.
+        items.remove('a')
+        self.assertEqual(list(items), ['c', 'b'])
+        self.assertEqual(items.positions, {'c': 0, 'b': 1})
+
+        items.remove('b')
+        self.assertEqual(list(items), ['c'])
+        self.assertEqual(items.positions, {'c': 0})
+
+        items.discard('foo')
+        self.assertRaises(KeyError, items.remove, 'foo')
+
+        items.clear()
+        self.assertEqual(len(items), 0)
+        self.assertEqual(items.positions, {})
+
+    def test_indexed_set_choice(self) -> None:
+        random.seed(0)
+        items = IndexedSet(['a', 'b', 'c'])
+        self.assertEqual(items.choice() in ['a', 'b', 'c'], True)
+        self.assertRaises(IndexError, IndexedSet().choice)
+
+        sample = items.sample(2)
+        self.assertEqual(len(set(sample)), 2)
+        self.assertEqual(set(sample) <= {'a', 'b', 'c'}, True)
+
+    def test_indexed_set_copy(self) -> None:
+        items = IndexedSet(['a', 'b', 'c'])
+        items_copy = items.copy()
+        items_copy.remove('a')
+
+        self.assertEqual(list(items), ['a', 'b', 'c'])
+        self.assertEqual(list(items_copy), ['c', 'b'])
+        self.assertEqual(items.positions, {'a': 0, 'b': 1, 'c': 2})
+
+    def test_transposition_table(self) -> None:
+        table = TranspositionTable(2)
+        table.put(1, 0, 10)
+        table.put(2, 1, 20)
+        self.assertEqual(table.get(1), (0, 10))
+        self.assertEqual(table.get(3), None)
+        self.assertEqual((table.hits, table.misses), (1, 1))
+
+        # The least recently used state is removed when the table is full.
+        table.put(3, 0, 30)
+        self.assertEqual(len(table), 2)
+        self.assertEqual(2 in table, False)
+        self.assertEqual(1 in table, True)
+        self.assertEqual(3 in table, True)
+
+        table.clear()
+        self.assertEqual(len(table), 0)
+        self.assertEqual((table.hits, table.misses), (0, 0))